@@ -0,0 +1,314 @@
+import logging
+from typing import Callable, Optional
+from datetime import datetime
+from sqlalchemy import insert, text
+from sqlalchemy.sql import select, exists, ColumnElement
+from sqlalchemy.orm import Session
+
+from db.db_models import Booking, Desk, Sector, User, Status, Log
+from db.session_management import managed_session
+from backend_operations.log_utils import log_event, BOOKING_CANCELED, BOOKING_MOVED, DESKS_CLOSED
+from backend_operations.user_login import UserProfile, get_current_user_profile
+
+
+ADMIN_ROLE = "Admin"
+
+bookings = Booking.__table__
+users = User.__table__
+
+LIVE_STATUS_IDS = select(Status.status_id).where(Status.status_name.in_(["Pending", "Active"]))
+CANCELED_STATUS_ID = select(Status.status_id).where(Status.status_name == "Canceled").scalar_subquery()
+
+
+def require_admin(profile: UserProfile) -> None:
+    """
+    Raise PermissionError unless the user is an admin.
+
+    :param profile: Profile of the user closing desks
+    """
+    if profile.role_name != ADMIN_ROLE:
+        raise PermissionError("Only administrators can close floors, sectors or desks.")
+
+
+def desk_scope(
+    desks,
+    office_id: Optional[int] = None,
+    floor_id: Optional[int] = None,
+    sector_id: Optional[int] = None,
+    desk_ids: Optional[list[int]] = None,
+) -> list[ColumnElement]:
+    """
+    Build conditions selecting the affected desks, at least one scope has to be given.
+
+    :param desks: The desks table or its alias
+    :param office_id: Only desks in this office
+    :param floor_id: Only desks on this floor
+    :param sector_id: Only desks in this sector
+    :param desk_ids: Only these desks
+    """
+    conditions = []
+    if office_id:
+        conditions.append(desks.c.office_id == office_id)
+    if floor_id:
+        conditions.append(desks.c.floor_id == floor_id)
+    if sector_id:
+        conditions.append(desks.c.sector_id == sector_id)
+    if desk_ids:
+        conditions.append(desks.c.desk_id.in_(desk_ids))
+
+    if not conditions:
+        raise ValueError("Select an office, floor, sector or desks to close.")
+    return conditions
+
+
+def live_bookings_in_range(start_date: datetime, end_date: datetime) -> list[ColumnElement]:
+    """Return conditions selecting pending and active bookings overlapping the time range."""
+    return [
+        bookings.c.start_date < end_date,
+        bookings.c.end_date > start_date,
+        bookings.c.status_id.in_(LIVE_STATUS_IDS),
+    ]
+
+
+def notify_users(session: Session, report: list[dict], message: str, event_code: str) -> None:
+    """
+    Write one notification log row per affected booking with a single multi-row insert.
+
+    :param session: SQLAlchemy session, the rows are committed with the booking changes
+    :param report: Rows returned by the set-based statement
+    :param message: Notification text, formatted with the report row
+    :param event_code: Event code of the rows
+    """
+    if not report:
+        return
+    session.execute(
+        insert(Log),
+        [
+            {
+                "user_name": row["user_name"],
+                "event_type": "Notification",
+                "component": "Admin",
+                "event_description": message.format(**row),
+                "event_code": event_code,
+                "booking_id": row["booking_id"],
+                "desk_code": row["desk_code"],
+                "floor_id": row["floor_id"],
+            }
+            for row in report
+        ],
+    )
+
+
+def cancel_bookings_in_scope(
+    session: Session,
+    start_date: datetime,
+    end_date: datetime,
+    reason: str,
+    office_id: Optional[int] = None,
+    floor_id: Optional[int] = None,
+    sector_id: Optional[int] = None,
+    desk_ids: Optional[list[int]] = None,
+) -> list[dict]:
+    """
+    Cancel all pending and active bookings of the selected desks in the time range with a single statement.
+
+    :param session: SQLAlchemy session, the caller commits
+    :param start_date: Start of the closure
+    :param end_date: End of the closure
+    :param reason: Reason shown to the affected users
+    :param office_id: Only desks in this office
+    :param floor_id: Only desks on this floor
+    :param sector_id: Only desks in this sector
+    :param desk_ids: Only these desks
+    :return: The canceled bookings with user name and desk code
+    """
+    desks = Desk.__table__
+    stmt = (
+        bookings.update()
+        .where(
+            desks.c.desk_id == bookings.c.desk_id,
+            users.c.user_id == bookings.c.user_id,
+            *desk_scope(desks, office_id, floor_id, sector_id, desk_ids),
+            *live_bookings_in_range(start_date, end_date),
+        )
+        .values(status_id=CANCELED_STATUS_ID)
+        .returning(
+            bookings.c.booking_id,
+            users.c.user_name,
+            desks.c.desk_code,
+            desks.c.floor_id,
+            bookings.c.start_date,
+            bookings.c.end_date,
+        )
+    )
+    report = [row._asdict() for row in session.execute(stmt)]
+    notify_users(
+        session,
+        report,
+        f"Your booking of desk '{{desk_code}}' from {{start_date:%Y-%m-%d %H:%M}} to {{end_date:%Y-%m-%d %H:%M}} "
+        f"was canceled: {reason}",
+        BOOKING_CANCELED,
+    )
+    return report
+
+
+def reassign_bookings_in_scope(
+    session: Session,
+    start_date: datetime,
+    end_date: datetime,
+    reason: str,
+    floor_id: int,
+    target_floor_id: int,
+    sector_id: Optional[int] = None,
+    desk_ids: Optional[list[int]] = None,
+) -> list[dict]:
+    """
+    Move pending and active bookings of the selected desks to the equivalent desks of another floor
+    (same sector name and local id) with a single statement. Bookings whose equivalent desk is taken stay unchanged.
+
+    :param session: SQLAlchemy session, the caller commits
+    :param start_date: Start of the closure
+    :param end_date: End of the closure
+    :param reason: Reason shown to the affected users
+    :param floor_id: The closed floor, equivalent desks are only unambiguous within one floor
+    :param target_floor_id: The floor receiving the bookings
+    :param sector_id: Only desks in this sector
+    :param desk_ids: Only these desks
+    :return: The moved bookings with user name, previous and new desk code
+    """
+    if floor_id == target_floor_id:
+        raise ValueError("Bookings can only be moved to another floor.")
+
+    source_desks = Desk.__table__.alias("source_desks")
+    source_sectors = Sector.__table__.alias("source_sectors")
+    target_desks = Desk.__table__.alias("target_desks")
+    target_sectors = Sector.__table__.alias("target_sectors")
+    other_bookings = Booking.__table__.alias("other_bookings")
+
+    target_is_booked = exists().where(
+        other_bookings.c.desk_id == target_desks.c.desk_id,
+        other_bookings.c.start_date < bookings.c.end_date,
+        other_bookings.c.end_date > bookings.c.start_date,
+        other_bookings.c.status_id != CANCELED_STATUS_ID,
+    )
+
+    stmt = (
+        bookings.update()
+        .where(
+            source_desks.c.desk_id == bookings.c.desk_id,
+            source_sectors.c.sector_id == source_desks.c.sector_id,
+            target_sectors.c.floor_id == target_floor_id,
+            target_sectors.c.sector_name == source_sectors.c.sector_name,
+            target_desks.c.sector_id == target_sectors.c.sector_id,
+            target_desks.c.local_id == source_desks.c.local_id,
+            users.c.user_id == bookings.c.user_id,
+            *desk_scope(source_desks, floor_id=floor_id, sector_id=sector_id, desk_ids=desk_ids),
+            *live_bookings_in_range(start_date, end_date),
+            ~target_is_booked,
+        )
+        .values(desk_id=target_desks.c.desk_id)
+        .returning(
+            bookings.c.booking_id,
+            users.c.user_name,
+            source_desks.c.desk_code.label("previous_desk_code"),
+            target_desks.c.desk_code,
+            target_desks.c.floor_id,
+            bookings.c.start_date,
+            bookings.c.end_date,
+        )
+    )
+    # Desks of the target floor are locked like in the booking paths, in id order so two moves do not deadlock
+    session.execute(
+        select(Desk.desk_id).where(Desk.floor_id == target_floor_id).order_by(Desk.desk_id).with_for_update()
+    )
+    report = [row._asdict() for row in session.execute(stmt)]
+    notify_users(
+        session,
+        report,
+        f"Your booking from {{start_date:%Y-%m-%d %H:%M}} to {{end_date:%Y-%m-%d %H:%M}} was moved from desk "
+        f"'{{previous_desk_code}}' to desk '{{desk_code}}': {reason}",
+        BOOKING_MOVED,
+    )
+    return report
+
+
+def close_desks(
+    session_factory: Callable[[], Session],
+    start_date: datetime,
+    end_date: datetime,
+    reason: str,
+    office_id: Optional[int] = None,
+    floor_id: Optional[int] = None,
+    sector_id: Optional[int] = None,
+    desk_ids: Optional[list[int]] = None,
+    target_floor_id: Optional[int] = None,
+    admin_profile: Optional[UserProfile] = None,
+) -> dict[str, list[dict]]:
+    """
+    Close a floor, sector or set of desks for a time range in one transaction.
+    With a target floor the affected bookings are moved to equivalent desks there first, bookings which could
+    not be moved are canceled. Every affected user gets a notification in the logs.
+
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :param start_date: Start of the closure
+    :param end_date: End of the closure
+    :param reason: Reason shown to the affected users
+    :param office_id: Only desks in this office
+    :param floor_id: Only desks on this floor, required for moving bookings
+    :param sector_id: Only desks in this sector
+    :param desk_ids: Only these desks
+    :param target_floor_id: Optional floor receiving the affected bookings
+    :param admin_profile: Profile of the admin closing the desks, defaults to the user logged in to the GUI
+    :return: Report with the "moved" and "canceled" bookings
+    """
+    admin_profile = admin_profile or get_current_user_profile()
+    admin = admin_profile.user_name
+    try:
+        require_admin(admin_profile)
+        if start_date >= end_date:
+            raise ValueError("The closure has to end after it starts.")
+        if target_floor_id and not floor_id:
+            raise ValueError("Select the closed floor to move bookings to another floor.")
+
+        with managed_session(session_factory) as session:
+            # Canceled bookings of closed desks must not be handed to waitlisted users by the promote_waitlist trigger
+            session.execute(text("SET LOCAL desk_booking.skip_waitlist = 'on'"))
+            moved = []
+            if target_floor_id:
+                moved = reassign_bookings_in_scope(
+                    session, start_date, end_date, reason, floor_id, target_floor_id, sector_id, desk_ids
+                )
+            canceled = cancel_bookings_in_scope(
+                session, start_date, end_date, reason, office_id, floor_id, sector_id, desk_ids
+            )
+            session.commit()
+
+        summary = (
+            f"Closed desks (office {office_id}, floor {floor_id}, sector {sector_id}, desks {desk_ids}) "
+            f"from '{start_date}' to '{end_date}': {len(moved)} bookings moved, {len(canceled)} canceled. "
+            f"Reason: {reason}"
+        )
+        logging.info(summary)
+        log_event(
+            admin,
+            "Success",
+            "Admin",
+            summary,
+            event_code=DESKS_CLOSED,
+            payload={
+                "office_id": office_id,
+                "floor_id": floor_id,
+                "sector_id": sector_id,
+                "desk_ids": desk_ids,
+                "target_floor_id": target_floor_id,
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "moved": len(moved),
+                "canceled": len(canceled),
+            },
+        )
+        return {"moved": moved, "canceled": canceled}
+    except Exception as exc:
+        logging.error(f"Error while closing desks: {exc}")
+        log_event(admin, "Failure", "Admin", f"Error while closing desks from '{start_date}' to '{end_date}': {exc}")
+        raise
@@ -1,15 +1,45 @@
+import time
 import logging
 import sqlalchemy
-from typing import Callable
-from datetime import datetime
-from sqlalchemy.sql import select, desc, func
+from typing import Callable, Optional
+from datetime import datetime, timedelta
+from sqlalchemy.sql import select, desc, func, case, exists, and_, tuple_
 from sqlalchemy.orm import Session
 from tkinter import messagebox, Event
 
-from db.db_models import Booking, Office, Floor, Desk, Status, MostFrequentUser
+from db.db_models import Booking, Desk, User, Status, DeskAvailability, AllBooking
 from db.session_management import managed_session
-from backend_operations.log_utils import log_event
-from backend_operations.user_login import get_current_user
+from db.local_cache import is_server_online, set_server_online, get_cached_next_booking, queue_cancel_booking
+from backend_operations.log_utils import (
+    log_event,
+    BOOKING_CREATED,
+    BOOKING_ASSIGNED,
+    BOOKING_CONFLICT,
+    BOOKING_FAILED,
+    BOOKING_CANCELED,
+    BOOKING_CHECKED_IN,
+)
+from backend_operations.slot_calendar import booking_range
+from backend_operations.waitlist_backend import offer_waitlist
+from backend_operations.user_login import get_current_user, get_current_user_profile
+from backend_operations.statements import (
+    STATUS_ID_BY_NAME,
+    DESK_ID_BY_CODE,
+    LOCK_DESK,
+    OVERLAPPING_DESK_BOOKING,
+    USER_BOOKING_BY_STATUS,
+    NEXT_PENDING_USER_BOOKING,
+    BOOKING_BY_ID,
+    BOOKED_DESKS_ON_FLOOR,
+    CHECK_IN_PENDING_BOOKING,
+    FLOOR_DAYS_VERSION,
+    MOST_RESERVED_DESK,
+    MOST_FREQUENT_USER,
+)
+
+
+# Returned by reads given the version of the caller's copy instead of the data, when nothing changed since
+NOT_MODIFIED = object()
 
 
 def create_booking(
@@ -28,14 +58,11 @@ def create_booking(
     :param start_time: The start time of the booking
     :param end_time: The end time of the booking
     """
+    started = time.perf_counter()
     try:
         # Convert start_time and end_time to datetime objects
-        start_time_dt = datetime.strptime(f"{selected_date} {start_time}", "%Y-%m-%d %H:%M")
-        end_time_dt = datetime.strptime(f"{selected_date} {end_time}", "%Y-%m-%d %H:%M")
-
-        # Check if start_time is before end_time
-        if start_time_dt >= end_time_dt:
-            raise ValueError("End time must be after start time.")
+        start_time_dt, end_time_dt = booking_range(selected_date, start_time, end_time)
+        waitlist_desk_id = None
 
         with managed_session(session_factory) as session:
             # Ensure the user is logged in
@@ -45,66 +72,87 @@ def create_booking(
                 raise ValueError("No user is currently logged in.")
 
             # Check if the desk exists
-            desk_exists = session.execute(select(Desk).where(Desk.desk_code == desk_code)).scalar_one_or_none()
+            desk_id = session.execute(DESK_ID_BY_CODE, {"desk_code": desk_code}).scalar_one_or_none()
 
-            if not desk_exists:
+            if not desk_id:
                 raise ValueError(f"Desk '{desk_code}' does not exist.")
 
-            # Get pending status id
-            pending_status = session.execute(
-                select(Status.status_id).where(Status.status_name == "Pending")
-            ).scalar_one_or_none()
-
-            canceled_status = session.execute(
-                select(Status).where(Status.status_name == "Canceled")
-            ).scalar_one_or_none()
+            # Get pending and canceled status ids
+            pending_status = session.execute(STATUS_ID_BY_NAME, {"status_name": "Pending"}).scalar_one_or_none()
+            canceled_status = session.execute(STATUS_ID_BY_NAME, {"status_name": "Canceled"}).scalar_one_or_none()
 
             if not pending_status or not canceled_status:
                 raise ValueError("The 'Pending' status does not exist in the database.")
 
-            # Check for overlapping bookings
-            overlapping_bookings = (
-                session.execute(
-                    select(Booking).where(
-                        Booking.desk_code == desk_code,
-                        Booking.start_date < end_time_dt,
-                        Booking.end_date > start_time_dt,
-                        Booking.status_id != canceled_status.status_id,
-                    )
+            # Check for overlapping bookings, other bookers of the desk wait for the lock until this one commits
+            session.execute(LOCK_DESK, {"desk_id": desk_id})
+            overlapping_booking = session.execute(
+                OVERLAPPING_DESK_BOOKING,
+                {
+                    "desk_id": desk_id,
+                    "start_date": start_time_dt,
+                    "end_date": end_time_dt,
+                    "canceled_status_id": canceled_status,
+                },
+            ).first()
+
+            if overlapping_booking:
+                waitlist_desk_id = desk_id
+                log_event(
+                    current_user,
+                    "Failure",
+                    "Booking",
+                    f"Desk '{desk_code}' is already booked from '{start_time_dt}' to '{end_time_dt}'",
+                    event_code=BOOKING_CONFLICT,
+                    desk_code=desk_code,
+                    latency_ms=(time.perf_counter() - started) * 1000,
+                    payload={
+                        "conflict": "desk",
+                        "start_date": start_time_dt.isoformat(),
+                        "end_date": end_time_dt.isoformat(),
+                    },
+                )
+            else:
+                # Create the booking
+                new_booking = Booking(
+                    user_id=get_current_user_profile().user_id,
+                    desk_id=desk_id,
+                    start_date=start_time_dt,
+                    end_date=end_time_dt,
+                    status_id=pending_status,
                 )
-                .scalars()
-                .all()
-            )
-
-            if overlapping_bookings:
-                raise ValueError(f"The desk '{desk_code}' is already booked for the selected time range.")
 
-            # Create the booking
-            new_booking = Booking(
-                user_name=current_user,
-                desk_code=desk_code,
-                start_date=start_time_dt,
-                end_date=end_time_dt,
-                status_id=pending_status,
-            )
+                session.add(new_booking)
+                session.commit()
 
-            session.add(new_booking)
-            session.commit()
+                # Log the successful booking creation
+                logging.info(
+                    f"Booking created successfully for desk '{desk_code}' from '{start_time_dt}' to '{end_time_dt}' by user '{current_user}'."
+                )
+                log_event(
+                    current_user,
+                    "Success",
+                    "Booking",
+                    f"Booking created successfully for desk '{desk_code}' from '{start_time_dt}' to '{end_time_dt}'",
+                    event_code=BOOKING_CREATED,
+                    booking_id=new_booking.booking_id,
+                    desk_code=desk_code,
+                    latency_ms=(time.perf_counter() - started) * 1000,
+                )
+                # Notify the user of success
+                messagebox.showinfo(
+                    title="Booking Successful",
+                    message=f"Booking created successfully for desk '{desk_code}' from {start_time} to {end_time}.",
+                )
 
-            # Log the successful booking creation
-            logging.info(
-                f"Booking created successfully for desk '{desk_code}' from '{start_time_dt}' to '{end_time_dt}' by user '{current_user}'."
-            )
-            log_event(
-                current_user,
-                "Success",
-                "Booking",
-                f"Booking created successfully for desk '{desk_code}' from '{start_time_dt}' to '{end_time_dt}'",
-            )
-            # Notify the user of success
-            messagebox.showinfo(
-                title="Booking Successful",
-                message=f"Booking created successfully for desk '{desk_code}' from {start_time} to {end_time}.",
+        # Offered after the session is closed, no transaction stays open while the dialog is shown
+        if waitlist_desk_id:
+            offer_waitlist(
+                session_factory,
+                f"The desk '{desk_code}' is already booked for the selected time range.",
+                start_time_dt,
+                end_time_dt,
+                desk_id=waitlist_desk_id,
             )
 
     except sqlalchemy.exc.DatabaseError as db_err:
@@ -115,7 +163,11 @@ def create_booking(
                 get_current_user(),
                 "Failure",
                 "Booking",
-                f"User attempted an overlapping booking for desk '{desk_code}' from '{start_time_dt}' to '{end_time_dt}'",
+                f"User attempted an overlapping booking for desk '{desk_code}' from '{selected_date} {start_time}' to '{selected_date} {end_time}'",
+                event_code=BOOKING_CONFLICT,
+                desk_code=desk_code,
+                latency_ms=(time.perf_counter() - started) * 1000,
+                payload={"conflict": "user"},
             )
             messagebox.showwarning(
                 title="Booking Error",
@@ -127,7 +179,9 @@ def create_booking(
                 get_current_user(),
                 "Failure",
                 "Booking",
-                f"Database error while creating booking for desk '{desk_code}' from '{start_time_dt}' to '{end_time_dt}'",
+                f"Database error while creating booking for desk '{desk_code}' from '{selected_date} {start_time}' to '{selected_date} {end_time}'",
+                event_code=BOOKING_FAILED,
+                desk_code=desk_code,
             )
             messagebox.showerror(
                 title="Database Error", message="An unexpected database error occurred. Please try again later."
@@ -141,7 +195,9 @@ def create_booking(
             get_current_user(),
             "Failure",
             "Booking",
-            f"Error while creating booking for desk '{desk_code}' from '{start_time_dt}' to '{end_time_dt}': {val_err}",
+            f"Error while creating booking for desk '{desk_code}' from '{selected_date} {start_time}' to '{selected_date} {end_time}': {val_err}",
+            event_code=BOOKING_FAILED,
+            desk_code=desk_code,
         )
         messagebox.showerror(title="Input Error", message=f"Booking creation failed: {val_err}")
         raise
@@ -153,39 +209,288 @@ def create_booking(
             get_current_user(),
             "Failure",
             "Booking",
-            f"Unexpected error while creating booking for desk '{desk_code}' from '{start_time_dt}' to '{end_time_dt}': {exc}",
+            f"Unexpected error while creating booking for desk '{desk_code}' from '{selected_date} {start_time}' to '{selected_date} {end_time}': {exc}",
+            event_code=BOOKING_FAILED,
+            desk_code=desk_code,
         )
         messagebox.showerror(title="Error", message="An unexpected error occurred. Please try again later.")
         raise
 
 
+def find_best_free_desk(
+    session: Session,
+    user_id: int,
+    office_id: int,
+    floor_id: Optional[int],
+    preferred_sector_id: Optional[int],
+    start_time_dt: datetime,
+    end_time_dt: datetime,
+    canceled_status_id: int,
+) -> DeskAvailability | None:
+    """Pick the best free desk for the given time range in a single query.
+
+    Desks are ranked deterministically by: preferred sector first, then desks the user booked most often,
+    then sectors with the lowest load in the requested time range, and finally by desk id.
+
+    :param session: SQLAlchemy session
+    :param user_id: ID of the user the desk is allocated for
+    :param office_id: ID of the office to allocate the desk in
+    :param floor_id: Optional ID of the floor the desk must be on
+    :param preferred_sector_id: Optional ID of the sector that should be preferred
+    :param start_time_dt: The start of the booking
+    :param end_time_dt: The end of the booking
+    :param canceled_status_id: ID of the 'Canceled' status, such bookings do not block desks
+    :return: The best desk from the desk topology view or None if all desks are taken
+    """
+    # Desks the user booked before, archived bookings included. Both sides of the all_bookings view are served
+    # by their user_id-leading indexes
+    user_history = (
+        select(AllBooking.desk_id, func.count(AllBooking.booking_id).label("times_booked"))
+        .where(AllBooking.user_id == user_id, AllBooking.status_id != canceled_status_id)
+        .group_by(AllBooking.desk_id)
+        .subquery()
+    )
+
+    # Number of bookings per sector overlapping the requested time range
+    sector_load = (
+        select(Desk.sector_id, func.count(Booking.booking_id).label("booked_desks"))
+        .join(Booking, Booking.desk_id == Desk.desk_id)
+        .where(
+            Desk.office_id == office_id,
+            Booking.start_date < end_time_dt,
+            Booking.end_date > start_time_dt,
+            Booking.status_id != canceled_status_id,
+        )
+        .group_by(Desk.sector_id)
+        .subquery()
+    )
+
+    # Anti-join served by idx_bookings_desk_date
+    desk_is_booked = exists().where(
+        Booking.desk_id == DeskAvailability.desk_id,
+        Booking.start_date < end_time_dt,
+        Booking.end_date > start_time_dt,
+        Booking.status_id != canceled_status_id,
+    )
+
+    stmt = (
+        select(DeskAvailability)
+        .outerjoin(user_history, user_history.c.desk_id == DeskAvailability.desk_id)
+        .outerjoin(sector_load, sector_load.c.sector_id == DeskAvailability.sector_id)
+        .where(DeskAvailability.office_id == office_id, ~desk_is_booked)
+        .order_by(
+            case((DeskAvailability.sector_id == preferred_sector_id, 0), else_=1),
+            desc(func.coalesce(user_history.c.times_booked, 0)),
+            func.coalesce(sector_load.c.booked_desks, 0),
+            DeskAvailability.desk_id,
+        )
+        .limit(1)
+    )
+
+    if floor_id:
+        stmt = stmt.where(DeskAvailability.floor_id == floor_id)
+
+    return session.execute(stmt).scalar_one_or_none()
+
+
+def assign_best_desk(
+    event: Event,
+    session_factory: Callable[[], Session],
+    office_id: Optional[int],
+    floor_id: Optional[int],
+    sector_id: Optional[int],
+    selected_date: str,
+    start_time: str,
+    end_time: str,
+) -> str | None:
+    """Automatically choose a free desk and book it for logged in user.
+
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :param office_id: ID of the office in which the desk should be assigned
+    :param floor_id: Optional ID of the preferred floor
+    :param sector_id: Optional ID of the preferred sector
+    :param selected_date: The selected booking date
+    :param start_time: The start time of the booking
+    :param end_time: The end time of the booking
+    :return: Code of the booked desk or None if no desk could be assigned
+    """
+    started = time.perf_counter()
+    try:
+        start_time_dt, end_time_dt = booking_range(selected_date, start_time, end_time)
+
+        if not office_id:
+            raise ValueError("Please select an office first.")
+        waitlist_sector_id = None
+
+        with managed_session(session_factory) as session:
+            current_user: str = get_current_user()
+            current_user_id = get_current_user_profile().user_id
+
+            pending_status = session.execute(STATUS_ID_BY_NAME, {"status_name": "Pending"}).scalar_one_or_none()
+            canceled_status = session.execute(STATUS_ID_BY_NAME, {"status_name": "Canceled"}).scalar_one_or_none()
+
+            if not pending_status or not canceled_status:
+                raise ValueError("The 'Pending' or 'Canceled' status does not exist in the database.")
+
+            # Another user may take the chosen desk between the selection and the insert. The desk row is locked
+            # like in every other booking path and re-checked, the next best desk is tried if it was taken
+            for _ in range(3):
+                best_desk = find_best_free_desk(
+                    session,
+                    current_user_id,
+                    office_id,
+                    floor_id,
+                    sector_id,
+                    start_time_dt,
+                    end_time_dt,
+                    canceled_status,
+                )
+                if not best_desk:
+                    # Everything is taken, waiting is offered for the preferred sector
+                    if not sector_id:
+                        raise ValueError("There are no free desks for the selected time range.")
+                    waitlist_sector_id = sector_id
+                    break
+
+                session.execute(LOCK_DESK, {"desk_id": best_desk.desk_id})
+                still_free = not session.execute(
+                    OVERLAPPING_DESK_BOOKING,
+                    {
+                        "desk_id": best_desk.desk_id,
+                        "start_date": start_time_dt,
+                        "end_date": end_time_dt,
+                        "canceled_status_id": canceled_status,
+                    },
+                ).first()
+
+                if still_free:
+                    break
+                session.rollback()
+            else:
+                raise ValueError("Desks are being booked by other users right now, please try again.")
+
+            if not waitlist_sector_id:
+                desk_code = best_desk.desk_code
+                new_booking = Booking(
+                    user_id=current_user_id,
+                    desk_id=best_desk.desk_id,
+                    start_date=start_time_dt,
+                    end_date=end_time_dt,
+                    status_id=pending_status,
+                )
+                session.add(new_booking)
+                session.commit()
+
+                logging.info(
+                    f"Desk '{desk_code}' assigned to user '{current_user}' from '{start_time_dt}' to '{end_time_dt}'."
+                )
+                log_event(
+                    current_user,
+                    "Success",
+                    "Booking",
+                    f"Desk '{desk_code}' automatically assigned from '{start_time_dt}' to '{end_time_dt}'",
+                    event_code=BOOKING_ASSIGNED,
+                    booking_id=new_booking.booking_id,
+                    desk_code=desk_code,
+                    latency_ms=(time.perf_counter() - started) * 1000,
+                )
+                messagebox.showinfo(
+                    title="Desk Assigned",
+                    message=f"Desk '{desk_code}' has been booked for you from {start_time} to {end_time}.",
+                )
+                return desk_code
+
+        # Offered after the session is closed, no transaction stays open while the dialog is shown
+        offer_waitlist(
+            session_factory,
+            "There are no free desks for the selected time range.",
+            start_time_dt,
+            end_time_dt,
+            sector_id=waitlist_sector_id,
+        )
+        return None
+
+    except sqlalchemy.exc.DatabaseError as db_err:
+        if "Overlapping booking detected" in str(db_err):
+            logging.warning(f"User '{get_current_user()}' attempted an overlapping desk assignment.")
+            log_event(
+                get_current_user(),
+                "Failure",
+                "Booking",
+                f"User attempted an overlapping desk assignment in office {office_id} on {selected_date}",
+                event_code=BOOKING_CONFLICT,
+                payload={"conflict": "user", "office_id": office_id},
+            )
+            messagebox.showwarning(
+                title="Booking Error",
+                message="You already have a booking during this time. Please select a different time slot.",
+            )
+        else:
+            logging.error(f"Database error while assigning desk: {db_err}")
+            log_event(
+                get_current_user(),
+                "Failure",
+                "Booking",
+                f"Database error while assigning desk in office {office_id} on {selected_date}",
+                event_code=BOOKING_FAILED,
+                payload={"office_id": office_id},
+            )
+            messagebox.showerror(
+                title="Database Error", message="An unexpected database error occurred. Please try again later."
+            )
+        return None
+
+    except ValueError as val_err:
+        logging.error(f"Error while assigning desk: {val_err}")
+        log_event(
+            get_current_user(),
+            "Failure",
+            "Booking",
+            f"Error while assigning desk in office {office_id} on {selected_date}: {val_err}",
+            event_code=BOOKING_FAILED,
+            payload={"office_id": office_id},
+        )
+        messagebox.showerror(title="Input Error", message=f"Desk assignment failed: {val_err}")
+        return None
+
+    except Exception as exc:
+        logging.error(f"Unexpected error while assigning desk: {exc}")
+        log_event(
+            get_current_user(),
+            "Failure",
+            "Booking",
+            f"Unexpected error while assigning desk in office {office_id} on {selected_date}: {exc}",
+            event_code=BOOKING_FAILED,
+            payload={"office_id": office_id},
+        )
+        messagebox.showerror(title="Error", message="An unexpected error occurred. Please try again later.")
+        return None
+
+
 # Function to check if the user has an active or next pending reservation
 def check_user_current_or_next_booking(session_factory: Callable[[], Session]) -> dict | None:
     """Check if the user has an active or pending booking.
 
     param: session_factory: A callable that returns a SQLAlchemy session
     """
-    try:
-        user = get_current_user()
+    user = get_current_user()
+    user_id = get_current_user_profile().user_id
 
-        with managed_session(session_factory) as session:
-            # Fetch "Active" and "Pending" statuses
-            active_status = session.execute(select(Status).where(Status.status_name == "Active")).scalar_one_or_none()
-            pending_status = session.execute(
-                select(Status).where(Status.status_name == "Pending")
-            ).scalar_one_or_none()
-            if not active_status or not pending_status:
-                raise ValueError("Required statuses ('Active' and 'Pending') not found in the database.")
+    # While the server is unreachable show the booking kept in the local cache
+    if not is_server_online():
+        return get_cached_next_booking(user)
+
+    try:
+        with managed_session(session_factory, read_only=True) as session:
+            # Fetch "Active" status
+            active_status = session.execute(STATUS_ID_BY_NAME, {"status_name": "Active"}).scalar_one_or_none()
+            if not active_status:
+                raise ValueError("Required status 'Active' not found in the database.")
 
             # Query for an active booking first
             active_booking = session.execute(
-                select(Booking)
-                .where(
-                    Booking.user_name == user,
-                    Booking.status_id == active_status.status_id,
-                )
-                .order_by(Booking.start_date)
-            ).scalar_one_or_none()
+                USER_BOOKING_BY_STATUS, {"user_id": user_id, "status_id": active_status}
+            ).first()
 
             if active_booking:
                 return {
@@ -193,25 +498,14 @@ def check_user_current_or_next_booking(session_factory: Callable[[], Session]) -
                     "desk_code": active_booking.desk_code,
                     "start_time": active_booking.start_date.strftime("%Y-%m-%d %H:%M"),
                     "end_time": active_booking.end_date.strftime("%Y-%m-%d %H:%M"),
-                    "status": active_status.status_name,
+                    "start_date": active_booking.start_date,
+                    "status": "Active",
                 }
 
-            # PROJECT REQUIREMENT: subquery
             # If no active booking, query the next pending booking
-            next_pending_booking = (
-                session.execute(
-                    select(Booking)
-                    .where(
-                        Booking.user_name == user,
-                        Booking.status_id  # == pending_status.status_id,
-                        == (select(Status.status_id).where(Status.status_name == "Pending")).scalar_subquery(),
-                        Booking.start_date > datetime.now(),
-                    )
-                    .order_by(Booking.start_date)
-                )
-                .scalars()
-                .first()
-            )
+            next_pending_booking = session.execute(
+                NEXT_PENDING_USER_BOOKING, {"user_id": user_id, "now": datetime.now()}
+            ).first()
 
             if next_pending_booking:
                 return {
@@ -219,11 +513,16 @@ def check_user_current_or_next_booking(session_factory: Callable[[], Session]) -
                     "desk_code": next_pending_booking.desk_code,
                     "start_time": next_pending_booking.start_date.strftime("%Y-%m-%d %H:%M"),
                     "end_time": next_pending_booking.end_date.strftime("%Y-%m-%d %H:%M"),
-                    "status": pending_status.status_name,
+                    "start_date": next_pending_booking.start_date,
+                    "status": "Pending",
                 }
 
             # If neither active nor pending bookings are found, return None
             return None
+    except (sqlalchemy.exc.OperationalError, sqlalchemy.exc.InterfaceError) as exc:
+        logging.error(f"Database unreachable while fetching user booking, using local cache: {exc}")
+        set_server_online(False)
+        return get_cached_next_booking(user)
     except Exception as exc:
         logging.error(f"Error while fetching user booking: {exc}")
         log_event(get_current_user(), "Failure", "Booking", f"Error while fetching next user booking: {exc}")
@@ -235,23 +534,14 @@ def check_user_current_or_next_booking(session_factory: Callable[[], Session]) -
 
 
 def check_in_booking(session_factory: Callable[[], Session], booking_id: int) -> bool:
-    """Mark a booking as 'Active' by updating its status."""
+    """Mark a pending booking as 'Active' with a single statement."""
     try:
         user = get_current_user()
 
         with managed_session(session_factory) as session:
-            # Get the status for "Active"
-            active_status = session.execute(select(Status).where(Status.status_name == "Active")).scalar_one_or_none()
-            if not active_status:
-                raise ValueError("Active status not found in the database.")
-
-            # Ensure the booking matches the provided booking_id
-            booking = session.execute(select(Booking).where(Booking.booking_id == booking_id)).scalar_one_or_none()
-            if not booking:
+            checked_in = session.execute(CHECK_IN_PENDING_BOOKING, {"checked_in_booking_id": booking_id}).first()
+            if not checked_in:
                 raise ValueError("No valid booking found for check-in.")
-
-            # Update booking status to Active
-            booking.status_id = active_status.status_id
             session.commit()
 
             # Log the successful check-in
@@ -261,6 +551,8 @@ def check_in_booking(session_factory: Callable[[], Session], booking_id: int) ->
                 "Success",
                 "Check-in",
                 f"User successfully checked in for booking ID: {booking_id}",
+                event_code=BOOKING_CHECKED_IN,
+                booking_id=booking_id,
             )
             return True
     except Exception as exc:
@@ -270,63 +562,314 @@ def check_in_booking(session_factory: Callable[[], Session], booking_id: int) ->
             "Failure",
             "Check-in",
             f"Error during check-in for booking ID {booking_id}: {exc}",
+            event_code=BOOKING_FAILED,
+            booking_id=booking_id,
         )
         return False
 
 
 def cancel_booking(session_factory: Callable[[], Session], booking_id: int) -> bool:
-    """Cancel a booking by updating its status to 'Canceled'."""
+    """Cancel a booking by updating its status to 'Canceled'.
+    While the server is unreachable the cancellation is queued in the local cache and replayed later."""
+    if not is_server_online():
+        queue_cancel_booking(booking_id, get_current_user())
+        return True
+
     try:
         with managed_session(session_factory) as session:
-            canceled_status = session.execute(
-                select(Status).where(Status.status_name == "Canceled")
-            ).scalar_one_or_none()
+            canceled_status = session.execute(STATUS_ID_BY_NAME, {"status_name": "Canceled"}).scalar_one_or_none()
             if not canceled_status:
                 raise ValueError("Canceled status not found in the database.")
 
             # Fetch the booking
-            booking = session.execute(select(Booking).where(Booking.booking_id == booking_id)).scalar_one_or_none()
+            booking = session.execute(BOOKING_BY_ID, {"booking_id": booking_id}).scalar_one_or_none()
             if not booking:
                 raise ValueError("Booking not found to cancel.")
 
             # Update status
-            booking.status_id = canceled_status.status_id
+            booking.status_id = canceled_status
             session.commit()
             logging.info(f"Booking {booking_id} successfully canceled.")
             return True
+    except (sqlalchemy.exc.OperationalError, sqlalchemy.exc.InterfaceError) as exc:
+        logging.error(f"Database unreachable during booking cancellation, queuing it: {exc}")
+        set_server_online(False)
+        queue_cancel_booking(booking_id, get_current_user())
+        return True
     except Exception as exc:
         logging.error(f"Error during booking cancellation: {exc}")
         return False
 
 
-# PROJECT REQUIREMENT: complex query
-def get_most_reserved_desk(event: Event, session_factory: Callable[[], Session]):
+def get_user_bookings_page(
+    session_factory: Callable[[], Session],
+    upcoming: bool,
+    after: Optional[tuple[datetime, int]] = None,
+    page_size: int = 20,
+) -> tuple[list[dict], bool] | None:
+    """Fetch one page of the user's bookings with keyset pagination on (start_date, booking_id).
+    Only the requested page is read, served by idx_bookings_user_start and idx_bookings_history_user_start_id.
+
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :param upcoming: Upcoming bookings in ascending order if True, finished bookings newest first otherwise
+    :param after: (start_date, booking_id) of the last booking on the previous page, None for the first page
+    :param page_size: Number of bookings on a page
+    :return: A tuple of the bookings and whether more pages follow, None on error
     """
-    Query the database to find the most reserved desk with additional location details.
+    try:
+        user_id = get_current_user_profile().user_id
+        now = datetime.now()
+        # Unfinished bookings are never moved to history, finished ones may already be there
+        source = Booking if upcoming else AllBooking
+        page_key = tuple_(source.start_date, source.booking_id)
+
+        stmt = (
+            select(source.booking_id, Desk.desk_code, source.start_date, source.end_date, Status.status_name)
+            .join(Desk, Desk.desk_id == source.desk_id)
+            .join(Status, Status.status_id == source.status_id)
+            .where(source.user_id == user_id)
+        )
+        if upcoming:
+            stmt = stmt.where(source.end_date > now).order_by(source.start_date, source.booking_id)
+            if after:
+                stmt = stmt.where(page_key > tuple_(*after))
+        else:
+            stmt = stmt.where(source.end_date <= now).order_by(desc(source.start_date), desc(source.booking_id))
+            if after:
+                stmt = stmt.where(page_key < tuple_(*after))
+
+        with managed_session(session_factory, read_only=True) as session:
+            # One extra row tells whether a next page exists
+            rows = session.execute(stmt.limit(page_size + 1)).all()
+
+        bookings = [
+            {
+                "booking_id": row.booking_id,
+                "desk_code": row.desk_code,
+                "start_date": row.start_date,
+                "end_date": row.end_date,
+                "status": row.status_name,
+            }
+            for row in rows[:page_size]
+        ]
+        return bookings, len(rows) > page_size
+    except Exception as exc:
+        logging.error(f"Error while fetching user bookings: {exc}")
+        log_event(get_current_user(), "Failure", "Booking", f"Error while fetching user bookings: {exc}")
+        return None
+
+
+def cancel_bookings(session_factory: Callable[[], Session], booking_ids: list[int]) -> int | None:
+    """Cancel pending and active bookings of the logged in user with a single statement.
+    While the server is unreachable the cancellations are queued in the local cache and replayed later.
 
-    :param event: The event that triggered the function
     :param session_factory: A callable that returns a SQLAlchemy session
-    :return: A dictionary containing desk details, location details, and reservation count
+    :param booking_ids: IDs of the bookings to cancel
+    :return: Number of canceled bookings, None on error
     """
+    user = get_current_user()
+    if not booking_ids:
+        return 0
+
+    if not is_server_online():
+        for booking_id in booking_ids:
+            queue_cancel_booking(booking_id, user)
+        return len(booking_ids)
+
     try:
         with managed_session(session_factory) as session:
+            stmt = (
+                Booking.__table__.update()
+                .where(
+                    Booking.booking_id.in_(booking_ids),
+                    Booking.user_id == get_current_user_profile().user_id,
+                    Booking.status_id.in_(
+                        select(Status.status_id).where(Status.status_name.in_(["Pending", "Active"]))
+                    ),
+                )
+                .values(status_id=select(Status.status_id).where(Status.status_name == "Canceled").scalar_subquery())
+                .returning(Booking.booking_id)
+            )
+            canceled_ids = session.execute(stmt).scalars().all()
+            session.commit()
+
+        logging.info(f"User '{user}' canceled bookings {canceled_ids}.")
+        log_event(
+            user,
+            "Success",
+            "Booking",
+            f"Bookings canceled: {', '.join(map(str, canceled_ids))}",
+            event_code=BOOKING_CANCELED,
+            booking_id=canceled_ids[0] if len(canceled_ids) == 1 else None,
+            payload={"booking_ids": list(canceled_ids)},
+        )
+        return len(canceled_ids)
+    except (sqlalchemy.exc.OperationalError, sqlalchemy.exc.InterfaceError) as exc:
+        logging.error(f"Database unreachable during booking cancellation, queuing it: {exc}")
+        set_server_online(False)
+        for booking_id in booking_ids:
+            queue_cancel_booking(booking_id, user)
+        return len(booking_ids)
+    except Exception as exc:
+        logging.error(f"Error during cancellation of bookings {booking_ids}: {exc}")
+        log_event(user, "Failure", "Booking", f"Error during cancellation of bookings {booking_ids}: {exc}")
+        return None
+
+
+def get_floor_version(session: Session, floor_id: int, start_date: datetime, end_date: datetime) -> int:
+    """Return the change token of a floor for all days touched by a time range, a single index lookup.
+
+    :param session: SQLAlchemy session
+    :param floor_id: The floor ID
+    :param start_date: Start of the time range
+    :param end_date: End of the time range
+    """
+    return session.execute(
+        FLOOR_DAYS_VERSION,
+        {
+            "floor_id": floor_id,
+            "first_day": start_date.date(),
+            "end_day": (end_date - timedelta(microseconds=1)).date() + timedelta(days=1),
+        },
+    ).scalar_one()
+
+
+def get_floor_week_occupancy(
+    session_factory: Callable[[], Session],
+    office_id: int,
+    floor_id: int,
+    week_start: datetime,
+    days: int = 7,
+    if_changed_since: Optional[int] = None,
+) -> dict | None:
+    """Fetch all desks of a floor together with their bookings for the given days in a single query.
+
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :param office_id: The office ID
+    :param floor_id: The floor ID
+    :param week_start: Start of the first day
+    :param days: Number of days to fetch
+    :param if_changed_since: Version of the caller's copy, NOT_MODIFIED is returned if the floor did not change
+    :return: A dictionary with ordered desk codes, not canceled bookings and the version, None on error
+    """
+    try:
+        week_end = week_start + timedelta(days=days)
+
+        with managed_session(session_factory, read_only=True) as session:
+            # Read before the data, a change committed in between is picked up by the next revalidation
+            version = get_floor_version(session, floor_id, week_start, week_end)
+            if version == if_changed_since:
+                return NOT_MODIFIED
+
+            canceled_status = select(Status.status_id).where(Status.status_name == "Canceled").scalar_subquery()
+
+            # Desks without bookings are returned with empty booking columns
             stmt = (
                 select(
                     Desk.desk_code,
-                    Desk.local_id.label("desk_code"),
-                    Floor.floor_name,
-                    Office.office_name,
-                    func.count(Booking.booking_id).label("reservation_count"),
+                    Booking.booking_id,
+                    User.user_name,
+                    Booking.start_date,
+                    Booking.end_date,
+                    Status.status_name,
                 )
-                .join(Booking, Booking.desk_code == Desk.desk_code)
-                .join(Floor, Desk.floor_id == Floor.floor_id)
-                .join(Office, Desk.office_id == Office.office_id)
-                .group_by(Desk.desk_id, Desk.local_id, Floor.floor_name, Office.office_name)
-                .order_by(desc(func.count(Booking.booking_id)))
-                .limit(1)
+                .outerjoin(
+                    Booking,
+                    and_(
+                        Booking.desk_id == Desk.desk_id,
+                        Booking.start_date < week_end,
+                        Booking.end_date > week_start,
+                        Booking.status_id != canceled_status,
+                    ),
+                )
+                .outerjoin(User, User.user_id == Booking.user_id)
+                .outerjoin(Status, Status.status_id == Booking.status_id)
+                .where(Desk.office_id == office_id, Desk.floor_id == floor_id)
+                .order_by(Desk.sector_id, Desk.local_id, Booking.start_date)
             )
+            rows = session.execute(stmt).all()
+
+        desk_codes = []
+        bookings = []
+        for row in rows:
+            if not desk_codes or desk_codes[-1] != row.desk_code:
+                desk_codes.append(row.desk_code)
+            if row.booking_id is not None:
+                bookings.append(
+                    {
+                        "booking_id": row.booking_id,
+                        "desk_code": row.desk_code,
+                        "user_name": row.user_name,
+                        "start_date": row.start_date,
+                        "end_date": row.end_date,
+                        "status": row.status_name,
+                    }
+                )
+
+        return {"desks": desk_codes, "bookings": bookings, "version": version}
+    except Exception as exc:
+        logging.error(f"Error while fetching week occupancy for office {office_id} and floor {floor_id}: {exc}")
+        log_event(
+            get_current_user(),
+            "Failure",
+            "Occupancy",
+            f"Error while fetching week occupancy for office {office_id} and floor {floor_id}: {exc}",
+        )
+        return None
 
-        result = session.execute(stmt).first()
+
+def get_booked_desk_codes(
+    session_factory: Callable[[], Session],
+    office_id: int,
+    floor_id: int,
+    start_time_dt: datetime,
+    end_time_dt: datetime,
+    if_changed_since: Optional[int] = None,
+) -> tuple[set[str], int] | None:
+    """Fetch codes of desks on a floor which are booked in the given time range.
+
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :param office_id: The office ID
+    :param floor_id: The floor ID
+    :param start_time_dt: Start of the time range
+    :param end_time_dt: End of the time range
+    :param if_changed_since: Version of the caller's copy, NOT_MODIFIED is returned if the floor did not change
+    :return: A set of booked desk codes and the version, None on error
+    """
+    try:
+        with managed_session(session_factory, read_only=True) as session:
+            version = get_floor_version(session, floor_id, start_time_dt, end_time_dt)
+            if version == if_changed_since:
+                return NOT_MODIFIED
+
+            booked_desks = session.execute(
+                BOOKED_DESKS_ON_FLOOR,
+                {"office_id": office_id, "floor_id": floor_id, "start_date": start_time_dt, "end_date": end_time_dt},
+            )
+            return set(booked_desks.scalars().all()), version
+    except Exception as exc:
+        logging.error(f"Error while fetching booked desks for office {office_id} and floor {floor_id}: {exc}")
+        log_event(
+            get_current_user(),
+            "Failure",
+            "Desk selection",
+            f"Error while fetching booked desks for office {office_id} and floor {floor_id}: {exc}",
+        )
+        return None
+
+
+# PROJECT REQUIREMENT: complex query
+def get_most_reserved_desk(event: Event, session_factory: Callable[[], Session]):
+    """
+    Query the database to find the most reserved desk with additional location details.
+
+    :param event: The event that triggered the function
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :return: A dictionary containing desk details, location details, and reservation count
+    """
+    try:
+        with managed_session(session_factory, read_only=True) as session:
+            result = session.execute(MOST_RESERVED_DESK).first()
 
         if result:
             messagebox.showinfo(
@@ -354,10 +897,8 @@ def get_most_frequent_booker(event: Event, session_factory: Callable[[], Session
     :return: A dictionary containing user details and reservation count
     """
     try:
-        with managed_session(session_factory) as session:
-            with managed_session(session_factory) as session:
-                stmt = select(MostFrequentUser).order_by(MostFrequentUser.reservation_count.desc()).limit(1)
-                result = session.execute(stmt).scalars().first()
+        with managed_session(session_factory, read_only=True) as session:
+            result = session.execute(MOST_FREQUENT_USER).scalars().first()
 
             if result:
                 messagebox.showinfo(
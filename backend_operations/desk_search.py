@@ -0,0 +1,118 @@
+import re
+from typing import Optional
+
+
+# Maximum number of desks returned for a query
+SEARCH_RESULT_LIMIT = 50
+# Number of query terms whose matching desks are remembered, typing repeats the earlier terms on every key
+TERM_CACHE_SIZE = 256
+
+TOKEN_SEPARATORS = re.compile(r"[\s_\-,.;/]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split lower-cased text into search tokens.
+
+    :param text: The text to split
+    """
+    return [token for token in TOKEN_SEPARATORS.split(text.lower()) if token]
+
+
+class DeskSearchIndex:
+    """In-memory index for type-ahead desk search.
+
+    Every desk is searchable by the words of its code, office, floor, sector and description. Query terms shorter
+    than three characters match word prefixes, longer terms match anywhere inside a word. Terms are resolved on the
+    small word vocabulary (prefix and trigram indexes), each word maps to a bitset of desk positions, so combining
+    terms is a bitwise OR/AND and results come out in display order without sorting.
+    """
+
+    def __init__(self, desks: list[dict]):
+        """
+        :param desks: Desks in display order, dictionaries with desk_code, office_name, floor_name, sector_name
+            and optional description
+        """
+        self.desks = desks
+        word_positions: dict[str, list[int]] = {}
+
+        for position, desk in enumerate(desks):
+            text = " ".join(
+                value
+                for value in (
+                    desk["desk_code"],
+                    desk["office_name"],
+                    desk["floor_name"],
+                    desk["sector_name"],
+                    desk.get("description"),
+                )
+                if value
+            )
+            for word in set(tokenize(text)):
+                word_positions.setdefault(word, []).append(position)
+
+        # word -> bitset of desk positions
+        self.word_bits: dict[str, int] = {}
+        # one and two letter prefix -> words, trigram -> words
+        self.prefix_words: dict[str, set[str]] = {}
+        self.trigram_words: dict[str, set[str]] = {}
+
+        for word, positions in word_positions.items():
+            bitmap = bytearray(len(desks) // 8 + 1)
+            for position in positions:
+                bitmap[position >> 3] |= 1 << (position & 7)
+            self.word_bits[word] = int.from_bytes(bitmap, "little")
+
+            for length in (1, 2):
+                self.prefix_words.setdefault(word[:length], set()).add(word)
+            for index in range(len(word) - 2):
+                self.trigram_words.setdefault(word[index : index + 3], set()).add(word)
+
+        self.term_cache: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.desks)
+
+    def term_bits(self, term: str) -> int:
+        """Return the bitset of desks having a word that matches the term."""
+        if term in self.term_cache:
+            return self.term_cache[term]
+
+        if len(term) < 3:
+            words = self.prefix_words.get(term, set())
+        else:
+            trigram_sets = [self.trigram_words.get(term[index : index + 3], set()) for index in range(len(term) - 2)]
+            words = {word for word in set.intersection(*trigram_sets) if term in word}
+
+        bits = 0
+        for word in words:
+            bits |= self.word_bits[word]
+
+        if len(self.term_cache) >= TERM_CACHE_SIZE:
+            self.term_cache.clear()
+        self.term_cache[term] = bits
+        return bits
+
+    def search(self, query: str, limit: Optional[int] = SEARCH_RESULT_LIMIT) -> list[dict]:
+        """
+        Return desks matching all terms of the query, in display order.
+
+        :param query: Text typed by the user
+        :param limit: Maximum number of returned desks, None returns all matches
+        """
+        terms = tokenize(query)
+        if not terms:
+            return self.desks[:limit]
+
+        bits = -1
+        for term in terms:
+            bits &= self.term_bits(term)
+            if not bits:
+                return []
+
+        results = []
+        while bits and (limit is None or len(results) < limit):
+            lowest_bit = bits & -bits
+            results.append(self.desks[lowest_bit.bit_length() - 1])
+            bits ^= lowest_bit
+        return results
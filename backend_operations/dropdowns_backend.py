@@ -3,21 +3,42 @@ from typing import Callable, Optional
 from sqlalchemy.sql import select
 from sqlalchemy.orm import Session
 
-from db.db_models import Office, Floor, Sector, Desk
+from db.db_models import Office, Floor, Sector, Desk, DeskGeometry
 from db.session_management import managed_session
+from db.local_cache import (
+    get_cached_offices,
+    get_cached_floors,
+    get_cached_sectors,
+    get_cached_desks,
+    get_cached_desk_sector,
+    get_cached_floor_desk_map,
+)
 from backend_operations.log_utils import log_event
 from backend_operations.user_login import get_current_user
+from backend_operations.statements import (
+    OFFICES,
+    FLOORS_IN_OFFICE,
+    SECTORS_ON_FLOOR,
+    DESKS_ON_FLOOR,
+    DESKS_IN_SECTOR,
+    DESK_SECTOR,
+)
 
 
-def get_available_offices(session_factory: Callable[[], Session]) -> list[str]:
+def get_available_offices(session_factory: Callable[[], Session]) -> list[tuple[int, str]]:
     """Fetch all available offices.
 
-    :param session_factory: A callable that returns a SQLAlchemy session"""
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :return: A list of (office_id, office_name) tuples"""
+    # Topology is served from the local cache, the server is queried only while the cache is still empty
+    cached_offices = get_cached_offices()
+    if cached_offices:
+        return cached_offices
+
     try:
-        with managed_session(session_factory) as session:
-            stmt = select(Office.office_name)
-            offices = session.execute(stmt).scalars().all()
-        return list(offices)
+        with managed_session(session_factory, read_only=True) as session:
+            offices = session.execute(OFFICES).all()
+        return [(office.office_id, office.office_name) for office in offices]
     except Exception as exc:
         logging.error(f"Error fetching available offices: {exc}")
         log_event(
@@ -29,22 +50,22 @@ def get_available_offices(session_factory: Callable[[], Session]) -> list[str]:
         return []
 
 
-def get_floors_in_office(session_factory: Callable[[], Session], office_name: str) -> list[str]:
+def get_floors_in_office(session_factory: Callable[[], Session], office_id: int) -> list[tuple[int, str]]:
     """Fetch all floors for a given office.
 
     :param session_factory: A callable that returns a SQLAlchemy session
-    :param office_name: The office name"""
+    :param office_id: The office ID
+    :return: A list of (floor_id, floor_name) tuples"""
+    cached_floors = get_cached_floors(office_id)
+    if cached_floors:
+        return cached_floors
+
     try:
-        with managed_session(session_factory) as session:
-            stmt = (
-                select(Floor.floor_name)
-                .join(Office, Office.office_id == Floor.office_id)
-                .where(Office.office_name == office_name)
-            )
-            floors = session.execute(stmt).scalars().all()
-        return list(floors)
+        with managed_session(session_factory, read_only=True) as session:
+            floors = session.execute(FLOORS_IN_OFFICE, {"office_id": office_id}).all()
+        return [(floor.floor_id, floor.floor_name) for floor in floors]
     except Exception as exc:
-        logging.error(f"Error fetching floors for office '{office_name}': {exc}")
+        logging.error(f"Error fetching floors for office {office_id}: {exc}")
         log_event(
             get_current_user(),
             "Failure",
@@ -54,22 +75,22 @@ def get_floors_in_office(session_factory: Callable[[], Session], office_name: st
         return []
 
 
-def get_sectors_on_floor(session_factory: Callable[[], Session], floor_name: str) -> list[str]:
+def get_sectors_on_floor(session_factory: Callable[[], Session], floor_id: int) -> list[tuple[int, str]]:
     """Fetch all sectors for a given floor.
 
     :param session_factory: A callable that returns a SQLAlchemy session
-    :param floor_name: The floor name"""
+    :param floor_id: The floor ID
+    :return: A list of (sector_id, sector_name) tuples"""
+    cached_sectors = get_cached_sectors(floor_id)
+    if cached_sectors:
+        return cached_sectors
+
     try:
-        with managed_session(session_factory) as session:
-            stmt = (
-                select(Sector.sector_name)
-                .join(Floor, Floor.floor_id == Sector.floor_id)
-                .where(Floor.floor_name == floor_name)
-            )
-            sectors = session.execute(stmt).scalars().all()
-        return list(sectors)
+        with managed_session(session_factory, read_only=True) as session:
+            sectors = session.execute(SECTORS_ON_FLOOR, {"floor_id": floor_id}).all()
+        return [(sector.sector_id, sector.sector_name) for sector in sectors]
     except Exception as exc:
-        logging.error(f"Error fetching sectors for floor '{floor_name}': {exc}")
+        logging.error(f"Error fetching sectors for floor {floor_id}: {exc}")
         log_event(
             get_current_user(),
             "Failure",
@@ -80,51 +101,137 @@ def get_sectors_on_floor(session_factory: Callable[[], Session], floor_name: str
 
 
 def get_desks_on_floor(
-    session_factory: Callable[[], Session], floor_name: str, sector_name: Optional[str]
+    session_factory: Callable[[], Session], office_id: int, floor_id: int, sector_id: Optional[int]
 ) -> list[str]:
     """Fetch desks for a specific floor.
 
     :param session_factory: A callable that returns a SQLAlchemy session
-    :param floor_name: The floor name"""
-    try:
-        with managed_session(session_factory) as session:
-            stmt = (
-                select(Desk.desk_code)
-                .join(Floor, Floor.floor_id == Desk.floor_id)
-                .where(Floor.floor_name == floor_name)
-            )
+    :param office_id: The office ID
+    :param floor_id: The floor ID
+    :param sector_id: Optional sector ID"""
+    cached_desks = get_cached_desks(office_id, floor_id, sector_id)
+    if cached_desks:
+        return cached_desks
 
-            # If sector_name is provided, add a filter for the sector
-            if sector_name:
-                stmt = stmt.join(Sector, Sector.sector_id == Desk.sector_id).where(Sector.sector_name == sector_name)
-            desks = session.execute(stmt).scalars().all()
+    try:
+        with managed_session(session_factory, read_only=True) as session:
+            stmt_params = {"office_id": office_id, "floor_id": floor_id}
+            # If sector_id is provided, add a filter for the sector
+            if sector_id:
+                desks = session.execute(DESKS_IN_SECTOR, {**stmt_params, "sector_id": sector_id}).scalars().all()
+            else:
+                desks = session.execute(DESKS_ON_FLOOR, stmt_params).scalars().all()
         return list(desks)
     except Exception as exc:
-        logging.error(f"Error fetching desks for floor '{floor_name}' and sector '{sector_name}': {exc}")
+        logging.error(f"Error fetching desks for floor {floor_id} and sector {sector_id}: {exc}")
         log_event(
             get_current_user(), "Failure", "Desk selection", f"Exception occured while fetching available desks: {exc}"
         )
         return []
 
 
-def get_desk_sector(session_factory: Callable[[], Session], desk_code: str) -> str | None:
+def get_desk_sector(session_factory: Callable[[], Session], desk_code: str) -> tuple[int, str] | None:
     """Fetch the sector for a given desk.
 
     :param session_factory: A callable that returns a SQLAlchemy session
     :param desk_code: The desk code
+    :return: A (sector_id, sector_name) tuple
     """
+    cached_sector = get_cached_desk_sector(desk_code)
+    if cached_sector:
+        return cached_sector
+
     try:
-        with managed_session(session_factory) as session:
-            stmt = (
-                select(Sector.sector_name)
-                .join(Desk, Desk.sector_id == Sector.sector_id)
-                .where(Desk.desk_code == desk_code)
-            )
-            sector = session.execute(stmt).scalar_one()
-        return sector
+        with managed_session(session_factory, read_only=True) as session:
+            sector = session.execute(DESK_SECTOR, {"desk_code": desk_code}).one()
+        return sector.sector_id, sector.sector_name
     except Exception as exc:
         logging.error(f"Error fetching sector for desk '{desk_code}': {exc}")
         log_event(
             get_current_user(), "Failure", "Desk selection", f"Exception occured while fetching desk sector: {exc}"
         )
         return None
+
+
+def get_floor_desk_map(session_factory: Callable[[], Session], office_id: int, floor_id: int) -> list[dict]:
+    """Fetch desks of a floor together with their sector and map geometry.
+
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :param office_id: The office ID
+    :param floor_id: The floor ID
+    :return: A list of dictionaries with desk code, sector ID and name, local id and polygon points
+    """
+    cached_desks = get_cached_floor_desk_map(office_id, floor_id)
+    if cached_desks:
+        return cached_desks
+
+    try:
+        with managed_session(session_factory, read_only=True) as session:
+            stmt = (
+                select(Desk.desk_code, Desk.local_id, Sector.sector_id, Sector.sector_name, DeskGeometry.polygon)
+                .join(Sector, Sector.sector_id == Desk.sector_id)
+                .join(DeskGeometry, DeskGeometry.desk_id == Desk.desk_id)
+                .where(Desk.office_id == office_id, Desk.floor_id == floor_id)
+                .order_by(Sector.sector_name, Desk.local_id)
+            )
+            rows = session.execute(stmt).all()
+
+        return [
+            {
+                "desk_code": row.desk_code,
+                "local_id": row.local_id,
+                "sector_id": row.sector_id,
+                "sector_name": row.sector_name,
+                "polygon": [tuple(float(value) for value in point.split(",")) for point in row.polygon.split()],
+            }
+            for row in rows
+        ]
+    except Exception as exc:
+        logging.error(f"Error fetching desk map for office {office_id} and floor {floor_id}: {exc}")
+        log_event(get_current_user(), "Failure", "Desk selection", f"Exception occured while fetching desk map: {exc}")
+        return []
+
+
+def get_desk_search_entries(session_factory: Callable[[], Session]) -> list[dict]:
+    """Fetch all desks with their location and description for the desk search index.
+
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :return: A list of dictionaries with desk code, office, floor and sector IDs and names and description
+    """
+    try:
+        with managed_session(session_factory, read_only=True) as session:
+            stmt = (
+                select(
+                    Desk.desk_code,
+                    Desk.description,
+                    Office.office_id,
+                    Office.office_name,
+                    Floor.floor_id,
+                    Floor.floor_name,
+                    Sector.sector_id,
+                    Sector.sector_name,
+                )
+                .join(Office, Office.office_id == Desk.office_id)
+                .join(Floor, Floor.floor_id == Desk.floor_id)
+                .join(Sector, Sector.sector_id == Desk.sector_id)
+                .order_by(Office.office_name, Floor.floor_name, Sector.sector_name, Desk.local_id)
+            )
+            rows = session.execute(stmt).all()
+
+        return [
+            {
+                "desk_code": row.desk_code,
+                "office_id": row.office_id,
+                "office_name": row.office_name,
+                "floor_id": row.floor_id,
+                "floor_name": row.floor_name,
+                "sector_id": row.sector_id,
+                "sector_name": row.sector_name,
+                "description": row.description,
+            }
+            for row in rows
+        ]
+    except Exception as exc:
+        logging.error(f"Error fetching desks for search: {exc}")
+        log_event(get_current_user(), "Failure", "Desk selection", f"Exception occured while fetching desks: {exc}")
+        return []
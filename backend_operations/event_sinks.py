@@ -0,0 +1,235 @@
+import os
+import sys
+import time
+import atexit
+import random
+import logging
+import threading
+import logging.handlers
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+from collections import OrderedDict
+
+
+class EventRoute(NamedTuple):
+    """Where events of a type are written and how many of them."""
+
+    # Names of the registered sinks receiving the events
+    sinks: tuple[str, ...]
+    # Share of the events passed on, 0.1 keeps one in ten
+    sample_rate: float = 1.0
+    # Identical events within this window are written once, followed by a count of the repeats, 0 disables it
+    dedup_seconds: float = 0
+
+
+# Routes are looked up by event code ("booking.failed"), its suffix ("*.failed"), its prefix ("booking"), the
+# lower-cased event type ("failure") and finally "*". Audit events with event codes always reach the database
+# unsampled. Failures are repeated by every click on a broken screen, so identical ones, failed bookings included,
+# are collapsed and written to the database once per window instead of once per occurrence. Failed logins are
+# exempt, each of them is written as it happens.
+AUDIT_ROUTE = EventRoute(("database",))
+FAILURE_ROUTE = EventRoute(("file", "database"), dedup_seconds=60)
+EVENT_ROUTES: dict[str, EventRoute] = {
+    # Every failed login is a security audit record and is written as it happens
+    "login.failed": AUDIT_ROUTE,
+    "*.failed": FAILURE_ROUTE,
+    "booking": AUDIT_ROUTE,
+    "waitlist": AUDIT_ROUTE,
+    "login": AUDIT_ROUTE,
+    "admin": AUDIT_ROUTE,
+    "failure": FAILURE_ROUTE,
+    "*": EventRoute(("database",)),
+}
+
+EVENT_LOG_PATH = os.path.join(os.path.expanduser("~"), ".desk_booking_system", "events.log")
+EVENT_LOG_MAX_BYTES = 5 * 1024 * 1024
+EVENT_LOG_BACKUP_COUNT = 5
+
+# Sink name -> callable writing one event record, a dict with the columns of the logs table
+SINKS: dict[str, Callable[[dict], None]] = {}
+
+# Open dedup windows by event key, oldest first:
+# (route, first record, occurrence count, first seen, last seen, wall-clock time of the last occurrence)
+dedup_windows: OrderedDict = OrderedDict()
+dedup_lock = threading.Lock()
+# Seconds a window timer waits beyond the window, so the window has run out when the timer fires
+DEDUP_TIMER_MARGIN = 0.1
+
+
+def write_stdout(record: dict) -> None:
+    """Print an event record."""
+    print(format_event(record), file=sys.stdout, flush=True)
+
+
+class RotatingFileSink:
+    """Appends event records to a size-rotated file, opened on the first event."""
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.handler: Optional[logging.handlers.RotatingFileHandler] = None
+        self.lock = threading.Lock()
+
+    def __call__(self, record: dict) -> None:
+        with self.lock:
+            if self.handler is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self.handler = logging.handlers.RotatingFileHandler(
+                    self.path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8"
+                )
+            self.handler.emit(logging.makeLogRecord({"msg": format_event(record), "levelno": logging.INFO}))
+
+
+def format_event(record: dict) -> str:
+    """Format an event record as a single line."""
+    line = (
+        f"{record['created_at']:%Y-%m-%d %H:%M:%S} {record['event_type']} [{record['component']}] "
+        f"{record['user_name']}: {record['event_description']}"
+    )
+    if record.get("event_code"):
+        line += f" ({record['event_code']})"
+    return line
+
+
+def register_sink(name: str, sink: Callable[[dict], None]) -> None:
+    """
+    Make a sink available to the routes.
+
+    :param name: Name used in EventRoute.sinks
+    :param sink: Callable writing one event record
+    """
+    SINKS[name] = sink
+
+
+def configure_event_routes(routes: dict[str, EventRoute]) -> None:
+    """
+    Add or replace routes, e.g. to sample successful events of a busy office or to send failures to stdout.
+
+    :param routes: Routes by event code, "*." and event code suffix, event code prefix, lower-cased event type or "*"
+    """
+    unknown = {name for route in routes.values() for name in route.sinks} - SINKS.keys()
+    if unknown:
+        raise ValueError(f"Unknown event sinks: {', '.join(sorted(unknown))}.")
+    EVENT_ROUTES.update(routes)
+
+
+def find_route(record: dict) -> EventRoute:
+    """Return the most specific route of an event record."""
+    event_code = record.get("event_code") or ""
+    suffix_key = f"*.{event_code.rsplit('.', 1)[-1]}" if "." in event_code else ""
+    for key in (event_code, suffix_key, event_code.split(".")[0], record["event_type"].lower(), "*"):
+        if key in EVENT_ROUTES:
+            return EVENT_ROUTES[key]
+    return EventRoute(())
+
+
+def summarize_repeats(record: dict, count: int, first_seen: float, last_seen: float, last_at: datetime) -> dict:
+    """
+    Return the record written when a dedup window closes, carrying the number of occurrences and when they
+    happened, so audits by time range can place repeats written after the window closed.
+    """
+    return {
+        **record,
+        "created_at": datetime.now(),
+        "event_description": f"{record['event_description']} (occurred {count} times "
+        f"within {last_seen - first_seen:.0f} s)",
+        "payload": {
+            **(record.get("payload") or {}),
+            "occurrences": count,
+            "first_seen": record["created_at"].isoformat(),
+            "last_seen": last_at.isoformat(),
+        },
+    }
+
+
+def close_expired_windows(now: float, close_all: bool = False) -> list[tuple[EventRoute, dict]]:
+    """
+    Close dedup windows which ran out, the caller holds dedup_lock. Windows are closed in the order they
+    were opened, a shorter window opened after a longer one is closed with it.
+
+    :param now: Current time.monotonic()
+    :param close_all: Close open windows as well, used when the app exits
+    :return: Summaries of the events which occurred more than once, with their routes
+    """
+    summaries = []
+    while dedup_windows:
+        key, (route, record, count, first_seen, last_seen, last_at) = next(iter(dedup_windows.items()))
+        if not close_all and now - first_seen < route.dedup_seconds:
+            break
+        del dedup_windows[key]
+        if count > 1:
+            summaries.append((route, summarize_repeats(record, count, first_seen, last_seen, last_at)))
+    return summaries
+
+
+def write_to_sinks(route: EventRoute, record: dict) -> None:
+    """Write a record to every sink of its route, a failing sink does not stop the others."""
+    for name in route.sinks:
+        try:
+            SINKS[name](record)
+        except Exception as exc:
+            logging.error(f"Event sink '{name}' failed: {exc}")
+
+
+def close_due_windows() -> None:
+    """Write the counts of dedup windows which ran out, run by the timer started with each window."""
+    with dedup_lock:
+        summaries = close_expired_windows(time.monotonic())
+    for route, summary in summaries:
+        write_to_sinks(route, summary)
+
+
+def dispatch_event(record: dict) -> None:
+    """
+    Route an event record to its sinks after deduplication and sampling.
+    Repeats of an identical event within the dedup window are only counted, the count is written when the
+    window closes. Windows are closed by a timer, by later events and when the app exits.
+
+    :param record: The event, a dict with the columns of the logs table
+    """
+    route = find_route(record)
+    now = time.monotonic()
+    write = True
+
+    with dedup_lock:
+        summaries = close_expired_windows(now)
+        if route.dedup_seconds:
+            key = (
+                record["event_type"],
+                record["component"],
+                record["user_name"],
+                record.get("event_code"),
+                record["event_description"],
+            )
+            window = dedup_windows.get(key)
+            if window:
+                dedup_windows[key] = window[:2] + (window[2] + 1, window[3], now, record["created_at"])
+                write = False
+            else:
+                dedup_windows[key] = (route, record, 1, now, now, record["created_at"])
+                # Closes the window on time in an idle session, the margin covers the timer's clock
+                timer = threading.Timer(route.dedup_seconds + DEDUP_TIMER_MARGIN, close_due_windows)
+                timer.daemon = True
+                timer.start()
+
+    for summary_route, summary in summaries:
+        write_to_sinks(summary_route, summary)
+
+    if write and (route.sample_rate >= 1 or random.random() < route.sample_rate):
+        if route.sample_rate < 1:
+            record["payload"] = {**(record.get("payload") or {}), "sample_rate": route.sample_rate}
+        write_to_sinks(route, record)
+
+
+def flush_event_windows() -> None:
+    """Write the counts of all open dedup windows."""
+    with dedup_lock:
+        summaries = close_expired_windows(time.monotonic(), close_all=True)
+    for route, summary in summaries:
+        write_to_sinks(route, summary)
+
+
+register_sink("stdout", write_stdout)
+register_sink("file", RotatingFileSink(EVENT_LOG_PATH, EVENT_LOG_MAX_BYTES, EVENT_LOG_BACKUP_COUNT))
+atexit.register(flush_event_windows)
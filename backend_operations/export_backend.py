@@ -0,0 +1,292 @@
+import csv
+import logging
+import argparse
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import Integer, DateTime, String
+from sqlalchemy.sql import select, cast, Select
+from sqlalchemy.orm import Session
+
+from db.db_models import AllBooking, User, Desk, Floor, Office, Status, Log
+from db.sql_db import SessionFactory, route_reads
+
+
+# Number of rows fetched from the server-side cursor and written at once
+EXPORT_CHUNK_SIZE = 10000
+EXPORT_FORMATS = ("csv", "parquet")
+
+
+def build_bookings_export_query(
+    office_name: Optional[str] = None,
+    floor_name: Optional[str] = None,
+    user_name: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> Select:
+    """
+    Build the query exporting bookings, including the ones moved to history.
+
+    :param office_name: Only export bookings in this office
+    :param floor_name: Only export bookings on this floor of the office, floor names repeat across offices
+    :param user_name: Only export bookings of this user
+    :param start_date: Only export bookings starting at or after this date
+    :param end_date: Only export bookings starting before this date
+    """
+    if floor_name and not office_name:
+        raise ValueError("Floor names repeat across offices, select the office of the floor as well.")
+
+    stmt = (
+        select(
+            AllBooking.booking_id,
+            User.user_name,
+            Desk.desk_code,
+            Office.office_name,
+            Floor.floor_name,
+            AllBooking.start_date,
+            AllBooking.end_date,
+            Status.status_name,
+            AllBooking.created_at,
+        )
+        .join(User, User.user_id == AllBooking.user_id)
+        .join(Desk, Desk.desk_id == AllBooking.desk_id)
+        .join(Floor, Floor.floor_id == Desk.floor_id)
+        .join(Office, Office.office_id == Desk.office_id)
+        .join(Status, Status.status_id == AllBooking.status_id)
+        .order_by(AllBooking.start_date, AllBooking.booking_id)
+    )
+
+    if office_name:
+        stmt = stmt.where(Office.office_name == office_name)
+    if floor_name:
+        stmt = stmt.where(Floor.floor_name == floor_name)
+    if user_name:
+        stmt = stmt.where(User.user_name == user_name)
+    if start_date:
+        stmt = stmt.where(AllBooking.start_date >= start_date)
+    if end_date:
+        stmt = stmt.where(AllBooking.start_date < end_date)
+
+    return stmt
+
+
+def build_logs_export_query(
+    user_name: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> Select:
+    """
+    Build the query exporting logs, date range bounds prune the scan to the matching monthly partitions.
+
+    :param user_name: Only export logs of this user
+    :param start_date: Only export logs created at or after this date
+    :param end_date: Only export logs created before this date
+    """
+    stmt = select(
+        Log.log_id,
+        Log.user_name,
+        Log.event_type,
+        Log.component,
+        Log.event_description,
+        Log.event_code,
+        Log.booking_id,
+        Log.desk_code,
+        Log.floor_id,
+        Log.latency_ms,
+        # JSON text, CSV and Parquet have no nested column type used by the exports
+        cast(Log.payload, String).label("payload"),
+        Log.created_at,
+    ).order_by(Log.created_at, Log.log_id)
+
+    if user_name:
+        stmt = stmt.where(Log.user_name == user_name)
+    if start_date:
+        stmt = stmt.where(Log.created_at >= start_date)
+    if end_date:
+        stmt = stmt.where(Log.created_at < end_date)
+
+    return stmt
+
+
+def get_parquet_schema(stmt: Select):
+    """
+    Map the selected columns to a pyarrow schema, so every chunk is written with the same column types.
+
+    :param stmt: The export query
+    """
+    import pyarrow
+
+    fields = []
+    for column in stmt.selected_columns:
+        if isinstance(column.type, Integer):
+            field_type = pyarrow.int64()
+        elif isinstance(column.type, DateTime):
+            field_type = pyarrow.timestamp("us")
+        else:
+            field_type = pyarrow.string()
+        fields.append(pyarrow.field(column.name, field_type))
+    return pyarrow.schema(fields)
+
+
+def export_rows(stmt: Select, output_path: str, file_format: str = "csv", chunk_size: int = EXPORT_CHUNK_SIZE) -> int:
+    """
+    Stream query results into a CSV or Parquet file with constant memory.
+    Rows are fetched from a server-side cursor and written chunk by chunk.
+
+    :param stmt: The export query
+    :param output_path: Path of the output file
+    :param file_format: Either 'csv' or 'parquet'
+    :param chunk_size: Number of rows fetched and written at once
+    :return: Number of exported rows
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{file_format}', use one of: {', '.join(EXPORT_FORMATS)}.")
+
+    if file_format == "parquet":
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquet export requires the 'pyarrow' package to be installed.")
+
+    session: Session = SessionFactory()
+    exported_rows = 0
+
+    try:
+        # Bulk reads go to the read replica, the cursor is opened while the session is marked read-only
+        with route_reads(session):
+            result = session.execute(stmt.execution_options(yield_per=chunk_size))
+        column_names = list(result.keys())
+
+        if file_format == "csv":
+            with open(output_path, "w", newline="") as output_file:
+                writer = csv.writer(output_file)
+                writer.writerow(column_names)
+                for chunk in result.partitions():
+                    writer.writerows(chunk)
+                    exported_rows += len(chunk)
+        else:
+            schema = get_parquet_schema(stmt)
+            with pyarrow.parquet.ParquetWriter(output_path, schema) as writer:
+                for chunk in result.partitions():
+                    columns = [list(column) for column in zip(*chunk)]
+                    writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+                    exported_rows += len(chunk)
+
+        logging.info(f"Exported {exported_rows} rows to '{output_path}'.")
+        return exported_rows
+    except Exception as exc:
+        logging.error(f"Error while exporting rows to '{output_path}': {exc}")
+        raise
+    finally:
+        session.close()
+
+
+def export_bookings(
+    output_path: str,
+    file_format: str = "csv",
+    office_name: Optional[str] = None,
+    floor_name: Optional[str] = None,
+    user_name: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> int:
+    """
+    Export bookings matching the filters to a CSV or Parquet file.
+
+    :param output_path: Path of the output file
+    :param file_format: Either 'csv' or 'parquet'
+    :param office_name: Only export bookings in this office
+    :param floor_name: Only export bookings on this floor of the office
+    :param user_name: Only export bookings of this user
+    :param start_date: Only export bookings starting at or after this date
+    :param end_date: Only export bookings starting before this date
+    :param chunk_size: Number of rows fetched and written at once
+    :return: Number of exported rows
+    """
+    stmt = build_bookings_export_query(office_name, floor_name, user_name, start_date, end_date)
+    return export_rows(stmt, output_path, file_format, chunk_size)
+
+
+def export_logs(
+    output_path: str,
+    file_format: str = "csv",
+    user_name: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> int:
+    """
+    Export logs matching the filters to a CSV or Parquet file.
+
+    :param output_path: Path of the output file
+    :param file_format: Either 'csv' or 'parquet'
+    :param user_name: Only export logs of this user
+    :param start_date: Only export logs created at or after this date
+    :param end_date: Only export logs created before this date
+    :param chunk_size: Number of rows fetched and written at once
+    :return: Number of exported rows
+    """
+    stmt = build_logs_export_query(user_name, start_date, end_date)
+    return export_rows(stmt, output_path, file_format, chunk_size)
+
+
+def parse_export_date(date_str: str) -> datetime:
+    """Parse a date given as YYYY-MM-DD or YYYY-MM-DD HH:MM."""
+    for date_format in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(date_str, date_format)
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"Invalid date '{date_str}', expected YYYY-MM-DD or 'YYYY-MM-DD HH:MM'.")
+
+
+def add_export_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the export command line arguments to a parser.
+
+    :param parser: The argument parser
+    """
+    parser.add_argument("table", choices=("bookings", "logs"), help="What to export")
+    parser.add_argument("output_path", help="Path of the output file")
+    parser.add_argument("--format", dest="file_format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--office", dest="office_name", help="Office name (bookings only)")
+    parser.add_argument("--floor", dest="floor_name", help="Floor name, requires --office (bookings only)")
+    parser.add_argument("--user", dest="user_name", help="User email")
+    parser.add_argument("--start", dest="start_date", type=parse_export_date, help="Start of the date range")
+    parser.add_argument("--end", dest="end_date", type=parse_export_date, help="End of the date range (exclusive)")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+
+
+def run_export(args: argparse.Namespace) -> int:
+    """
+    Run the export described by parsed command line arguments.
+
+    :param args: Arguments parsed with a parser set up by add_export_arguments
+    :return: Number of exported rows
+    """
+    if args.table == "bookings":
+        return export_bookings(
+            args.output_path,
+            args.file_format,
+            args.office_name,
+            args.floor_name,
+            args.user_name,
+            args.start_date,
+            args.end_date,
+            args.chunk_size,
+        )
+
+    if args.office_name or args.floor_name:
+        raise ValueError("Office and floor filters are only supported for bookings export.")
+    return export_logs(
+        args.output_path, args.file_format, args.user_name, args.start_date, args.end_date, args.chunk_size
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    export_parser = argparse.ArgumentParser(description="Export bookings or logs to a CSV or Parquet file.")
+    add_export_arguments(export_parser)
+    run_export(export_parser.parse_args())
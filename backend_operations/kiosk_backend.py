@@ -0,0 +1,128 @@
+import logging
+from typing import NamedTuple, Optional
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.sql import select
+from sqlalchemy.orm import Session
+
+from db.db_models import Office, Floor, Log
+from db.sql_db import SessionFactory
+from backend_operations.log_utils import BOOKING_CHECKED_IN
+from backend_operations.slot_calendar import is_check_in_open
+from backend_operations.statements import CHECK_IN_PENDING_BOOKING, PENDING_BOOKINGS_ON_FLOOR
+
+
+class KioskBooking(NamedTuple):
+    """A pending booking of the kiosk's floor."""
+
+    booking_id: int
+    user_name: str
+    desk_code: str
+    start_date: datetime
+    end_date: datetime
+
+
+class FloorCheckInState:
+    """Pending bookings of a floor for one day, indexed by user and by desk.
+
+    A user or desk has only a few bookings a day, so finding the booking to check in is a dictionary lookup
+    followed by a scan of at most a handful of entries.
+    """
+
+    def __init__(self, office_name: str, floor_name: str, day: date, bookings: list[KioskBooking]):
+        self.office_name = office_name
+        self.floor_name = floor_name
+        self.day = day
+        self.by_user: dict[str, list[KioskBooking]] = {}
+        self.by_desk: dict[str, list[KioskBooking]] = {}
+        # Bookings checked in at this kiosk, including check-ins still running
+        self.checked_in_ids: set[int] = set()
+
+        for booking in bookings:
+            self.by_user.setdefault(booking.user_name.lower(), []).append(booking)
+            self.by_desk.setdefault(booking.desk_code.lower(), []).append(booking)
+
+    def __len__(self) -> int:
+        return sum(len(bookings) for bookings in self.by_user.values())
+
+    def find(self, user_or_desk: str, now: datetime) -> Optional[KioskBooking]:
+        """
+        Return the booking of a user or desk whose check-in window is open.
+
+        :param user_or_desk: User email or desk code, case insensitive
+        :param now: The current moment
+        """
+        key = user_or_desk.strip().lower()
+        for booking in self.by_user.get(key) or self.by_desk.get(key) or []:
+            if booking.booking_id not in self.checked_in_ids and is_check_in_open(booking.start_date, now):
+                return booking
+        return None
+
+
+def load_floor_check_in_state(office_id: int, floor_id: int, day: date) -> FloorCheckInState:
+    """
+    Load the pending bookings of a floor starting on a day. Runs in worker threads,
+    every thread uses its own session of the scoped session factory.
+
+    :param office_id: ID of the office
+    :param floor_id: ID of the floor
+    :param day: The day
+    """
+    session: Session = SessionFactory()
+    try:
+        office_name, floor_name = session.execute(
+            select(Office.office_name, Floor.floor_name)
+            .join(Floor, Floor.office_id == Office.office_id)
+            .where(Office.office_id == office_id, Floor.floor_id == floor_id)
+        ).one()
+        start_date = datetime.combine(day, datetime.min.time())
+        rows = session.execute(
+            PENDING_BOOKINGS_ON_FLOOR,
+            {
+                "office_id": office_id,
+                "floor_id": floor_id,
+                "start_date": start_date,
+                "end_date": start_date + timedelta(days=1),
+            },
+        ).all()
+        return FloorCheckInState(office_name, floor_name, day, [KioskBooking(*row) for row in rows])
+    finally:
+        session.close()
+        SessionFactory.remove()
+
+
+def check_in_kiosk_booking(booking: KioskBooking, floor_id: int) -> bool:
+    """
+    Check in a booking at the kiosk. The booking is activated with a single statement and the check-in
+    is logged in the same transaction. Runs in worker threads, so check-ins of a burst of arrivals run in parallel.
+
+    :param booking: The booking
+    :param floor_id: ID of the kiosk's floor, stored with the check-in log
+    :return: True if the booking was checked in, False if it is no longer pending
+    """
+    session: Session = SessionFactory()
+    try:
+        checked_in = session.execute(CHECK_IN_PENDING_BOOKING, {"checked_in_booking_id": booking.booking_id}).first()
+        if checked_in:
+            session.execute(
+                insert(Log).values(
+                    user_name=booking.user_name,
+                    event_type="Success",
+                    component="Check-in",
+                    event_description=f"User checked in at the kiosk for booking ID: {booking.booking_id}",
+                    event_code=BOOKING_CHECKED_IN,
+                    booking_id=booking.booking_id,
+                    desk_code=booking.desk_code,
+                    floor_id=floor_id,
+                )
+            )
+        session.commit()
+        logging.info(f"Kiosk check-in of booking {booking.booking_id}: {'done' if checked_in else 'not pending'}.")
+        return checked_in is not None
+    except Exception as exc:
+        session.rollback()
+        logging.error(f"Error during kiosk check-in of booking {booking.booking_id}: {exc}")
+        raise
+    finally:
+        session.close()
+        SessionFactory.remove()
@@ -1,32 +1,224 @@
 import logging
+from typing import NamedTuple, Optional
+from datetime import datetime
+from sqlalchemy import select, insert
+from sqlalchemy.sql import func, tuple_, ColumnElement
 from sqlalchemy.orm import Session
 
-from db.db_models import Log
-from db.sql_db import SessionFactory
+from db.db_models import Log, Desk
+from db.sql_db import SessionFactory, route_reads
+from backend_operations.event_sinks import dispatch_event, register_sink
 
 
-def log_event(user_email: str, event_type: str, component: str, event_description: str) -> None:
+# Event codes of structured log records, audits filter on them instead of matching descriptions
+BOOKING_CREATED = "booking.created"
+BOOKING_ASSIGNED = "booking.assigned"
+# The desk or the user is already booked for the time range
+BOOKING_CONFLICT = "booking.conflict"
+BOOKING_FAILED = "booking.failed"
+BOOKING_CANCELED = "booking.canceled"
+BOOKING_CHECKED_IN = "booking.checked_in"
+BOOKING_MOVED = "booking.moved"
+BOOKING_CLOSED = "booking.closed"
+DESKS_CLOSED = "admin.desks_closed"
+WAITLIST_JOINED = "waitlist.joined"
+# Written by the promote_waitlist trigger
+WAITLIST_PROMOTED = "waitlist.promoted"
+LOGIN_SUCCEEDED = "login.succeeded"
+LOGIN_FAILED = "login.failed"
+
+
+class LogFilter(NamedTuple):
+    """Filters of audit log queries, the time range prunes the scan to the matching monthly partitions."""
+
+    start_date: datetime
+    end_date: datetime
+    event_codes: Optional[list[str]] = None
+    event_type: Optional[str] = None
+    component: Optional[str] = None
+    user_name: Optional[str] = None
+    floor_id: Optional[int] = None
+    desk_code: Optional[str] = None
+    booking_id: Optional[int] = None
+
+    def conditions(self) -> list[ColumnElement]:
+        """Return the conditions of the set filters."""
+        conditions = [Log.created_at >= self.start_date, Log.created_at < self.end_date]
+        if self.event_codes:
+            conditions.append(Log.event_code.in_(self.event_codes))
+        if self.event_type:
+            conditions.append(Log.event_type == self.event_type)
+        if self.component:
+            conditions.append(Log.component == self.component)
+        if self.user_name:
+            conditions.append(Log.user_name == self.user_name)
+        if self.floor_id:
+            conditions.append(Log.floor_id == self.floor_id)
+        if self.desk_code:
+            conditions.append(Log.desk_code == self.desk_code)
+        if self.booking_id:
+            conditions.append(Log.booking_id == self.booking_id)
+        return conditions
+
+
+def log_event(
+    user_email: str,
+    event_type: str,
+    component: str,
+    event_description: str,
+    event_code: Optional[str] = None,
+    booking_id: Optional[int] = None,
+    desk_code: Optional[str] = None,
+    latency_ms: Optional[float] = None,
+    payload: Optional[dict] = None,
+) -> None:
     """
-    Logs an event in the logs table.
+    Logs an event. It is routed by event_sinks to the logs table, a rotating file or stdout,
+    repeated failures are deduplicated before they reach the database.
 
     :param user_email: ID (email) of the user associated with the event
     :param event_type: Type of the event (e.g., "Login Success", "Login Failure")
-    :param session_factory: A callable to create a SQLAlchemy session
+    :param component: The part of the app the event comes from
+    :param event_description: Human readable description
+    :param event_code: Structured event code, one of the codes defined in this module
+    :param booking_id: The booking the event is about
+    :param desk_code: The desk the event is about, its floor is stored with it
+    :param latency_ms: Duration of the logged operation in milliseconds
+    :param payload: Further JSON serializable details
+    """
+    dispatch_event(
+        {
+            "user_name": user_email,
+            "event_type": event_type,
+            "component": component,
+            "event_description": event_description,
+            "event_code": event_code,
+            "booking_id": booking_id,
+            "desk_code": desk_code,
+            "latency_ms": round(latency_ms) if latency_ms is not None else None,
+            "payload": payload,
+            "created_at": datetime.now(),
+        }
+    )
+
+
+def write_log_record(record: dict) -> None:
+    """
+    Database sink, inserts an event record into the logs table.
+
+    :param record: The event, created_at is left to the database
     """
     session: Session = SessionFactory()
 
     try:
-        log_entry = Log(
-            user_name=user_email,
-            event_type=event_type,
-            component=component,
-            event_description=event_description,
+        desk_code = record.get("desk_code")
+        # The floor is resolved within the insert, callers only know the desk code
+        floor_id = select(Desk.floor_id).where(Desk.desk_code == desk_code).scalar_subquery() if desk_code else None
+        session.execute(
+            insert(Log).values(
+                user_name=record["user_name"],
+                event_type=record["event_type"],
+                component=record["component"],
+                event_description=record["event_description"],
+                event_code=record.get("event_code"),
+                booking_id=record.get("booking_id"),
+                desk_code=desk_code,
+                floor_id=floor_id,
+                latency_ms=record.get("latency_ms"),
+                payload=record.get("payload"),
+            )
         )
-        session.add(log_entry)
         session.commit()
-        logging.info(f"[{user_email}] Logged event: {event_description}.")
+        logging.info(f"[{record['user_name']}] Logged event: {record['event_description']}.")
     except Exception as exc:
         session.rollback()
         logging.error(f"Failed to log event: {exc}")
     finally:
         session.close()
+
+
+def get_user_logs(user_email: str, start_date: datetime, end_date: datetime, limit: int = 100) -> list[Log]:
+    """
+    Fetch the audit log of a user for a time range, newest first.
+    Bounds on created_at let Postgres prune the query to the monthly partitions of the range.
+
+    :param user_email: ID (email) of the user
+    :param start_date: Start of the time range (inclusive)
+    :param end_date: End of the time range (exclusive)
+    :param limit: Maximum number of returned rows
+    """
+    session: Session = SessionFactory()
+
+    try:
+        stmt = (
+            select(Log)
+            .where(Log.user_name == user_email, Log.created_at >= start_date, Log.created_at < end_date)
+            .order_by(Log.created_at.desc())
+            .limit(limit)
+        )
+        # Bulk reads go to the read replica
+        with route_reads(session):
+            return list(session.execute(stmt).scalars().all())
+    except Exception as exc:
+        logging.error(f"Failed to fetch logs for user '{user_email}': {exc}")
+        return []
+    finally:
+        session.close()
+
+
+def get_logs(
+    log_filter: LogFilter, after: Optional[tuple[datetime, int]] = None, limit: int = 100
+) -> tuple[list[dict], Optional[tuple[datetime, int]]]:
+    """
+    Fetch one page of audit log records, newest first, with keyset pagination on (created_at, log_id).
+    Event code, floor and booking filters are served by their indexes, no description is scanned.
+
+    :param log_filter: The filters
+    :param after: (created_at, log_id) returned with the previous page, None for the first page
+    :param limit: Number of records on a page
+    :return: The records and the key of the next page, None if this is the last page. No records on failure
+    """
+    session: Session = SessionFactory()
+
+    try:
+        stmt = select(Log.__table__).where(*log_filter.conditions())
+        if after:
+            stmt = stmt.where(tuple_(Log.created_at, Log.log_id) < tuple_(*after))
+        stmt = stmt.order_by(Log.created_at.desc(), Log.log_id.desc()).limit(limit + 1)
+
+        # Audit reads go to the read replica
+        with route_reads(session):
+            records = [row._asdict() for row in session.execute(stmt)]
+        next_page = None
+        if len(records) > limit:
+            records = records[:limit]
+            next_page = (records[-1]["created_at"], records[-1]["log_id"])
+        return records, next_page
+    except Exception as exc:
+        logging.error(f"Failed to fetch logs: {exc}")
+        return [], None
+    finally:
+        session.close()
+
+
+def count_logs(log_filter: LogFilter) -> dict[str, int]:
+    """
+    Count audit log records per event code, e.g. booking conflicts on a floor yesterday.
+
+    :param log_filter: The filters
+    :return: Number of records per event code, records without a code are counted under None. Empty on failure
+    """
+    session: Session = SessionFactory()
+
+    try:
+        stmt = select(Log.event_code, func.count()).where(*log_filter.conditions()).group_by(Log.event_code)
+        with route_reads(session):
+            return dict(session.execute(stmt).all())
+    except Exception as exc:
+        logging.error(f"Failed to count logs: {exc}")
+        return {}
+    finally:
+        session.close()
+
+
+register_sink("database", write_log_record)
@@ -0,0 +1,395 @@
+# Slot-level occupancy forecasting. Booking history of an office is loaded as integer NumPy arrays, turned into
+# occupancy grids of shape (days, sectors, slots) and averaged per weekday and slot. Every step works on whole
+# arrays, years of history are processed without a Python loop over bookings.
+import csv
+import logging
+import argparse
+from typing import Callable, NamedTuple, Optional
+from datetime import date, datetime, timedelta
+import numpy as np
+from sqlalchemy import BigInteger
+from sqlalchemy.sql import select, func, case, cast
+from sqlalchemy.orm import Session
+
+from db.db_models import AllBooking, Desk, Sector, Floor, Status
+from backend_operations.slot_calendar import SLOT_MINUTES, SLOTS_PER_DAY, SLOT_LABELS
+
+
+# Weeks of history the weekday baselines are computed from
+FORECAST_HISTORY_WEEKS = 52
+# Weight of a week halves every FORECAST_HALF_LIFE_WEEKS, recent weeks follow changes in office usage
+FORECAST_HALF_LIFE_WEEKS = 8
+# Days forecast by default, roughly the next month
+FORECAST_DAYS = 28
+# Number of history rows fetched from the server-side cursor and converted at once
+FORECAST_CHUNK_SIZE = 100000
+FORECAST_METRICS = ("expected", "booked", "utilization")
+FORECAST_LEVELS = ("sector", "floor")
+
+SECONDS_PER_DAY = 24 * 60 * 60
+EPOCH = datetime(1970, 1, 1)
+
+
+class BookingArrays(NamedTuple):
+    """Booking history as parallel arrays, one element per booking."""
+
+    # Index into the sector IDs of the office, not the sector ID itself
+    sector_index: np.ndarray
+    # Days since the first day of the history
+    day: np.ndarray
+    start_slot: np.ndarray
+    # Exclusive, bookings ending at midnight end in slot SLOTS_PER_DAY
+    end_slot: np.ndarray
+    checked_in: np.ndarray
+
+
+class OfficeSectors(NamedTuple):
+    """Sectors of an office with their floors and desk counts, sorted by sector ID."""
+
+    sector_ids: np.ndarray
+    floor_ids: np.ndarray
+    desk_counts: np.ndarray
+
+
+class OccupancyForecast(NamedTuple):
+    """Forecast grids of shape (days, sectors, slots) and per sector rates."""
+
+    days: list[date]
+    sectors: OfficeSectors
+    # Desks booked, including bookings which end up canceled
+    booked: np.ndarray
+    # Desks actually used by checked in bookings
+    expected: np.ndarray
+    check_in_rate: np.ndarray
+    no_show_rate: np.ndarray
+
+
+def load_office_sectors(session: Session, office_id: int) -> OfficeSectors:
+    """
+    Load the sectors of an office.
+
+    :param session: SQLAlchemy session
+    :param office_id: ID of the office
+    """
+    rows = session.execute(
+        select(Sector.sector_id, Sector.floor_id, func.count(Desk.desk_id))
+        .join(Floor, Floor.floor_id == Sector.floor_id)
+        .outerjoin(Desk, Desk.sector_id == Sector.sector_id)
+        .where(Floor.office_id == office_id)
+        .group_by(Sector.sector_id, Sector.floor_id)
+        .order_by(Sector.sector_id)
+    ).all()
+    columns = np.array(rows, dtype=np.int64).reshape(-1, 3)
+    return OfficeSectors(columns[:, 0], columns[:, 1], columns[:, 2])
+
+
+def load_booking_arrays(
+    session: Session, office_id: int, sector_ids: np.ndarray, first_day: date, days: int
+) -> BookingArrays:
+    """
+    Load the bookings of an office in a date range as arrays. The database returns plain integers,
+    days and slots are derived from them on whole chunks of rows.
+
+    :param session: SQLAlchemy session
+    :param office_id: ID of the office
+    :param sector_ids: Sorted sector IDs of the office
+    :param first_day: First day of the history
+    :param days: Number of days of the history
+    """
+    first_moment = datetime.combine(first_day, datetime.min.time())
+    stmt = (
+        select(
+            Desk.sector_id,
+            cast(func.extract("epoch", AllBooking.start_date), BigInteger),
+            cast(func.extract("epoch", AllBooking.end_date), BigInteger),
+            case((Status.status_name.in_(["Active", "Completed"]), 1), else_=0),
+        )
+        .join(Desk, Desk.desk_id == AllBooking.desk_id)
+        .join(Status, Status.status_id == AllBooking.status_id)
+        .where(
+            Desk.office_id == office_id,
+            AllBooking.start_date >= first_moment,
+            AllBooking.start_date < first_moment + timedelta(days=days),
+        )
+    )
+    result = session.execute(stmt.execution_options(yield_per=FORECAST_CHUNK_SIZE))
+    chunks = [np.array(chunk, dtype=np.int64) for chunk in result.partitions()]
+    columns = np.concatenate(chunks) if chunks else np.empty((0, 4), dtype=np.int64)
+
+    # Timestamps are stored without time zone, their epoch is the wall clock time counted from 1970-01-01
+    first_second = int((first_moment - EPOCH).total_seconds())
+    start_seconds = columns[:, 1] - first_second
+    end_seconds = columns[:, 2] - first_second
+    day = start_seconds // SECONDS_PER_DAY
+    slot_seconds = SLOT_MINUTES * 60
+
+    return BookingArrays(
+        sector_index=np.searchsorted(sector_ids, columns[:, 0]),
+        day=day,
+        start_slot=start_seconds % SECONDS_PER_DAY // slot_seconds,
+        # Partially used slots count as occupied, bookings are never longer than their day
+        end_slot=np.minimum(-(-(end_seconds - day * SECONDS_PER_DAY) // slot_seconds), SLOTS_PER_DAY),
+        checked_in=columns[:, 3].astype(bool),
+    )
+
+
+def slot_occupancy(
+    bookings: BookingArrays, sector_count: int, days: int, mask: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Count the bookings occupying every slot of every sector and day.
+    Every booking adds one at its start slot and removes one at its end slot of a difference grid,
+    the cumulative sum over slots turns it into occupancy.
+
+    :param bookings: Booking history
+    :param sector_count: Number of sectors of the office
+    :param days: Number of days of the history
+    :param mask: Optional selection of the counted bookings
+    :return: Occupied desks, shape (days, sectors, SLOTS_PER_DAY)
+    """
+    if mask is None:
+        mask = np.ones(len(bookings.day), dtype=bool)
+
+    # One extra slot per row takes the ends of bookings lasting until midnight
+    row_width = SLOTS_PER_DAY + 1
+    size = days * sector_count * row_width
+    row_start = (bookings.day[mask] * sector_count + bookings.sector_index[mask]) * row_width
+
+    difference = np.bincount(row_start + bookings.start_slot[mask], minlength=size) - np.bincount(
+        row_start + bookings.end_slot[mask], minlength=size
+    )
+    occupancy = np.cumsum(difference.reshape(days, sector_count, row_width), axis=2)
+    return occupancy[:, :, :SLOTS_PER_DAY].astype(np.int32)
+
+
+def weekday_baseline(
+    occupancy: np.ndarray, half_life_weeks: float = FORECAST_HALF_LIFE_WEEKS, first_week: int = 0
+) -> np.ndarray:
+    """
+    Average occupancy per weekday and slot, recent weeks weigh more.
+
+    :param occupancy: Occupancy of whole weeks starting on a Monday, shape (days, sectors, slots)
+    :param half_life_weeks: Age in weeks at which a week counts half
+    :param first_week: First week with bookings, earlier weeks predate the office's use and are not averaged
+    :return: Mean occupancy, shape (7, sectors, slots), index 0 is Monday
+    """
+    weeks = occupancy.shape[0] // 7
+    weekly = occupancy[: weeks * 7].reshape(weeks, 7, *occupancy.shape[1:])
+    weights = 0.5 ** (np.arange(weeks - 1, -1, -1) / half_life_weeks)
+    weights[: min(first_week, weeks - 1)] = 0
+    return np.tensordot(weights, weekly, axes=1) / weights.sum()
+
+
+def check_in_rates(bookings: BookingArrays, sector_count: int) -> np.ndarray:
+    """
+    Share of bookings per sector which were checked in. Canceled bookings count as no-shows,
+    the schema does not record whether a booking was canceled in advance or by the status sweeper.
+    Sectors without history get the rate of the whole office.
+
+    :param bookings: Booking history
+    :param sector_count: Number of sectors of the office
+    :return: Check-in rate per sector
+    """
+    booked = np.bincount(bookings.sector_index, minlength=sector_count)
+    checked_in = np.bincount(bookings.sector_index[bookings.checked_in], minlength=sector_count)
+    office_rate = checked_in.sum() / booked.sum() if booked.sum() else 1.0
+    return np.divide(checked_in, booked, out=np.full(sector_count, office_rate), where=booked > 0)
+
+
+def forecast_grids(
+    bookings: BookingArrays,
+    sectors: OfficeSectors,
+    history_days: int,
+    first_day: date,
+    days: int,
+    half_life_weeks: float = FORECAST_HALF_LIFE_WEEKS,
+) -> OccupancyForecast:
+    """
+    Forecast booked and used desks per sector and slot from the weekday baselines of the history.
+
+    :param bookings: Booking history
+    :param sectors: Sectors of the office
+    :param history_days: Number of days of the history, whole weeks starting on a Monday
+    :param first_day: First forecast day
+    :param days: Number of forecast days
+    :param half_life_weeks: Age in weeks at which a week of history counts half
+    """
+    sector_count = len(sectors.sector_ids)
+    # A history longer than the office's bookings would average in empty weeks and forecast too low
+    first_week = int(bookings.day.min()) // 7 if len(bookings.day) else 0
+    booked_baseline = weekday_baseline(
+        slot_occupancy(bookings, sector_count, history_days), half_life_weeks, first_week
+    )
+    used_baseline = weekday_baseline(
+        slot_occupancy(bookings, sector_count, history_days, bookings.checked_in), half_life_weeks, first_week
+    )
+    check_in_rate = check_in_rates(bookings, sector_count)
+
+    weekdays = (first_day.weekday() + np.arange(days)) % 7
+    return OccupancyForecast(
+        days=[first_day + timedelta(days=offset) for offset in range(days)],
+        sectors=sectors,
+        booked=booked_baseline[weekdays],
+        expected=used_baseline[weekdays],
+        check_in_rate=check_in_rate,
+        no_show_rate=1 - check_in_rate,
+    )
+
+
+def forecast_office_occupancy(
+    session_factory: Callable[[], Session],
+    office_id: int,
+    first_day: date,
+    days: int = FORECAST_DAYS,
+    history_weeks: int = FORECAST_HISTORY_WEEKS,
+    half_life_weeks: float = FORECAST_HALF_LIFE_WEEKS,
+) -> OccupancyForecast:
+    """
+    Forecast the occupancy of an office from the whole weeks of history before the current week.
+
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :param office_id: ID of the office
+    :param first_day: First forecast day
+    :param days: Number of forecast days
+    :param history_weeks: Number of weeks of history
+    :param half_life_weeks: Age in weeks at which a week of history counts half
+    """
+    # Imported here, the array functions above are usable without a database connection
+    from db.session_management import managed_session
+
+    today = date.today()
+    current_monday = today - timedelta(days=today.weekday())
+    first_history_day = current_monday - timedelta(weeks=history_weeks)
+    history_days = history_weeks * 7
+
+    # History is read from the replica, it does not need the latest writes
+    with managed_session(session_factory, read_only=True) as session:
+        sectors = load_office_sectors(session, office_id)
+        bookings = load_booking_arrays(session, office_id, sectors.sector_ids, first_history_day, history_days)
+
+    logging.info(f"Forecasting office {office_id} from {len(bookings.day)} bookings since {first_history_day}.")
+    return forecast_grids(bookings, sectors, history_days, first_day, days, half_life_weeks)
+
+
+def floor_membership(floor_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the distinct floors and a matrix assigning sectors to them.
+
+    :param floor_ids: Floor ID of every sector
+    :return: Sorted floor IDs and the membership matrix of shape (sectors, floors)
+    """
+    distinct_floor_ids, floor_index = np.unique(floor_ids, return_inverse=True)
+    membership = np.zeros((len(floor_ids), len(distinct_floor_ids)))
+    membership[np.arange(len(floor_ids)), floor_index] = 1
+    return distinct_floor_ids, membership
+
+
+def write_forecast_csv(
+    forecast: OccupancyForecast, output_path: str, metric: str = "expected", level: str = "sector"
+) -> int:
+    """
+    Write a forecast grid with one row per day and sector or floor and one column per slot.
+
+    :param forecast: The forecast
+    :param output_path: Path of the output CSV file
+    :param metric: 'expected' or 'booked' desks, or 'utilization' as the share of used desks
+    :param level: Either 'sector' or 'floor'
+    :return: Number of written rows
+    """
+    if metric not in FORECAST_METRICS:
+        raise ValueError(f"Unsupported metric '{metric}', use one of: {', '.join(FORECAST_METRICS)}.")
+    if level not in FORECAST_LEVELS:
+        raise ValueError(f"Unsupported level '{level}', use one of: {', '.join(FORECAST_LEVELS)}.")
+
+    sectors = forecast.sectors
+    booked, expected, desk_counts, group_ids = (
+        forecast.booked,
+        forecast.expected,
+        sectors.desk_counts,
+        sectors.sector_ids,
+    )
+    if level == "floor":
+        group_ids, membership = floor_membership(sectors.floor_ids)
+        booked = np.einsum("dst,sf->dft", booked, membership)
+        expected = np.einsum("dst,sf->dft", expected, membership)
+        desk_counts = desk_counts @ membership
+
+    if metric == "utilization":
+        grid = expected / np.maximum(desk_counts, 1)[None, :, None]
+    else:
+        grid = booked if metric == "booked" else expected
+    rows = np.round(grid, 3).reshape(-1, SLOTS_PER_DAY)
+
+    # Daily check-in rate of the group, weighted by the booked desk slots
+    booked_slots = booked.sum(axis=2)
+    check_in_rate = np.divide(
+        expected.sum(axis=2), booked_slots, out=np.zeros_like(booked_slots), where=booked_slots > 0
+    )
+
+    day_column = np.repeat([day.isoformat() for day in forecast.days], len(group_ids))
+    group_columns = np.tile(np.column_stack((group_ids, desk_counts)), (len(forecast.days), 1))
+
+    with open(output_path, "w", newline="") as output_file:
+        writer = csv.writer(output_file)
+        writer.writerow(["date", f"{level}_id", "desks", "check_in_rate", *SLOT_LABELS])
+        writer.writerows(
+            [day, int(group_id), int(desks), rate, *slot_values]
+            for day, (group_id, desks), rate, slot_values in zip(
+                day_column, group_columns.tolist(), np.round(check_in_rate, 3).ravel().tolist(), rows.tolist()
+            )
+        )
+
+    logging.info(f"Wrote {len(rows)} forecast rows to '{output_path}'.")
+    return len(rows)
+
+
+def parse_forecast_date(date_str: str) -> date:
+    """Parse a date given as YYYY-MM-DD."""
+    try:
+        return date.fromisoformat(date_str)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date '{date_str}', expected YYYY-MM-DD.")
+
+
+def add_forecast_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the forecast command line arguments to a parser.
+
+    :param parser: The argument parser
+    """
+    parser.add_argument("office_id", type=int, help="ID of the office")
+    parser.add_argument("output_path", help="Path of the output CSV file")
+    parser.add_argument("--start", dest="first_day", type=parse_forecast_date, help="First day, default tomorrow")
+    parser.add_argument("--days", type=int, default=FORECAST_DAYS)
+    parser.add_argument("--history-weeks", type=int, default=FORECAST_HISTORY_WEEKS)
+    parser.add_argument("--half-life-weeks", type=float, default=FORECAST_HALF_LIFE_WEEKS)
+    parser.add_argument("--metric", choices=FORECAST_METRICS, default="expected")
+    parser.add_argument("--level", choices=FORECAST_LEVELS, default="sector", help="Rows per sector or per floor")
+
+
+def run_forecast(args: argparse.Namespace) -> int:
+    """
+    Run the forecast described by parsed command line arguments.
+
+    :param args: Arguments parsed with a parser set up by add_forecast_arguments
+    :return: Number of written rows
+    """
+    from db.sql_db import SessionFactory
+
+    forecast = forecast_office_occupancy(
+        SessionFactory,
+        args.office_id,
+        args.first_day or date.today() + timedelta(days=1),
+        args.days,
+        args.history_weeks,
+        args.half_life_weeks,
+    )
+    return write_forecast_csv(forecast, args.output_path, args.metric, args.level)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    forecast_parser = argparse.ArgumentParser(description="Forecast slot occupancy of an office from its history.")
+    add_forecast_arguments(forecast_parser)
+    run_forecast(forecast_parser.parse_args())
@@ -0,0 +1,149 @@
+# Shared time model of bookings: times of day are integer indices of 15-minute slots (0 = 00:00, 95 = 23:45).
+# Labels and slot times are precomputed once, so UI events and booking validation only index into tables
+# instead of building and re-parsing "%H:%M" strings.
+from datetime import date, datetime, time, timedelta
+
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+# Slot index -> "HH:MM" label and time of day
+SLOT_LABELS = tuple(f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(0, 24 * 60, SLOT_MINUTES))
+SLOT_TIMES = tuple(time(minute // 60, minute % 60) for minute in range(0, 24 * 60, SLOT_MINUTES))
+LABEL_SLOTS = {label: slot for slot, label in enumerate(SLOT_LABELS)}
+
+# Bookable range of a day, bookings start between 00:15 and 23:30 and end between 00:30 and 23:45
+FIRST_START_SLOT = 1
+LAST_START_SLOT = SLOTS_PER_DAY - 2
+FIRST_END_SLOT = 2
+LAST_END_SLOT = SLOTS_PER_DAY - 1
+
+# Suggested working hours, 08:00 - 16:00
+DEFAULT_START_SLOT = 8 * 60 // SLOT_MINUTES
+DEFAULT_END_SLOT = 16 * 60 // SLOT_MINUTES
+
+# Check-in opens one slot before the booking starts and closes two slots after
+CHECK_IN_EARLY_SLOTS = 1
+CHECK_IN_LATE_SLOTS = 2
+
+START_LABELS = SLOT_LABELS[FIRST_START_SLOT : LAST_START_SLOT + 1]
+END_LABELS = SLOT_LABELS[FIRST_END_SLOT : LAST_END_SLOT + 1]
+
+
+def label_to_slot(label: str) -> int:
+    """
+    Return the slot index of a "HH:MM" label.
+
+    :param label: Time of day label, must lie on a slot boundary
+    """
+    try:
+        return LABEL_SLOTS[label]
+    except KeyError:
+        raise ValueError(f"Invalid time '{label}', times must be multiples of {SLOT_MINUTES} minutes.")
+
+
+def slot_of(moment: datetime) -> int:
+    """
+    Return the index of the slot containing a moment.
+
+    :param moment: The moment
+    """
+    return (moment.hour * 60 + moment.minute) // SLOT_MINUTES
+
+
+def next_slot_after(moment: datetime) -> int:
+    """
+    Return the first slot starting after a moment, may be SLOTS_PER_DAY (midnight of the next day).
+
+    :param moment: The moment
+    """
+    return slot_of(moment) + 1
+
+
+def slot_to_datetime(day: date, slot: int) -> datetime:
+    """
+    Return the start of a slot on a given day, slot SLOTS_PER_DAY is midnight of the next day.
+
+    :param day: The day
+    :param slot: The slot index
+    """
+    if slot < SLOTS_PER_DAY:
+        return datetime.combine(day, SLOT_TIMES[slot])
+    return datetime.combine(day, SLOT_TIMES[0]) + timedelta(days=slot // SLOTS_PER_DAY)
+
+
+def slots_between(start: datetime, end: datetime) -> int:
+    """
+    Return the number of whole slots between two moments.
+
+    :param start: The earlier moment
+    :param end: The later moment
+    """
+    return int((end - start).total_seconds()) // (SLOT_MINUTES * 60)
+
+
+def booking_range(selected_date: str, start_label: str, end_label: str) -> tuple[datetime, datetime]:
+    """
+    Return start and end of a booking selected as a date and two slot labels.
+
+    :param selected_date: The booking date (YYYY-MM-DD)
+    :param start_label: The start time label
+    :param end_label: The end time label
+    :raises ValueError: If a value is invalid or the end is not after the start
+    """
+    day = date.fromisoformat(selected_date)
+    start_slot = label_to_slot(start_label)
+    end_slot = label_to_slot(end_label)
+
+    if start_slot >= end_slot:
+        raise ValueError("End time must be after start time.")
+
+    return datetime.combine(day, SLOT_TIMES[start_slot]), datetime.combine(day, SLOT_TIMES[end_slot])
+
+
+def get_time_options(day: date, now: datetime) -> tuple[str, str, tuple[str, ...], tuple[str, ...]]:
+    """
+    Return suggested start and end labels and all selectable start and end labels of a day.
+
+    :param day: The booking day
+    :param now: The current moment
+    :return: Suggested start, suggested end, all start labels and all end labels
+    :raises ValueError: If the day is in the past or no slot is left today
+    """
+    if day < now.date():
+        raise ValueError("Booking cannot be made for past dates.")
+
+    if day > now.date():
+        return SLOT_LABELS[DEFAULT_START_SLOT], SLOT_LABELS[DEFAULT_END_SLOT], START_LABELS, END_LABELS
+
+    # Today only slots after the current one can be booked
+    earliest_slot = max(next_slot_after(now), FIRST_START_SLOT)
+    if earliest_slot > LAST_START_SLOT:
+        raise ValueError("No booking slots are left today.")
+
+    start_labels = SLOT_LABELS[earliest_slot : LAST_START_SLOT + 1]
+    end_labels = SLOT_LABELS[max(earliest_slot + 1, FIRST_END_SLOT) : LAST_END_SLOT + 1]
+
+    current_slot = slot_of(now)
+    if current_slot < DEFAULT_START_SLOT:
+        suggested_start, suggested_end = DEFAULT_START_SLOT, DEFAULT_END_SLOT
+    elif current_slot < DEFAULT_END_SLOT - 1:
+        suggested_start, suggested_end = earliest_slot, DEFAULT_END_SLOT
+    else:
+        suggested_start, suggested_end = earliest_slot, earliest_slot + 1
+
+    return SLOT_LABELS[suggested_start], SLOT_LABELS[suggested_end], start_labels, end_labels
+
+
+def is_check_in_open(booking_start: datetime, now: datetime) -> bool:
+    """
+    Return whether a booking can be checked in at the given moment.
+
+    :param booking_start: Start of the booking
+    :param now: The current moment
+    """
+    return (
+        booking_start - timedelta(minutes=CHECK_IN_EARLY_SLOTS * SLOT_MINUTES)
+        <= now
+        <= booking_start + timedelta(minutes=CHECK_IN_LATE_SLOTS * SLOT_MINUTES)
+    )
@@ -0,0 +1,173 @@
+# Statements of hot backend queries, built once at import time with bound parameters.
+# Reusing the same statement objects skips rebuilding the select() constructs on every call and lets SQLAlchemy
+# reuse the memoized cache key and the compiled form from the engine's compiled cache.
+from sqlalchemy import BigInteger
+from sqlalchemy.sql import select, bindparam, func, cast, desc
+
+from db.db_models import (
+    Booking,
+    Office,
+    Floor,
+    Sector,
+    Desk,
+    Status,
+    User,
+    FloorDayVersion,
+    UserBookingVersion,
+    AllBooking,
+    MostFrequentUser,
+)
+
+
+STATUS_ID_BY_NAME = select(Status.status_id).where(Status.status_name == bindparam("status_name"))
+
+DESK_ID_BY_CODE = select(Desk.desk_id).where(Desk.desk_code == bindparam("desk_code"))
+
+# Every path putting a booking on a desk locks the desk row before its overlap check: manual and automatic
+# bookings, waitlist promotions and admin moves. Concurrent bookers of one desk are serialized by this lock,
+# the overlap trigger only guards the user's own bookings.
+LOCK_DESK = select(Desk.desk_id).where(Desk.desk_id == bindparam("desk_id")).with_for_update()
+
+# Overlap check for a desk, served by idx_bookings_desk_date
+OVERLAPPING_DESK_BOOKING = (
+    select(Booking.booking_id)
+    .where(
+        Booking.desk_id == bindparam("desk_id"),
+        Booking.start_date < bindparam("end_date"),
+        Booking.end_date > bindparam("start_date"),
+        Booking.status_id != bindparam("canceled_status_id"),
+    )
+    .limit(1)
+)
+
+# Bookings shown to the user, the desk code is only joined for the returned row
+USER_BOOKING_COLUMNS = select(Booking.booking_id, Desk.desk_code, Booking.start_date, Booking.end_date).join(
+    Desk, Desk.desk_id == Booking.desk_id
+)
+
+# Served by idx_bookings_user_status_start
+USER_BOOKING_BY_STATUS = (
+    USER_BOOKING_COLUMNS.where(Booking.user_id == bindparam("user_id"), Booking.status_id == bindparam("status_id"))
+    .order_by(Booking.start_date)
+    .limit(1)
+)
+
+# PROJECT REQUIREMENT: subquery
+# Served by idx_bookings_user_status_start
+NEXT_PENDING_USER_BOOKING = (
+    USER_BOOKING_COLUMNS.where(
+        Booking.user_id == bindparam("user_id"),
+        Booking.status_id == (select(Status.status_id).where(Status.status_name == "Pending")).scalar_subquery(),
+        Booking.start_date > bindparam("now"),
+    )
+    .order_by(Booking.start_date)
+    .limit(1)
+)
+
+BOOKING_BY_ID = select(Booking).where(Booking.booking_id == bindparam("booking_id"))
+
+# Topology is looked up by IDs, names are not unique across offices (every office may have a "20th floor")
+OFFICES = select(Office.office_id, Office.office_name).order_by(Office.office_id)
+
+# Served by idx_floors_office_floor_name
+FLOORS_IN_OFFICE = (
+    select(Floor.floor_id, Floor.floor_name).where(Floor.office_id == bindparam("office_id")).order_by(Floor.floor_id)
+)
+
+# Served by idx_sectors_floor_sector_name
+SECTORS_ON_FLOOR = (
+    select(Sector.sector_id, Sector.sector_name)
+    .where(Sector.floor_id == bindparam("floor_id"))
+    .order_by(Sector.sector_id)
+)
+
+# Served by idx_desks_office_floor_sector
+DESKS_ON_FLOOR = (
+    select(Desk.desk_code)
+    .where(Desk.office_id == bindparam("office_id"), Desk.floor_id == bindparam("floor_id"))
+    .order_by(Desk.sector_id, Desk.local_id)
+)
+
+DESKS_IN_SECTOR = DESKS_ON_FLOOR.where(Desk.sector_id == bindparam("sector_id"))
+
+DESK_SECTOR = (
+    select(Sector.sector_id, Sector.sector_name)
+    .join(Desk, Desk.sector_id == Sector.sector_id)
+    .where(Desk.desk_code == bindparam("desk_code"))
+)
+
+# Desks of a floor booked in a time range, desks of the floor come from idx_desks_office_floor_sector,
+# their bookings from idx_bookings_desk_date
+BOOKED_DESKS_ON_FLOOR = (
+    select(Desk.desk_code)
+    .distinct()
+    .join(Booking, Booking.desk_id == Desk.desk_id)
+    .join(Status, Status.status_id == Booking.status_id)
+    .where(
+        Desk.office_id == bindparam("office_id"),
+        Desk.floor_id == bindparam("floor_id"),
+        Booking.start_date < bindparam("end_date"),
+        Booking.end_date > bindparam("start_date"),
+        Status.status_name != "Canceled",
+    )
+)
+
+# Check-in as a single statement, only pending bookings are activated so repeated check-ins change nothing
+CHECK_IN_PENDING_BOOKING = (
+    Booking.__table__.update()
+    .where(
+        Booking.booking_id == bindparam("checked_in_booking_id"),
+        Booking.status_id == select(Status.status_id).where(Status.status_name == "Pending").scalar_subquery(),
+    )
+    .values(status_id=select(Status.status_id).where(Status.status_name == "Active").scalar_subquery())
+    .returning(Booking.booking_id)
+)
+
+# Pending bookings of a floor starting in a time range, desks of the floor come from idx_desks_office_floor_sector
+PENDING_BOOKINGS_ON_FLOOR = (
+    select(Booking.booking_id, User.user_name, Desk.desk_code, Booking.start_date, Booking.end_date)
+    .join(Desk, Desk.desk_id == Booking.desk_id)
+    .join(User, User.user_id == Booking.user_id)
+    .where(
+        Desk.office_id == bindparam("office_id"),
+        Desk.floor_id == bindparam("floor_id"),
+        Booking.start_date >= bindparam("start_date"),
+        Booking.start_date < bindparam("end_date"),
+        Booking.status_id == select(Status.status_id).where(Status.status_name == "Pending").scalar_subquery(),
+    )
+    .order_by(Booking.start_date)
+)
+
+# Change token of a floor for a range of days, versions only grow so the sum changes with every booking change.
+# Served by the primary key of floor_day_versions
+FLOOR_DAYS_VERSION = select(cast(func.coalesce(func.sum(FloorDayVersion.version), 0), BigInteger)).where(
+    FloorDayVersion.floor_id == bindparam("floor_id"),
+    FloorDayVersion.day >= bindparam("first_day"),
+    FloorDayVersion.day < bindparam("end_day"),
+)
+
+# Change token of a user's bookings, a single primary key lookup. None until the user's first booking change
+USER_BOOKINGS_VERSION = (
+    select(UserBookingVersion.version)
+    .join(User, User.user_id == UserBookingVersion.user_id)
+    .where(User.user_name == bindparam("user_name"))
+)
+
+# Statistics over live and archived bookings, shown in the GUI and printed by the command line
+MOST_RESERVED_DESK = (
+    select(
+        Desk.desk_code,
+        Floor.floor_name,
+        Office.office_name,
+        func.count(AllBooking.booking_id).label("reservation_count"),
+    )
+    .join(AllBooking, AllBooking.desk_id == Desk.desk_id)
+    .join(Floor, Desk.floor_id == Floor.floor_id)
+    .join(Office, Desk.office_id == Office.office_id)
+    .group_by(Desk.desk_id, Desk.desk_code, Floor.floor_name, Office.office_name)
+    .order_by(desc(func.count(AllBooking.booking_id)))
+    .limit(1)
+)
+
+# PROJECT REQUIREMENT: query view
+MOST_FREQUENT_USER = select(MostFrequentUser).order_by(MostFrequentUser.reservation_count.desc()).limit(1)
@@ -1,34 +1,171 @@
 import sys
+import queue
 import bcrypt
 import logging
-from typing import Callable
-from tkinter import messagebox
+import threading
+from typing import Callable, Optional
+from dataclasses import dataclass
+from tkinter import messagebox, Button
 from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import OperationalError, InterfaceError
 
-from db.db_models import User
+from db.db_models import User, Role, Department
 from db.sql_db import SessionFactory
-from backend_operations.log_utils import log_event
+from db.local_cache import set_server_online
+from backend_operations.log_utils import log_event, LOGIN_SUCCEEDED, LOGIN_FAILED
 from backend_operations.utils import get_env_variable
 
 
-# Initialize global variable storing logged-in user ID
+# bcrypt cost factor for new hashes, weaker hashes are upgraded on the next successful login
+BCRYPT_ROUNDS = 14
+# How often the UI checks whether the login worker has finished
+LOGIN_POLL_INTERVAL_MS = 50
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    """Profile of the logged-in user, loaded once at login and kept for the whole session."""
+
+    user_id: int
+    user_name: str
+    role_name: str
+    department_name: str
+
+
+# Initialize global variables storing logged-in user ID and profile
 CURRENT_USER = None
+CURRENT_USER_PROFILE: Optional[UserProfile] = None
+# Prevents starting another verification while one is running
+LOGIN_IN_PROGRESS = False
 
 
-def login(email: str, password: str, on_success_callback: Callable[[], None]) -> None:
+def hash_password(password: str) -> str:
+    """
+    Hash a password with the configured bcrypt cost factor.
+
+    :param password: The plain text password
+    """
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
+
+
+def get_hash_rounds(password_hash: str) -> int:
+    """
+    Read the cost factor from a bcrypt hash ("$2b$12$...").
+
+    :param password_hash: The bcrypt hash
+    """
+    return int(password_hash.split("$")[2])
+
+
+def load_user_profile(session: Session, email: str) -> tuple[UserProfile, str] | None:
+    """
+    Load the user profile together with the password hash.
+
+    :param session: SQLAlchemy session
+    :param email: The user's email address
+    :return: Tuple of the profile and the password hash, None if the user does not exist
+    """
+    stmt = (
+        select(User.user_id, User.user_name, User.password, Role.role_name, Department.department_name)
+        .join(Role, Role.role_id == User.role_id)
+        .join(Department, Department.department_id == User.department_id)
+        .where(User.user_name == email)
+    )
+    user = session.execute(stmt).first()
+
+    if not user:
+        return None
+
+    profile = UserProfile(
+        user_id=user.user_id,
+        user_name=user.user_name,
+        role_name=user.role_name,
+        department_name=user.department_name,
+    )
+    return profile, user.password
+
+
+def verify_credentials(email: str, password: str) -> UserProfile | None:
+    """
+    Verify the user's credentials, meant to run outside of the Tk main thread.
+    Credentials are only checked by the server, a user who is already logged in keeps the profile in memory
+    while the server is unreachable.
+
+    :param email: The user's email address
+    :param password: The user's password
+    :return: Profile of the user or None if the credentials are invalid
+    :raises ConnectionError: If the database is unreachable
+    """
+    # SessionFactory is thread-local, the worker gets its own session
+    session: Session = SessionFactory()
+
+    try:
+        try:
+            user = load_user_profile(session, email)
+        except (OperationalError, InterfaceError) as exc:
+            logging.error(f"Database unreachable during login: {exc}")
+            set_server_online(False)
+            raise ConnectionError("Database is unreachable, logging in requires the server.") from exc
+
+        if not user:
+            logging.error(f"User with email {email} not found.")
+            log_event(
+                "SYSTEM", "Failure", "Login", f"Invalid email: {email} used for logging in", event_code=LOGIN_FAILED
+            )
+            return None
+
+        profile, password_hash = user
+        if not bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8")):
+            logging.error(f"Invalid password for user with email {email}.")
+            log_event(email, "Failure", "Login", f"Invalid password", event_code=LOGIN_FAILED)
+            return None
+
+        # Upgrade hashes created with a lower cost factor while the plain password is known
+        if get_hash_rounds(password_hash) < BCRYPT_ROUNDS:
+            password_hash = hash_password(password)
+            session.execute(
+                User.__table__.update().where(User.user_id == profile.user_id).values(password=password_hash)
+            )
+            session.commit()
+            logging.info(f"Password hash of user {email} upgraded to {BCRYPT_ROUNDS} rounds.")
+
+        logging.info(f"User with email {email} logged in successfully.")
+        log_event(email, "Success", "Login", f"Successful login", event_code=LOGIN_SUCCEEDED)
+        return profile
+    finally:
+        session.close()
+        SessionFactory.remove()
+
+
+def login(email: str, password: str, on_success_callback: Callable[[], None], login_button: Button) -> None:
     """
     Handles the login process.
+    Password verification runs in a worker thread, so the UI keeps redrawing while bcrypt is hashing.
 
     :param email: The user's email address
     :param password: The user's password
-    :param session_factory: A callable to create a SQLAlchemy session (e.g., `scoped_session`)
-    :param on_success: A callback function to execute on successful login
+    :param on_success_callback: A callback function to execute on successful login
+    :param login_button: The login button, disabled while the credentials are verified
     """
+    global LOGIN_IN_PROGRESS
+
+    # Ignore repeated clicks while a verification is running
+    if LOGIN_IN_PROGRESS:
+        return
 
     if check_debug_mode():
-        debug_user = get_debug_user()
-        set_current_user(debug_user)
+        session: Session = SessionFactory()
+        try:
+            debug_user = load_user_profile(session, get_debug_user())
+        finally:
+            session.close()
+
+        if not debug_user:
+            messagebox.showerror("Login Error", "Debug account does not exist in the database.")
+            return
+
+        set_current_user(debug_user[0])
         logging.info(f"Debug mode is enabled, login is skipped, user set to: '{get_current_user()}'.")
         log_event("SYSTEM", "Success", "Login", f"Debug mode is enabled, login is skipped")
         on_success_callback()
@@ -38,37 +175,43 @@ def login(email: str, password: str, on_success_callback: Callable[[], None]) ->
         messagebox.showerror("Login Error", "Both email and password are required.")
         return
 
-    # Create a database session
-    session: Session = SessionFactory()
+    LOGIN_IN_PROGRESS = True
+    login_button.config(state="disabled", text="Logging in...")
+    results: queue.Queue = queue.Queue(maxsize=1)
 
-    try:
-        stmt = select(User).where(User.user_name == email)
-        result = session.execute(stmt)
-        user = result.scalar_one_or_none()
+    def verify():
+        try:
+            results.put(("result", verify_credentials(email, password)))
+        except Exception as exc:
+            results.put(("error", exc))
 
-        if not user:
-            logging.error(f"User with email {email} not found.")
-            log_event("SYSTEM", "Failure", "Login", f"Invalid email: {email} used for logging in")
-            messagebox.showerror("Login Error", "Invalid email or password.")
+    def check_result():
+        global LOGIN_IN_PROGRESS
+
+        try:
+            outcome, value = results.get_nowait()
+        except queue.Empty:
+            login_button.after(LOGIN_POLL_INTERVAL_MS, check_result)
             return
 
-        # Verify the password
-        if bcrypt.checkpw(password.encode("utf-8"), user.password.encode("utf-8")):
-            set_current_user(email)
-            logging.info(f"User with email {email} logged in successfully.")
-            log_event(get_current_user(), "Success", "Login", f"Successful login")
+        LOGIN_IN_PROGRESS = False
+        login_button.config(state="normal", text="Login")
 
-            on_success_callback()
-        else:
-            logging.error(f"Invalid password for user with email {email}.")
-            log_event(email, "Failure", "Login", f"Invalid password")
+        if outcome == "error" and isinstance(value, ConnectionError):
+            logging.error(f"Login failed: {value}")
+            messagebox.showerror("Connection Error", "Server is unreachable. Please try to log in again later.")
+        elif outcome == "error":
+            logging.error(f"An error occurred: {value}")
+            log_event("SYSTEM", "Failure", "Login", f"An error occurred: {value}")
+            messagebox.showerror("Database Error", f"Database error. Please contact the administrator.")
+        elif value is None:
             messagebox.showerror("Login Error", "Invalid email or password.")
-    except Exception as exc:
-        logging.error(f"An error occurred: {exc}")
-        log_event(get_current_user(), "Failure", "Login", f"An error occurred: {exc}")
-        messagebox.showerror("Database Error", f"Database error. Please contact the administrator.")
-    finally:
-        session.close()
+        else:
+            set_current_user(value)
+            on_success_callback()
+
+    threading.Thread(target=verify, name="login-verification", daemon=True).start()
+    login_button.after(LOGIN_POLL_INTERVAL_MS, check_result)
 
 
 def check_debug_mode() -> bool:
@@ -95,14 +238,24 @@ def get_current_user() -> str:
     return CURRENT_USER
 
 
-def set_current_user(user_email: str) -> None:
+def get_current_user_profile() -> UserProfile:
+    """Return the profile of the current user."""
+    if not CURRENT_USER_PROFILE:
+        logging.error("CURRENT_USER_PROFILE is not set. Critical error.")
+        sys.exit()
+
+    return CURRENT_USER_PROFILE
+
+
+def set_current_user(user_profile: UserProfile) -> None:
     """
-    Set the current user.
+    Set the current user and their profile.
 
-    :param user_email: The user ID to set
+    :param user_profile: Profile of the logged-in user
     """
-    global CURRENT_USER
+    global CURRENT_USER, CURRENT_USER_PROFILE
     if CURRENT_USER is None:
-        CURRENT_USER = user_email
+        CURRENT_USER = user_profile.user_name
+        CURRENT_USER_PROFILE = user_profile
     else:
         raise ValueError("CURRENT_USER is already set and cannot be changed.")
@@ -43,9 +43,9 @@ def resource_path(relative_path):
 
 
 def get_env_variable(var_name: str, default_value=None):
-    """Get an environment variable, or raise an exception if it is missing."""
+    """Get an environment variable, or the default value, raise an exception if both are missing."""
     load_environment_variables()
-    value = os.getenv(var_name)
+    value = os.getenv(var_name, default_value)
     if value is None:
         raise ValueError(f"Environment variable '{var_name}' is not set and has no default value.")
     return value
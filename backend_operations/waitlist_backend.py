@@ -0,0 +1,255 @@
+import logging
+from typing import Callable, Optional
+from datetime import datetime
+from sqlalchemy.sql import select, func, exists
+from sqlalchemy.orm import Session
+from tkinter import messagebox
+
+from db.db_models import WaitlistEntry, Booking, Desk, Sector
+from db.session_management import managed_session
+from backend_operations.log_utils import log_event, WAITLIST_JOINED, BOOKING_CREATED
+from backend_operations.user_login import get_current_user, get_current_user_profile
+from backend_operations.statements import STATUS_ID_BY_NAME, LOCK_DESK, OVERLAPPING_DESK_BOOKING
+
+
+# Upper limit of entries a user may wait with at once, keeps single users from queueing for every desk
+MAX_WAITLIST_ENTRIES_PER_USER = 3
+
+
+def find_freed_desk(
+    session: Session,
+    start_date: datetime,
+    end_date: datetime,
+    canceled_status: int,
+    desk_id: Optional[int] = None,
+    sector_id: Optional[int] = None,
+) -> Optional[int]:
+    """
+    Lock the awaited desk or the desks of the awaited sector and return one which is free in the time range.
+    The locks are those of the booking paths and of the promote_waitlist trigger, so a cancellation committed
+    after this check finds the new waitlist entry.
+
+    :param session: SQLAlchemy session, the locks are held until it commits
+    :param start_date: Start of the awaited time range
+    :param end_date: End of the awaited time range
+    :param canceled_status: ID of the 'Canceled' status, such bookings do not block desks
+    :param desk_id: ID of the awaited desk
+    :param sector_id: ID of the sector in which any desk is awaited
+    :return: ID of a free desk, None if all awaited desks are still taken
+    """
+    if desk_id:
+        session.execute(LOCK_DESK, {"desk_id": desk_id})
+        overlapping = session.execute(
+            OVERLAPPING_DESK_BOOKING,
+            {"desk_id": desk_id, "start_date": start_date, "end_date": end_date, "canceled_status_id": canceled_status},
+        ).first()
+        return None if overlapping else desk_id
+
+    # Locked in id order like admin moves, so two lockers of one sector do not deadlock
+    session.execute(select(Desk.desk_id).where(Desk.sector_id == sector_id).order_by(Desk.desk_id).with_for_update())
+    is_booked = exists().where(
+        Booking.desk_id == Desk.desk_id,
+        Booking.start_date < end_date,
+        Booking.end_date > start_date,
+        Booking.status_id != canceled_status,
+    )
+    return session.execute(
+        select(Desk.desk_id).where(Desk.sector_id == sector_id, ~is_booked).order_by(Desk.desk_id).limit(1)
+    ).scalar()
+
+
+def join_waitlist(
+    session_factory: Callable[[], Session],
+    start_date: datetime,
+    end_date: datetime,
+    desk_id: Optional[int] = None,
+    sector_id: Optional[int] = None,
+) -> bool:
+    """Queue the logged in user for a desk or for any desk of a sector.
+    The user is booked automatically by the promote_waitlist trigger as soon as a matching booking is canceled,
+    waiters are served in the order they joined. A desk freed since the user saw it taken is booked right away.
+
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :param start_date: Start of the awaited time range
+    :param end_date: End of the awaited time range
+    :param desk_id: ID of the awaited desk
+    :param sector_id: ID of the sector in which any desk is awaited
+    :return: True if the user joined the waitlist or got the freed desk
+    """
+    user = get_current_user()
+    try:
+        if (desk_id is None) == (sector_id is None):
+            raise ValueError("Select either a desk or a sector to wait for.")
+
+        user_id = get_current_user_profile().user_id
+        with managed_session(session_factory) as session:
+            canceled_status = session.execute(STATUS_ID_BY_NAME, {"status_name": "Canceled"}).scalar_one()
+            # The entry is inserted under the desk locks, a cancellation either ran before the check or finds it
+            freed_desk_id = find_freed_desk(session, start_date, end_date, canceled_status, desk_id, sector_id)
+            if freed_desk_id:
+                # Booked like a promotion, an entry for a free desk would never be promoted
+                pending_status = session.execute(STATUS_ID_BY_NAME, {"status_name": "Pending"}).scalar_one()
+                booking = Booking(
+                    user_id=user_id,
+                    desk_id=freed_desk_id,
+                    start_date=start_date,
+                    end_date=end_date,
+                    status_id=pending_status,
+                )
+                session.add(booking)
+                session.flush()
+                booking_id = booking.booking_id
+                desk_code = session.execute(select(Desk.desk_code).where(Desk.desk_id == freed_desk_id)).scalar_one()
+            else:
+                waiting_count = session.execute(
+                    select(func.count()).select_from(WaitlistEntry).where(WaitlistEntry.user_id == user_id)
+                ).scalar_one()
+                if waiting_count >= MAX_WAITLIST_ENTRIES_PER_USER:
+                    raise ValueError(
+                        f"You can wait for at most {MAX_WAITLIST_ENTRIES_PER_USER} desks or sectors at once."
+                    )
+
+                session.add(
+                    WaitlistEntry(
+                        user_id=user_id, desk_id=desk_id, sector_id=sector_id, start_date=start_date, end_date=end_date
+                    )
+                )
+            session.commit()
+
+        if freed_desk_id:
+            logging.info(
+                f"Desk '{desk_code}' was freed before user '{user}' joined the waitlist, booked from '{start_date}' "
+                f"to '{end_date}'."
+            )
+            log_event(
+                user,
+                "Success",
+                "Booking",
+                f"Desk '{desk_code}' was freed in the meantime and booked from '{start_date}' to '{end_date}'",
+                event_code=BOOKING_CREATED,
+                booking_id=booking_id,
+                desk_code=desk_code,
+            )
+            messagebox.showinfo(
+                title="Booking Successful",
+                message=f"Desk '{desk_code}' was freed in the meantime and has been booked for you.",
+            )
+            return True
+
+        target = f"desk {desk_id}" if desk_id else f"sector {sector_id}"
+        logging.info(f"User '{user}' joined the waitlist for {target} from '{start_date}' to '{end_date}'.")
+        log_event(
+            user,
+            "Success",
+            "Waitlist",
+            f"Joined the waitlist for {target} from '{start_date}' to '{end_date}'",
+            event_code=WAITLIST_JOINED,
+            payload={
+                "desk_id": desk_id,
+                "sector_id": sector_id,
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+            },
+        )
+        messagebox.showinfo(
+            title="Waitlist",
+            message="You are on the waitlist. The desk is booked for you automatically as soon as it is freed.",
+        )
+        return True
+    except ValueError as val_err:
+        logging.error(f"Error while joining the waitlist: {val_err}")
+        log_event(user, "Failure", "Waitlist", f"Error while joining the waitlist: {val_err}")
+        messagebox.showerror(title="Waitlist Error", message=f"Joining the waitlist failed: {val_err}")
+        return False
+    except Exception as exc:
+        logging.error(f"Unexpected error while joining the waitlist: {exc}")
+        log_event(user, "Failure", "Waitlist", f"Unexpected error while joining the waitlist: {exc}")
+        messagebox.showerror(title="Error", message="An unexpected error occurred. Please try again later.")
+        return False
+
+
+def get_user_waitlist(session_factory: Callable[[], Session]) -> list[dict] | None:
+    """Fetch the waitlist entries of the logged in user.
+
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :return: Entries with the awaited desk code or sector name, None on error
+    """
+    try:
+        stmt = (
+            select(
+                WaitlistEntry.waitlist_id,
+                func.coalesce(Desk.desk_code, "Any desk in sector " + Sector.sector_name).label("target"),
+                WaitlistEntry.start_date,
+                WaitlistEntry.end_date,
+            )
+            .outerjoin(Desk, Desk.desk_id == WaitlistEntry.desk_id)
+            .outerjoin(Sector, Sector.sector_id == WaitlistEntry.sector_id)
+            .where(WaitlistEntry.user_id == get_current_user_profile().user_id)
+            .order_by(WaitlistEntry.start_date, WaitlistEntry.waitlist_id)
+        )
+        # Entries disappear on promotion, reading them from the primary shows promotions right away
+        with managed_session(session_factory) as session:
+            return [row._asdict() for row in session.execute(stmt)]
+    except Exception as exc:
+        logging.error(f"Error while fetching the waitlist: {exc}")
+        log_event(get_current_user(), "Failure", "Waitlist", f"Error while fetching the waitlist: {exc}")
+        return None
+
+
+def leave_waitlist(session_factory: Callable[[], Session], waitlist_ids: list[int]) -> int | None:
+    """Remove waitlist entries of the logged in user with a single statement.
+
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :param waitlist_ids: IDs of the entries to remove
+    :return: Number of removed entries, None on error
+    """
+    user = get_current_user()
+    if not waitlist_ids:
+        return 0
+
+    try:
+        with managed_session(session_factory) as session:
+            stmt = (
+                WaitlistEntry.__table__.delete()
+                .where(
+                    WaitlistEntry.waitlist_id.in_(waitlist_ids),
+                    WaitlistEntry.user_id == get_current_user_profile().user_id,
+                )
+                .returning(WaitlistEntry.waitlist_id)
+            )
+            removed_ids = session.execute(stmt).scalars().all()
+            session.commit()
+
+        logging.info(f"User '{user}' left waitlist entries {removed_ids}.")
+        log_event(user, "Success", "Waitlist", f"Waitlist entries removed: {', '.join(map(str, removed_ids))}")
+        return len(removed_ids)
+    except Exception as exc:
+        logging.error(f"Error while leaving waitlist entries {waitlist_ids}: {exc}")
+        log_event(user, "Failure", "Waitlist", f"Error while leaving waitlist entries {waitlist_ids}: {exc}")
+        return None
+
+
+def offer_waitlist(
+    session_factory: Callable[[], Session],
+    reason: str,
+    start_date: datetime,
+    end_date: datetime,
+    desk_id: Optional[int] = None,
+    sector_id: Optional[int] = None,
+) -> bool:
+    """Offer joining the waitlist when the requested desk or sector is full, instead of retrying by hand.
+
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :param reason: Why the booking was not possible
+    :param start_date: Start of the requested time range
+    :param end_date: End of the requested time range
+    :param desk_id: ID of the requested desk
+    :param sector_id: ID of the requested sector
+    :return: True if the user joined the waitlist
+    """
+    if not messagebox.askyesno(
+        title="Join Waitlist",
+        message=f"{reason}\nDo you want to join the waitlist? You will be booked automatically once it is freed.",
+    ):
+        return False
+    return join_waitlist(session_factory, start_date, end_date, desk_id=desk_id, sector_id=sector_id)
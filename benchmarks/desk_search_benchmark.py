@@ -0,0 +1,67 @@
+import time
+import random
+import logging
+
+from backend_operations.desk_search import DeskSearchIndex
+
+
+# Size of the synthetic desk set
+BENCHMARK_DESKS = 50000
+
+BENCHMARK_OFFICES = ["Warsaw", "Krakow", "Gdansk", "Wroclaw", "Poznan"]
+BENCHMARK_DESCRIPTIONS = [None, "Standing desk", "Dual monitor", "Window seat", "Near kitchen", "Quiet zone"]
+# Queries typed key by key, every prefix of a query is measured as one keystroke
+BENCHMARK_QUERIES = ["Warsaw_20th floor_A_17", "krakow 5th c", "window", "dual monitor gdansk", "zzz", "a 1"]
+
+
+def create_benchmark_desks(count: int = BENCHMARK_DESKS, seed: int = 0) -> list[dict]:
+    """Create synthetic desks laid out like the real desk codes (office_floor_sector_number)."""
+    generator = random.Random(seed)
+    desks = []
+    for position in range(count):
+        office_name = BENCHMARK_OFFICES[position % len(BENCHMARK_OFFICES)]
+        floor_name = f"{position // 500 % 40 + 1}th floor"
+        sector_name = "ABCDEFGH"[position // 50 % 8]
+        desks.append(
+            {
+                "desk_code": f"{office_name}_{floor_name}_{sector_name}_{position % 50 + 1}",
+                "office_name": office_name,
+                "floor_name": floor_name,
+                "sector_name": sector_name,
+                "description": generator.choice(BENCHMARK_DESCRIPTIONS),
+            }
+        )
+    return desks
+
+
+def run_benchmark(count: int = BENCHMARK_DESKS) -> dict[str, float]:
+    """
+    Measure index build time and per-keystroke search latency.
+
+    :param count: Number of synthetic desks
+    :return: Build time in milliseconds, mean and worst keystroke latency in microseconds
+    """
+    desks = create_benchmark_desks(count)
+
+    build_start = time.perf_counter()
+    index = DeskSearchIndex(desks)
+    build_time = time.perf_counter() - build_start
+
+    latencies = []
+    for query in BENCHMARK_QUERIES:
+        for length in range(1, len(query) + 1):
+            search_start = time.perf_counter()
+            index.search(query[:length])
+            latencies.append(time.perf_counter() - search_start)
+
+    return {
+        "build_ms": build_time * 1e3,
+        "mean_keystroke_us": sum(latencies) / len(latencies) * 1e6,
+        "worst_keystroke_us": max(latencies) * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    for name, value in run_benchmark().items():
+        print(f"{name:<20}{value:>12.1f}")
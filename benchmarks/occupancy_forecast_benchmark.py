@@ -0,0 +1,74 @@
+import time
+import logging
+from datetime import date, timedelta
+import numpy as np
+
+from backend_operations.slot_calendar import SLOTS_PER_DAY
+from backend_operations.occupancy_forecast import (
+    FORECAST_DAYS,
+    BookingArrays,
+    OfficeSectors,
+    slot_occupancy,
+    forecast_grids,
+)
+
+
+# Two years of history of a large office: 20 floors x 4 sectors
+BENCHMARK_WEEKS = 104
+BENCHMARK_FLOORS = 20
+BENCHMARK_SECTORS_PER_FLOOR = 4
+BENCHMARK_DESKS_PER_SECTOR = 25
+BENCHMARK_BOOKINGS = 1000000
+
+
+def create_benchmark_history(count: int = BENCHMARK_BOOKINGS, seed: int = 0):
+    """Create synthetic bookings with workday peaks and a higher no-show rate on Fridays."""
+    generator = np.random.default_rng(seed)
+    sector_count = BENCHMARK_FLOORS * BENCHMARK_SECTORS_PER_FLOOR
+    day = generator.integers(0, BENCHMARK_WEEKS * 7, count)
+    start_slot = generator.integers(28, 40, count)
+    checked_in = generator.random(count) < np.where(day % 7 == 4, 0.6, 0.85)
+
+    bookings = BookingArrays(
+        sector_index=generator.integers(0, sector_count, count),
+        day=day,
+        start_slot=start_slot,
+        end_slot=np.minimum(start_slot + generator.integers(8, 40, count), SLOTS_PER_DAY),
+        checked_in=checked_in,
+    )
+    sectors = OfficeSectors(
+        sector_ids=np.arange(1, sector_count + 1),
+        floor_ids=np.repeat(np.arange(1, BENCHMARK_FLOORS + 1), BENCHMARK_SECTORS_PER_FLOOR),
+        desk_counts=np.full(sector_count, BENCHMARK_DESKS_PER_SECTOR),
+    )
+    return bookings, sectors
+
+
+def run_benchmark(count: int = BENCHMARK_BOOKINGS) -> dict[str, float]:
+    """
+    Measure the forecast of a month from synthetic booking history, loading from the database is not included.
+
+    :param count: Number of synthetic bookings
+    :return: Timings in milliseconds
+    """
+    bookings, sectors = create_benchmark_history(count)
+
+    occupancy_start = time.perf_counter()
+    slot_occupancy(bookings, len(sectors.sector_ids), BENCHMARK_WEEKS * 7)
+    occupancy_time = time.perf_counter() - occupancy_start
+
+    forecast_start = time.perf_counter()
+    forecast = forecast_grids(bookings, sectors, BENCHMARK_WEEKS * 7, date.today() + timedelta(days=1), FORECAST_DAYS)
+    forecast_time = time.perf_counter() - forecast_start
+
+    logging.info(f"Forecast grid shape {forecast.expected.shape}, peak {forecast.expected.max():.1f} desks.")
+    return {
+        "occupancy_grid_ms": occupancy_time * 1e3,
+        "full_forecast_ms": forecast_time * 1e3,
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    for name, value in run_benchmark().items():
+        print(f"{name:<20}{value:>12.1f}")
@@ -0,0 +1,83 @@
+import os
+import sys
+import shutil
+import logging
+import tempfile
+from sqlalchemy import MetaData, Table, Column, String, create_engine, insert, select
+
+
+# The engines are created when db.sql_db is imported, the two local databases are configured before that
+ROUTING_CHECK_DIR = tempfile.mkdtemp(prefix="read_routing_check_")
+DATABASE_URLS = {
+    "primary": f"sqlite:///{os.path.join(ROUTING_CHECK_DIR, 'primary.sqlite3')}",
+    "replica": f"sqlite:///{os.path.join(ROUTING_CHECK_DIR, 'replica.sqlite3')}",
+}
+os.environ["PRIMARY_DATABASE_URL"] = DATABASE_URLS["primary"]
+os.environ["REPLICA_DATABASE_URL"] = DATABASE_URLS["replica"]
+
+import db.sql_db as sql_db
+from db.session_management import managed_session
+
+# Every database answers with its own name, so a read shows which engine served it
+metadata = MetaData()
+database_name = Table("database_name", metadata, Column("name", String, primary_key=True))
+
+
+def create_databases() -> None:
+    """Create the two local databases, each holding its own name."""
+    for name, url in DATABASE_URLS.items():
+        engine = create_engine(url)
+        metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(insert(database_name).values(name=name))
+        engine.dispose()
+
+
+def read_database_name(session) -> str:
+    """Return the name of the database serving reads of the session."""
+    return session.execute(select(database_name.c.name)).scalar_one()
+
+
+def run_routing_checks() -> bool:
+    """
+    Check the read routing of sessions against a primary and a replica database.
+
+    :return: True if every read was served by the expected database
+    """
+    create_databases()
+    session = sql_db.SessionFactory()
+    shared_session_factory = lambda: session
+    results = []
+
+    with managed_session(shared_session_factory, read_only=True) as outer:
+        results.append(("read-only session", read_database_name(outer), "replica"))
+        with managed_session(shared_session_factory) as inner:
+            results.append(("nested read-write block", read_database_name(inner), "primary"))
+        results.append(("read-only session after the nested block", read_database_name(outer), "replica"))
+
+    with managed_session(shared_session_factory) as plain:
+        results.append(("read-write session", read_database_name(plain), "primary"))
+
+    with managed_session(shared_session_factory, read_only=True) as reading:
+        reading.execute(insert(database_name).values(name="write"))
+        reading.rollback()
+        results.append(("read-only session after a write", read_database_name(reading), "primary"))
+
+    session.close()
+    sql_db.SessionFactory.remove()
+
+    passed = True
+    for check, served_by, expected in results:
+        status = "ok" if served_by == expected else "FAILED"
+        passed = passed and served_by == expected
+        print(f"{check:<45} served by {served_by:<8} expected {expected:<8} {status}")
+    return passed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    try:
+        routing_ok = run_routing_checks()
+    finally:
+        shutil.rmtree(ROUTING_CHECK_DIR, ignore_errors=True)
+    sys.exit(0 if routing_ok else 1)
@@ -0,0 +1,144 @@
+import timeit
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.sql import select
+from sqlalchemy.orm import Session
+
+from db.db_models import Base, Role, Department, User, Office, Floor, Sector, Desk, Status, Booking
+from backend_operations.statements import (
+    STATUS_ID_BY_NAME,
+    OVERLAPPING_DESK_BOOKING,
+    NEXT_PENDING_USER_BOOKING,
+    DESKS_IN_SECTOR,
+)
+
+
+# Number of calls measured for every query variant
+BENCHMARK_CALLS = 5000
+
+BENCHMARK_USER = "benchmark@example.com"
+BENCHMARK_DESK = "Warsaw_20th floor_A_1"
+
+
+def create_benchmark_session() -> Session:
+    """Create an in-memory SQLite database with a single booking, so the measured time is mostly Python overhead."""
+    engine = create_engine("sqlite://")
+    tables = [
+        Role.__table__,
+        Department.__table__,
+        User.__table__,
+        Office.__table__,
+        Floor.__table__,
+        Sector.__table__,
+        Desk.__table__,
+        Status.__table__,
+        Booking.__table__,
+    ]
+    Base.metadata.create_all(bind=engine, tables=tables)
+
+    session = Session(engine)
+    session.add_all(
+        [
+            Role(role_id=1, role_name="User"),
+            Department(department_id=1, department_name="IT"),
+            User(user_id=1, user_name=BENCHMARK_USER, password="-", role_id=1, department_id=1),
+            Office(office_id=1, office_name="Warsaw"),
+            Floor(floor_id=1, office_id=1, floor_name="20th floor"),
+            Sector(sector_id=1, floor_id=1, sector_name="A"),
+            Desk(desk_id=1, office_id=1, floor_id=1, sector_id=1, local_id=1, desk_code=BENCHMARK_DESK),
+            Status(status_id=1, status_name="Pending"),
+            Status(status_id=4, status_name="Canceled"),
+            Booking(
+                booking_id=1,
+                user_id=1,
+                desk_id=1,
+                start_date=datetime.now() + timedelta(days=1),
+                end_date=datetime.now() + timedelta(days=1, hours=8),
+                status_id=1,
+            ),
+        ]
+    )
+    session.commit()
+    return session
+
+
+def get_benchmark_cases(start_date: datetime, end_date: datetime) -> dict:
+    """Return pairs of (statement rebuilt on every call, cached statement with parameters) for the hot queries.
+    Both variants of a pair produce the same SQL, so the difference is the Python overhead only."""
+    return {
+        "status id": (
+            lambda: select(Status.status_id).where(Status.status_name == "Pending"),
+            (STATUS_ID_BY_NAME, {"status_name": "Pending"}),
+        ),
+        "desk overlap": (
+            lambda: select(Booking.booking_id)
+            .where(
+                Booking.desk_id == 1,
+                Booking.start_date < end_date,
+                Booking.end_date > start_date,
+                Booking.status_id != 4,
+            )
+            .limit(1),
+            (
+                OVERLAPPING_DESK_BOOKING,
+                {"desk_id": 1, "start_date": start_date, "end_date": end_date, "canceled_status_id": 4},
+            ),
+        ),
+        "next booking": (
+            lambda: select(Booking.booking_id, Desk.desk_code, Booking.start_date, Booking.end_date)
+            .join(Desk, Desk.desk_id == Booking.desk_id)
+            .where(
+                Booking.user_id == 1,
+                Booking.status_id
+                == (select(Status.status_id).where(Status.status_name == "Pending")).scalar_subquery(),
+                Booking.start_date > start_date,
+            )
+            .order_by(Booking.start_date)
+            .limit(1),
+            (NEXT_PENDING_USER_BOOKING, {"user_id": 1, "now": start_date}),
+        ),
+        "desks in sector": (
+            lambda: select(Desk.desk_code)
+            .where(Desk.office_id == 1, Desk.floor_id == 1, Desk.sector_id == 1)
+            .order_by(Desk.sector_id, Desk.local_id),
+            (DESKS_IN_SECTOR, {"office_id": 1, "floor_id": 1, "sector_id": 1}),
+        ),
+    }
+
+
+def run_benchmark(calls: int = BENCHMARK_CALLS) -> dict[str, tuple[float, float, float]]:
+    """
+    Measure per-call time of hot queries built on every call, with and without the compiled cache,
+    and of the cached statements.
+
+    :param calls: Number of calls measured for every variant
+    :return: Per query (rebuilt without compiled cache, rebuilt, cached) times in microseconds
+    """
+    session = create_benchmark_session()
+    uncached_session = Session(session.get_bind().execution_options(compiled_cache=None))
+    start_date = datetime.now()
+    end_date = start_date + timedelta(hours=8)
+
+    results = {}
+    for name, (build_statement, (statement, params)) in get_benchmark_cases(start_date, end_date).items():
+        no_cache = timeit.timeit(lambda: uncached_session.execute(build_statement()).all(), number=calls)
+        rebuilt = timeit.timeit(lambda: session.execute(build_statement()).all(), number=calls)
+        cached = timeit.timeit(lambda: session.execute(statement, params).all(), number=calls)
+        results[name] = (no_cache / calls * 1e6, rebuilt / calls * 1e6, cached / calls * 1e6)
+
+    session.close()
+    uncached_session.close()
+    return results
+
+
+def print_benchmark_results(results: dict[str, tuple[float, float, float]]) -> None:
+    """Print benchmark results as a table."""
+    print(f"{'query':<18}{'no compile cache':>18}{'rebuilt':>12}{'cached':>12}{'saved':>10}")
+    for name, (no_cache, rebuilt, cached) in results.items():
+        print(f"{name:<18}{no_cache:>16.1f}us{rebuilt:>10.1f}us{cached:>10.1f}us{1 - cached / rebuilt:>10.0%}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    print_benchmark_results(run_benchmark())
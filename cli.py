@@ -0,0 +1,295 @@
+import os
+import sys
+import logging
+import argparse
+import importlib
+from datetime import datetime
+
+
+# Modules are imported inside the subcommands, so the command line starts without tkinter, PIL or a database
+# connection and only loads what the selected subcommand uses. Runs from cron and scripts on headless servers.
+
+BENCHMARK_PACKAGE = "benchmarks"
+# Environment variable with the admin password of the close subcommand, asked for when it is not set
+ADMIN_PASSWORD_VARIABLE = "DESK_BOOKING_ADMIN_PASSWORD"
+# Subcommands whose arguments are defined next to their backend, added only when the subcommand is run
+BACKEND_ARGUMENTS = {
+    "export": ("backend_operations.export_backend", "add_export_arguments"),
+    "forecast": ("backend_operations.occupancy_forecast", "add_forecast_arguments"),
+    "generate": ("db.synthetic_data", "add_synthetic_arguments"),
+}
+
+
+def init_db(args: argparse.Namespace) -> int:
+    """Create tables, triggers, scheduled jobs and views and load the initial data."""
+    from db.sql_db import initialize_app_db
+
+    initialize_app_db()
+    return 0
+
+
+def import_data(args: argparse.Namespace) -> int:
+    """Load office topology CSV files into tables which are still empty."""
+    from db.sql_db import preload_data
+
+    preload_data(args.data_dir)
+    return 0
+
+
+def generate(args: argparse.Namespace) -> int:
+    """Generate a synthetic data set at production scale, optionally loading it into an empty database."""
+    from db.synthetic_data import run_synthetic
+
+    counts = run_synthetic(args)
+    print(", ".join(f"{count} {table}" for table, count in counts.items()) + f" written to '{args.out_dir}'.")
+    return 0
+
+
+def export(args: argparse.Namespace) -> int:
+    """Export bookings or logs to a CSV or Parquet file."""
+    from backend_operations.export_backend import run_export
+
+    row_count = run_export(args)
+    print(f"{row_count} rows exported to '{args.output_path}'.")
+    return 0
+
+
+def forecast(args: argparse.Namespace) -> int:
+    """Forecast slot occupancy of an office from its history."""
+    from backend_operations.occupancy_forecast import run_forecast
+
+    row_count = run_forecast(args)
+    print(f"{row_count} rows written to '{args.output_path}'.")
+    return 0
+
+
+def stats(args: argparse.Namespace) -> int:
+    """Print the most reserved desk and the most frequent user."""
+    from db.sql_db import SessionFactory
+    from backend_operations.statements import MOST_RESERVED_DESK, MOST_FREQUENT_USER
+
+    session = SessionFactory()
+    try:
+        desk = session.execute(MOST_RESERVED_DESK).first()
+        user = session.execute(MOST_FREQUENT_USER).scalars().first()
+    finally:
+        session.close()
+        SessionFactory.remove()
+
+    if desk:
+        print(
+            f"Most reserved desk: '{desk.desk_code}' ({desk.office_name}, {desk.floor_name}), "
+            f"{desk.reservation_count} reservations"
+        )
+    if user:
+        print(f"Most frequent user: '{user.user_name}', {user.reservation_count} reservations")
+    if not desk and not user:
+        print("No bookings found.")
+    return 0
+
+
+def logs(args: argparse.Namespace) -> int:
+    """Query the audit log by time range, event code, user, floor, desk or booking."""
+    from backend_operations.log_utils import LogFilter, get_logs, count_logs
+
+    log_filter = LogFilter(
+        args.start_date,
+        args.end_date,
+        event_codes=args.event_codes,
+        user_name=args.user_name,
+        floor_id=args.floor_id,
+        desk_code=args.desk_code,
+        booking_id=args.booking_id,
+    )
+    if args.count:
+        for event_code, count in sorted(count_logs(log_filter).items(), key=lambda item: -item[1]):
+            print(f"{event_code or '-'}: {count}")
+        return 0
+
+    records, _ = get_logs(log_filter, limit=args.limit)
+    for record in records:
+        print(
+            f"{record['created_at']:%Y-%m-%d %H:%M:%S} {record['event_code'] or '-'} {record['user_name']} "
+            f"{record['event_description']}"
+        )
+    return 0
+
+
+def sweep(args: argparse.Namespace) -> int:
+    """
+    Run the scheduled maintenance right away: update booking statuses, move finished bookings to history
+    and archive expired log partitions. Replaces the pg_cron jobs where pg_cron is not available.
+    """
+    import sqlalchemy
+    from db.sql_db import desk_booking_engine
+
+    with desk_booking_engine.begin() as connection:
+        connection.execute(sqlalchemy.text("SELECT update_booking_statuses();"))
+        moved_count = connection.execute(
+            sqlalchemy.text("SELECT archive_finished_bookings(:horizon_days);"), {"horizon_days": args.history_days}
+        ).scalar_one()
+    print(f"Booking statuses updated, {moved_count} finished bookings moved to history.")
+
+    if not args.skip_logs:
+        from db.log_retention import archive_old_logs
+
+        archived = archive_old_logs(desk_booking_engine, args.log_retention_months, args.log_archive_dir)
+        print(f"{len(archived)} log partitions archived.")
+    return 0
+
+
+def close(args: argparse.Namespace) -> int:
+    """Close an office, floor, sector or desks for a time range, moving or canceling the affected bookings."""
+    import getpass
+    from db.sql_db import SessionFactory
+    from backend_operations.user_login import verify_credentials
+    from backend_operations.admin_backend import close_desks
+
+    # The password is read from the environment in scripts, otherwise it is asked for without echo
+    password = os.environ.get(ADMIN_PASSWORD_VARIABLE) or getpass.getpass(f"Password of {args.admin}: ")
+    admin_profile = verify_credentials(args.admin, password)
+    if not admin_profile:
+        print("Error: invalid email or password.", file=sys.stderr)
+        return 1
+
+    report = close_desks(
+        SessionFactory,
+        args.start_date,
+        args.end_date,
+        args.reason,
+        office_id=args.office_id,
+        floor_id=args.floor_id,
+        sector_id=args.sector_id,
+        desk_ids=args.desk_ids,
+        target_floor_id=args.target_floor_id,
+        admin_profile=admin_profile,
+    )
+    for booking in report["moved"]:
+        print(
+            f"moved    {booking['booking_id']} {booking['user_name']} {booking['start_date']:%Y-%m-%d %H:%M} "
+            f"'{booking['previous_desk_code']}' -> '{booking['desk_code']}'"
+        )
+    for booking in report["canceled"]:
+        print(
+            f"canceled {booking['booking_id']} {booking['user_name']} {booking['start_date']:%Y-%m-%d %H:%M} "
+            f"'{booking['desk_code']}'"
+        )
+    print(f"{len(report['moved'])} bookings moved, {len(report['canceled'])} canceled.")
+    return 0
+
+
+def benchmark(args: argparse.Namespace) -> int:
+    """Run a benchmark module as if it was started with python -m, remaining arguments are passed on."""
+    import runpy
+    import pkgutil
+
+    package_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), BENCHMARK_PACKAGE)
+    names = sorted(module.name for module in pkgutil.iter_modules([package_path]))
+    if args.name not in names:
+        print(f"Unknown benchmark '{args.name}', available: {', '.join(names)}", file=sys.stderr)
+        return 2
+
+    sys.argv = [f"{BENCHMARK_PACKAGE}/{args.name}.py", *args.arguments]
+    try:
+        runpy.run_module(f"{BENCHMARK_PACKAGE}.{args.name}", run_name="__main__", alter_sys=True)
+    except SystemExit as exit_signal:
+        return exit_signal.code or 0
+    return 0
+
+
+def build_parser(command: str | None = None) -> argparse.ArgumentParser:
+    """
+    Build the parser with one subcommand per task.
+
+    :param command: The subcommand being run, only its backend module is imported for its arguments
+    """
+    parser = argparse.ArgumentParser(description="Desk Booking System command line for headless servers.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log progress messages")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("init-db", help=init_db.__doc__).set_defaults(handler=init_db)
+
+    import_parser = subparsers.add_parser("import", help=import_data.__doc__)
+    import_parser.add_argument("--data-dir", default="db/data", help="Directory with the CSV files")
+    import_parser.set_defaults(handler=import_data)
+
+    subparsers.add_parser("generate", help=generate.__doc__).set_defaults(handler=generate)
+    subparsers.add_parser("export", help=export.__doc__).set_defaults(handler=export)
+    subparsers.add_parser("forecast", help=forecast.__doc__).set_defaults(handler=forecast)
+
+    subparsers.add_parser("stats", help=stats.__doc__.splitlines()[0]).set_defaults(handler=stats)
+
+    logs_parser = subparsers.add_parser("logs", help=logs.__doc__)
+    logs_parser.add_argument("--start-date", type=datetime.fromisoformat, required=True)
+    logs_parser.add_argument("--end-date", type=datetime.fromisoformat, required=True)
+    logs_parser.add_argument("--event", dest="event_codes", action="append", help="Event code, may be repeated")
+    logs_parser.add_argument("--user", dest="user_name")
+    logs_parser.add_argument("--floor-id", type=int)
+    logs_parser.add_argument("--desk-code")
+    logs_parser.add_argument("--booking-id", type=int)
+    logs_parser.add_argument("--limit", type=int, default=100, help="Number of newest records printed")
+    logs_parser.add_argument("--count", action="store_true", help="Print the number of records per event code")
+    logs_parser.set_defaults(handler=logs)
+
+    sweep_parser = subparsers.add_parser("sweep", help="Run booking status updates and history and log archiving")
+    # Defaults of the scheduled jobs, not imported to keep the parser free of database modules
+    sweep_parser.add_argument("--history-days", type=int, default=30, help="Move bookings finished this long ago")
+    sweep_parser.add_argument("--skip-logs", action="store_true", help="Do not archive expired log partitions")
+    sweep_parser.add_argument("--log-retention-months", type=int, default=6)
+    sweep_parser.add_argument("--log-archive-dir", default="log_archive")
+    sweep_parser.set_defaults(handler=sweep)
+
+    close_parser = subparsers.add_parser("close", help=close.__doc__)
+    close_parser.add_argument("--admin", required=True, help="Email of the admin closing the desks")
+    close_parser.add_argument("--start-date", type=datetime.fromisoformat, required=True)
+    close_parser.add_argument("--end-date", type=datetime.fromisoformat, required=True)
+    close_parser.add_argument("--reason", required=True, help="Reason shown to the affected users")
+    close_parser.add_argument("--office-id", type=int)
+    close_parser.add_argument("--floor-id", type=int)
+    close_parser.add_argument("--sector-id", type=int)
+    close_parser.add_argument("--desk-id", dest="desk_ids", type=int, action="append", help="May be repeated")
+    close_parser.add_argument("--target-floor-id", type=int, help="Move the affected bookings to this floor")
+    close_parser.set_defaults(handler=close)
+
+    benchmark_parser = subparsers.add_parser("benchmark", help=benchmark.__doc__)
+    benchmark_parser.add_argument("name", help="Benchmark module name, e.g. desk_search_benchmark")
+    benchmark_parser.add_argument("arguments", nargs=argparse.REMAINDER, help="Arguments of the benchmark")
+    benchmark_parser.set_defaults(handler=benchmark)
+
+    if command in BACKEND_ARGUMENTS:
+        module_name, function_name = BACKEND_ARGUMENTS[command]
+        add_arguments = getattr(importlib.import_module(module_name), function_name)
+        add_arguments(subparsers.choices[command])
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Run a subcommand.
+
+    :param argv: Command line arguments without the program name, defaults to sys.argv
+    :return: Exit code
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    command = next((argument for argument in argv if not argument.startswith("-")), None)
+    args = build_parser(command).parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    try:
+        return args.handler(args)
+    except SystemExit as exit_signal:
+        # Database setup functions stop with a bare sys.exit() after logging the error
+        return 1 if exit_signal.code is None else exit_signal.code
+    except Exception as exc:
+        logging.error(f"Command '{args.command}' failed: {exc}")
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import time
+import logging
+import argparse
+import sqlalchemy
+
+from db.db_models import Booking, BookingHistory
+
+
+# Number of rows updated per backfill transaction, keeps row locks and WAL bursts short
+BACKFILL_BATCH_SIZE = 5000
+# Pause between batches so concurrent bookings are not starved
+BACKFILL_PAUSE_SECONDS = 0.05
+
+# Tables which referenced users and desks by user_name and desk_code in older versions of the app
+BOOKING_TABLES = (Booking.__table__, BookingHistory.__table__)
+# Views selecting the legacy columns, they are recreated by db.sql_db after the migration
+DEPENDENT_VIEWS = ("most_frequent_users", "all_bookings")
+
+
+def has_legacy_keys(connection, table_name: str) -> bool:
+    """
+    Check whether a bookings table still has the user_name and desk_code columns.
+
+    :param connection: SQLAlchemy connection
+    :param table_name: Name of the table
+    """
+    return bool(
+        connection.execute(
+            sqlalchemy.text(
+                """
+                SELECT 1
+                FROM information_schema.columns
+                WHERE table_name = :table_name AND column_name = 'desk_code';
+                """
+            ),
+            {"table_name": table_name},
+        ).scalar()
+    )
+
+
+def add_id_columns(connection, table_name: str) -> None:
+    """
+    Add nullable user_id and desk_id columns next to the legacy ones, new bookings fill them right away.
+
+    :param connection: SQLAlchemy connection
+    :param table_name: Name of the table
+    """
+    connection.execute(
+        sqlalchemy.text(
+            f"""
+            ALTER TABLE {table_name}
+            ADD COLUMN IF NOT EXISTS user_id integer REFERENCES users (user_id),
+            ADD COLUMN IF NOT EXISTS desk_id integer REFERENCES desks (desk_id);
+            """
+        )
+    )
+
+
+def backfill_batch(connection, table_name: str, after_booking_id: int, batch_size: int) -> tuple[int | None, int]:
+    """
+    Fill user_id and desk_id of the next batch of rows, in booking_id order.
+
+    :param connection: SQLAlchemy connection
+    :param table_name: Name of the table
+    :param after_booking_id: Only rows with a higher booking_id are updated
+    :param batch_size: Maximum number of updated rows
+    :return: Tuple of the last booking_id of the batch (None when nothing is left) and the number of updated rows
+    """
+    last_booking_id, updated = connection.execute(
+        sqlalchemy.text(
+            f"""
+            WITH batch AS (
+                SELECT booking_id, user_name, desk_code
+                FROM {table_name}
+                WHERE booking_id > :after_booking_id AND (user_id IS NULL OR desk_id IS NULL)
+                ORDER BY booking_id
+                LIMIT :batch_size
+            ),
+            updated AS (
+                UPDATE {table_name} AS target
+                SET user_id = users.user_id, desk_id = desks.desk_id
+                FROM batch
+                JOIN users ON users.user_name = batch.user_name
+                JOIN desks ON desks.desk_code = batch.desk_code
+                WHERE target.booking_id = batch.booking_id
+                RETURNING target.booking_id
+            )
+            SELECT (SELECT MAX(booking_id) FROM batch), (SELECT COUNT(*) FROM updated);
+            """
+        ),
+        {"after_booking_id": after_booking_id, "batch_size": batch_size},
+    ).one()
+    return last_booking_id, updated
+
+
+def backfill_ids(
+    engine, table_name: str, batch_size: int = BACKFILL_BATCH_SIZE, pause_seconds: float = BACKFILL_PAUSE_SECONDS
+) -> int:
+    """
+    Backfill user_id and desk_id in batches, every batch is committed on its own.
+    Can be stopped and started again at any time, already filled rows are skipped.
+
+    :param engine: SQLAlchemy engine connected to the database
+    :param table_name: Name of the table
+    :param batch_size: Number of rows updated per transaction
+    :param pause_seconds: Pause between batches
+    :return: Number of updated rows
+    """
+    updated_total = 0
+    last_booking_id = 0
+    while True:
+        with engine.begin() as connection:
+            last_booking_id, updated = backfill_batch(connection, table_name, last_booking_id, batch_size)
+
+        if last_booking_id is None:
+            return updated_total
+
+        updated_total += updated
+        logging.info(f"Backfilled {updated_total} rows of '{table_name}', up to booking {last_booking_id}.")
+        time.sleep(pause_seconds)
+
+
+def finalize_id_columns(connection, table) -> None:
+    """
+    Make the ID columns mandatory, drop the legacy columns and create the ID-based indexes.
+    Rows inserted by older clients during the backfill are filled under a lock first.
+
+    :param connection: SQLAlchemy connection
+    :param table: SQLAlchemy table of the model
+    """
+    connection.execute(sqlalchemy.text(f"LOCK TABLE {table.name} IN SHARE ROW EXCLUSIVE MODE;"))
+    last_booking_id = 0
+    while last_booking_id is not None:
+        last_booking_id, _ = backfill_batch(connection, table.name, last_booking_id, BACKFILL_BATCH_SIZE)
+
+    orphaned = connection.execute(
+        sqlalchemy.text(f"SELECT COUNT(*) FROM {table.name} WHERE user_id IS NULL OR desk_id IS NULL;")
+    ).scalar()
+    if orphaned:
+        raise ValueError(f"{orphaned} rows of '{table.name}' reference users or desks which do not exist.")
+
+    # Legacy indexes are dropped together with the columns
+    connection.execute(
+        sqlalchemy.text(
+            f"""
+            ALTER TABLE {table.name}
+            ALTER COLUMN user_id SET NOT NULL,
+            ALTER COLUMN desk_id SET NOT NULL,
+            DROP COLUMN user_name,
+            DROP COLUMN desk_code;
+            """
+        )
+    )
+    for index in table.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def migrate_booking_keys(engine, batch_size: int = BACKFILL_BATCH_SIZE) -> None:
+    """
+    Move bookings and bookings_history from user_name and desk_code to integer user_id and desk_id keys.
+    Does nothing on databases which already use the ID keys.
+
+    :param engine: SQLAlchemy engine connected to the database
+    :param batch_size: Number of rows updated per backfill transaction
+    """
+    try:
+        with engine.connect() as connection:
+            legacy_tables = [table for table in BOOKING_TABLES if has_legacy_keys(connection, table.name)]
+
+        if not legacy_tables:
+            logging.info("Bookings already use user_id and desk_id keys. Skipping migration.")
+            return
+
+        with engine.begin() as connection:
+            for table in legacy_tables:
+                add_id_columns(connection, table.name)
+
+        for table in legacy_tables:
+            backfill_ids(engine, table.name, batch_size)
+
+        with engine.begin() as connection:
+            for view_name in DEPENDENT_VIEWS:
+                connection.execute(sqlalchemy.text(f"DROP VIEW IF EXISTS {view_name};"))
+            for table in legacy_tables:
+                finalize_id_columns(connection, table)
+
+        logging.info("Bookings migrated to user_id and desk_id keys successfully.")
+    except Exception as exc:
+        logging.error(f"Failed to migrate bookings to user_id and desk_id keys: {exc}")
+        raise
+
+
+if __name__ == "__main__":
+    from db.sql_db import desk_booking_engine
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="Migrate bookings to integer user and desk keys.")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE, help="Rows per backfill transaction")
+    parser.add_argument(
+        "--backfill-only",
+        action="store_true",
+        help="Only add and fill the ID columns, the legacy columns are kept for clients which were not upgraded yet",
+    )
+    args = parser.parse_args()
+
+    if args.backfill_only:
+        with desk_booking_engine.begin() as connection:
+            tables = [table for table in BOOKING_TABLES if has_legacy_keys(connection, table.name)]
+            for table in tables:
+                add_id_columns(connection, table.name)
+        for table in tables:
+            backfill_ids(desk_booking_engine, table.name, args.batch_size)
+    else:
+        migrate_booking_keys(desk_booking_engine, args.batch_size)
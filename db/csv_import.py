@@ -5,7 +5,7 @@ from csv import reader
 from sqlalchemy import Table, select
 from sqlalchemy.orm import Session
 
-from db.db_models import Sector, Floor, Office
+from db.db_models import Sector, Floor, Office, Desk
 
 
 def if_table_populated(sql_session: Session, table: Table) -> bool:
@@ -66,6 +66,37 @@ def create_desk_code(sql_session: Session, desk_data: dict, file_name: str, line
         raise ValueError(f"Sector with ID {sector_id} not found in the database.")
 
 
+def resolve_desk_id(sql_session: Session, record_data: dict, file_name: str, line: int) -> None:
+    """
+    Replace sector ID and local ID of a desk with its desk ID.
+
+    Args:
+        sql_session (Session): SQLAlchemy session object
+        record_data (dict): row data with sector_id and local_id
+        file_name (str): name of csv file
+        line (int): line number
+
+    Returns:
+        None
+    """
+    sector_id = record_data.pop("sector_id", None)
+    local_id = record_data.pop("local_id", None)
+
+    if any([not sector_id, not local_id]):
+        raise ValueError(
+            f"Sector ID and local ID are required to identify a desk. Error in CSV {file_name} in line {line}"
+        )
+
+    desk_id = sql_session.execute(
+        select(Desk.desk_id).where(Desk.sector_id == int(sector_id), Desk.local_id == int(local_id))
+    ).scalar_one_or_none()
+
+    if desk_id:
+        record_data["desk_id"] = desk_id
+    else:
+        raise ValueError(f"Desk {local_id} in sector with ID {sector_id} not found in the database.")
+
+
 def import_table_data(sql_session: Session, table_model, file_name: str, field_names: list) -> None:
     """
     Import rows from CSV file into table in the database.
@@ -92,6 +123,10 @@ def import_table_data(sql_session: Session, table_model, file_name: str, field_n
                     if table_model.__tablename__ == "desks":
                         create_desk_code(sql_session, record_data, file_name, csv_file.line_num)
 
+                    # Desk geometries are keyed by sector and local ID of the desk
+                    if table_model.__tablename__ == "desk_geometries":
+                        resolve_desk_id(sql_session, record_data, file_name, csv_file.line_num)
+
                     # Create a new instance of the model
                     record_instance = table_model(**record_data)
                     sql_session.add(record_instance)
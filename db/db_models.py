@@ -1,6 +1,18 @@
 from sqlalchemy.sql import func
 from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    BigInteger,
+    Date,
+    DateTime,
+    ForeignKey,
+    UniqueConstraint,
+    Index,
+    CheckConstraint,
+)
 
 Base = declarative_base()
 
@@ -94,15 +106,15 @@ class Sector(Base):
     floor_id = Column(Integer, ForeignKey("floors.floor_id"), nullable=False)
     sector_name = Column(String, nullable=False)
 
-    # Composite unique constraint: sector_name + floor_id
-    __table_args__ = (UniqueConstraint("floor_id", "sector_name", name="uq_floor_sector_name"),)
-
     # Relationships
     floor = relationship("Floor", back_populates="sectors")
     desks = relationship("Desk", back_populates="sector")
 
-    # Indexes
-    __table_args__ = (Index("idx_sectors_floor_sector_name", "floor_id", "sector_name"),)
+    # Composite unique constraint: sector_name + floor_id, and indexes
+    __table_args__ = (
+        UniqueConstraint("floor_id", "sector_name", name="uq_floor_sector_name"),
+        Index("idx_sectors_floor_sector_name", "floor_id", "sector_name"),
+    )
 
     def __repr__(self):
         return f"<Sector(sector_id={self.sector_id}, sector_name='{self.sector_name}', " f"floor_id={self.floor_id})>"
@@ -124,6 +136,7 @@ class Desk(Base):
     floor = relationship("Floor", back_populates="desks")
     sector = relationship("Sector", back_populates="desks")
     bookings = relationship("Booking", back_populates="desk")
+    geometry = relationship("DeskGeometry", back_populates="desk", uselist=False)
 
     # Indexes
     __table_args__ = (Index("idx_desks_office_floor_sector", "office_id", "floor_id", "sector_id"),)
@@ -136,6 +149,20 @@ class Desk(Base):
         )
 
 
+class DeskGeometry(Base):
+    __tablename__ = "desk_geometries"
+
+    desk_id = Column(Integer, ForeignKey("desks.desk_id"), primary_key=True)
+    # Points "x,y x,y ..." normalized to the size of the floor layout image
+    polygon = Column(String, nullable=False)
+
+    # Relationships
+    desk = relationship("Desk", back_populates="geometry")
+
+    def __repr__(self):
+        return f"<DeskGeometry(desk_id={self.desk_id}, polygon='{self.polygon}')>"
+
+
 class Status(Base):
     __tablename__ = "statuses"
 
@@ -153,8 +180,9 @@ class Booking(Base):
     __tablename__ = "bookings"
 
     booking_id = Column(Integer, primary_key=True, autoincrement=True)
-    user_name = Column(String, ForeignKey("users.user_name"), nullable=False)
-    desk_code = Column(String, ForeignKey("desks.desk_code"), nullable=False)
+    # Integer keys keep the indexes of the largest table small, older databases are migrated by db.booking_keys_migration
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
+    desk_id = Column(Integer, ForeignKey("desks.desk_id"), nullable=False)
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=False)
     status_id = Column(Integer, ForeignKey("statuses.status_id"), nullable=False)
@@ -167,14 +195,98 @@ class Booking(Base):
 
     # Indexes
     __table_args__ = (
-        Index("idx_bookings_date_range", "start_date", "end_date"),
-        Index("idx_bookings_user_desk_date", "user_name", "desk_code", "start_date", "end_date"),
+        Index("idx_bookings_desk_date", "desk_id", "start_date", "end_date"),
+        # Next and active booking lookups, equality columns first so the range on start_date is the last key
+        Index("idx_bookings_user_status_start", "user_id", "status_id", "start_date"),
+        # Keyset pagination of the user's bookings on (start_date, booking_id)
+        Index("idx_bookings_user_start", "user_id", "start_date", "booking_id"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<Booking(booking_id={self.booking_id}, user_id={self.user_id}, "
+            f"desk_id={self.desk_id}, status_id={self.status_id}, "
+            f"start_date={self.start_date}, end_date={self.end_date})>"
+        )
+
+
+class BookingHistory(Base):
+    __tablename__ = "bookings_history"
+
+    # Finished bookings keep their original booking_id when moved out of the bookings table
+    booking_id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
+    desk_id = Column(Integer, ForeignKey("desks.desk_id"), nullable=False)
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False)
+    status_id = Column(Integer, ForeignKey("statuses.status_id"), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    # Indexes
+    __table_args__ = (
+        # Same keys as idx_bookings_user_start, the past bookings page merges both ordered index scans
+        Index("idx_bookings_history_user_start_id", "user_id", "start_date", "booking_id"),
+        Index("idx_bookings_history_desk_start", "desk_id", "start_date"),
     )
 
     def __repr__(self):
         return (
-            f"<Booking(booking_id={self.booking_id}, user_name={self.user_name}, "
-            f"desk_code='{self.desk_code}', status_id={self.status_id}, "
+            f"<BookingHistory(booking_id={self.booking_id}, user_id={self.user_id}, "
+            f"desk_id={self.desk_id}, status_id={self.status_id}, "
+            f"start_date={self.start_date}, end_date={self.end_date})>"
+        )
+
+
+class FloorDayVersion(Base):
+    __tablename__ = "floor_day_versions"
+
+    floor_id = Column(Integer, ForeignKey("floors.floor_id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    # Taken from a global sequence by the bump_floor_day_versions trigger in db.sql_db on every booking change
+    version = Column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<FloorDayVersion(floor_id={self.floor_id}, day={self.day}, version={self.version})>"
+
+
+class UserBookingVersion(Base):
+    __tablename__ = "user_booking_versions"
+
+    user_id = Column(Integer, ForeignKey("users.user_id"), primary_key=True)
+    # Bumped from the floor day sequence by the same trigger whenever a booking of the user changes,
+    # the local cache revalidates the user's bookings with it
+    version = Column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<UserBookingVersion(user_id={self.user_id}, version={self.version})>"
+
+
+class WaitlistEntry(Base):
+    __tablename__ = "waitlist_entries"
+
+    waitlist_id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
+    # Either a specific desk or any desk of a sector is awaited
+    desk_id = Column(Integer, ForeignKey("desks.desk_id"), nullable=True)
+    sector_id = Column(Integer, ForeignKey("sectors.sector_id"), nullable=True)
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False)
+    # Waiters are promoted in the order they joined
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    # Entries only exist while waiting, promotion to a booking is done by the promote_waitlist trigger in db.sql_db
+    __table_args__ = (
+        CheckConstraint("(desk_id IS NULL) <> (sector_id IS NULL)", name="ck_waitlist_desk_or_sector"),
+        Index("idx_waitlist_desk_created", "desk_id", "created_at"),
+        Index("idx_waitlist_sector_created", "sector_id", "created_at"),
+        Index("idx_waitlist_user_start", "user_id", "start_date"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<WaitlistEntry(waitlist_id={self.waitlist_id}, user_id={self.user_id}, "
+            f"desk_id={self.desk_id}, sector_id={self.sector_id}, "
             f"start_date={self.start_date}, end_date={self.end_date})>"
         )
 
@@ -187,10 +299,34 @@ class Log(Base):
     event_type = Column(String, nullable=False)
     component = Column(String, nullable=False)
     event_description = Column(String, nullable=False)
-    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    # Partition key has to be a part of the primary key
+    created_at = Column(DateTime, primary_key=True, nullable=False, server_default=func.now())
+
+    # Structured fields queried by audits instead of matching descriptions, empty for older rows.
+    # Bookings move to history and logs are partitioned, so booking_id and floor_id are not foreign keys
+    event_code = Column(String)
+    booking_id = Column(Integer)
+    desk_code = Column(String)
+    floor_id = Column(Integer)
+    latency_ms = Column(Integer)
+    payload = Column(JSONB)
 
     # Indexes
-    __table_args__ = (Index("idx_logs_user_created_at", "user_name", "created_at"),)
+    # Table is range-partitioned by month, partitions are managed in db.sql_db and db.log_retention
+    __table_args__ = (
+        Index("idx_logs_user_created_at", "user_name", "created_at"),
+        Index("idx_logs_event_code_created_at", "event_code", "created_at"),
+        Index(
+            "idx_logs_floor_event_code_created_at",
+            "floor_id",
+            "event_code",
+            "created_at",
+            postgresql_where=floor_id.isnot(None),
+        ),
+        Index("idx_logs_booking_id", "booking_id", postgresql_where=booking_id.isnot(None)),
+        Index("idx_logs_payload", "payload", postgresql_using="gin", postgresql_ops={"payload": "jsonb_path_ops"}),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     def __repr__(self):
         return (
@@ -199,9 +335,39 @@ class Log(Base):
         )
 
 
+# Views are mapped for querying only, they are created in db.sql_db and skipped by create_all
 class MostFrequentUser(Base):
     __tablename__ = "most_frequent_users"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = {"extend_existing": True, "info": {"is_view": True}}
 
     user_name = Column(String, primary_key=True)
     reservation_count = Column(Integer)
+
+
+class AllBooking(Base):
+    __tablename__ = "all_bookings"
+    __table_args__ = {"extend_existing": True, "info": {"is_view": True}}
+
+    booking_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer)
+    desk_id = Column(Integer)
+    start_date = Column(DateTime)
+    end_date = Column(DateTime)
+    status_id = Column(Integer)
+    created_at = Column(DateTime)
+
+
+# Desks joined with their office, floor and sector names, availability is computed by the queries using it
+class DeskAvailability(Base):
+    __tablename__ = "desk_availability"
+    __table_args__ = {"extend_existing": True, "info": {"is_view": True}}
+
+    desk_id = Column(Integer, primary_key=True)
+    desk_code = Column(String)
+    local_id = Column(Integer)
+    office_id = Column(Integer)
+    office_name = Column(String)
+    floor_id = Column(Integer)
+    floor_name = Column(String)
+    sector_id = Column(Integer)
+    sector_name = Column(String)
@@ -0,0 +1,467 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from datetime import date, datetime
+from contextlib import contextmanager
+from typing import Generator, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db.sql_db import SessionFactory
+from db.db_models import Office, Floor, Sector, Desk, DeskGeometry, User, Booking, Status
+from backend_operations.statements import USER_BOOKINGS_VERSION
+
+
+LOCAL_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".desk_booking_system", "local_cache.sqlite3")
+# Seconds between background refreshes of the cache
+REFRESH_INTERVAL_SECONDS = 60
+
+LOCAL_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS offices (office_id INTEGER PRIMARY KEY, office_name TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS floors (floor_id INTEGER PRIMARY KEY, office_id INTEGER NOT NULL, floor_name TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS sectors (sector_id INTEGER PRIMARY KEY, floor_id INTEGER NOT NULL, sector_name TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS desks (
+    desk_id INTEGER PRIMARY KEY,
+    office_id INTEGER NOT NULL,
+    floor_id INTEGER NOT NULL,
+    sector_id INTEGER NOT NULL,
+    local_id INTEGER NOT NULL,
+    desk_code TEXT NOT NULL,
+    polygon TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_floors_office ON floors (office_id);
+CREATE INDEX IF NOT EXISTS idx_sectors_floor ON sectors (floor_id);
+CREATE INDEX IF NOT EXISTS idx_desks_office_floor_sector ON desks (office_id, floor_id, sector_id, local_id);
+CREATE TABLE IF NOT EXISTS my_bookings (
+    booking_id INTEGER PRIMARY KEY,
+    user_name TEXT NOT NULL,
+    desk_code TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_my_bookings_user_start ON my_bookings (user_name, start_date);
+-- Password hashes were cached by earlier versions, logging in always requires the server
+DROP TABLE IF EXISTS cached_users;
+CREATE TABLE IF NOT EXISTS pending_operations (
+    operation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    operation TEXT NOT NULL,
+    booking_id INTEGER NOT NULL,
+    user_name TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+# Connection state seen by the last server round trip, shown in the GUI
+SERVER_ONLINE = True
+# User whose upcoming bookings are kept in the cache
+CACHED_USER: Optional[str] = None
+# User, first day and change version of the cached bookings, unchanged bookings are not fetched again
+CACHED_BOOKINGS_VERSION: Optional[tuple[str, date, int]] = None
+
+CACHE_WRITE_LOCK = threading.Lock()
+REFRESH_THREAD: Optional[threading.Thread] = None
+
+
+@contextmanager
+def local_connection() -> Generator[sqlite3.Connection, None, None]:
+    """
+    A context manager opening the local cache database, changes are committed on exit.
+
+    :yield: A sqlite3 connection
+    """
+    os.makedirs(os.path.dirname(LOCAL_CACHE_PATH), exist_ok=True)
+    connection = sqlite3.connect(LOCAL_CACHE_PATH, timeout=5)
+    try:
+        yield connection
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def initialize_local_cache() -> None:
+    """Create tables of the local cache if they do not exist."""
+    try:
+        with local_connection() as connection:
+            connection.executescript(LOCAL_CACHE_SCHEMA)
+        logging.info(f"Local cache is ready at '{LOCAL_CACHE_PATH}'.")
+    except Exception as exc:
+        logging.error(f"Failed to initialize local cache: {exc}")
+
+
+def is_server_online() -> bool:
+    """Return whether the last round trip to the server succeeded."""
+    return SERVER_ONLINE
+
+
+def set_server_online(online: bool) -> None:
+    """
+    Record the result of a server round trip.
+
+    :param online: Whether the server was reachable
+    """
+    global SERVER_ONLINE
+    if SERVER_ONLINE != online:
+        logging.warning("Database server is reachable again." if online else "Database server is unreachable.")
+    SERVER_ONLINE = online
+
+
+def refresh_topology(session: Session) -> None:
+    """
+    Copy offices, floors, sectors and desks added since the last refresh into the local cache.
+    Topology rows are only ever added, so rows with IDs above the cached maximum are fetched.
+
+    :param session: SQLAlchemy session connected to the server
+    """
+    with local_connection() as connection:
+        max_ids = {
+            table: connection.execute(f"SELECT COALESCE(MAX({id_column}), 0) FROM {table}").fetchone()[0]
+            for table, id_column in (
+                ("offices", "office_id"),
+                ("floors", "floor_id"),
+                ("sectors", "sector_id"),
+                ("desks", "desk_id"),
+            )
+        }
+
+    offices = session.execute(
+        select(Office.office_id, Office.office_name).where(Office.office_id > max_ids["offices"])
+    ).all()
+    floors = session.execute(
+        select(Floor.floor_id, Floor.office_id, Floor.floor_name).where(Floor.floor_id > max_ids["floors"])
+    ).all()
+    sectors = session.execute(
+        select(Sector.sector_id, Sector.floor_id, Sector.sector_name).where(Sector.sector_id > max_ids["sectors"])
+    ).all()
+    desks = session.execute(
+        select(
+            Desk.desk_id,
+            Desk.office_id,
+            Desk.floor_id,
+            Desk.sector_id,
+            Desk.local_id,
+            Desk.desk_code,
+            DeskGeometry.polygon,
+        )
+        .outerjoin(DeskGeometry, DeskGeometry.desk_id == Desk.desk_id)
+        .where(Desk.desk_id > max_ids["desks"])
+    ).all()
+
+    with CACHE_WRITE_LOCK, local_connection() as connection:
+        connection.executemany("INSERT OR REPLACE INTO offices VALUES (?, ?)", [tuple(row) for row in offices])
+        connection.executemany("INSERT OR REPLACE INTO floors VALUES (?, ?, ?)", [tuple(row) for row in floors])
+        connection.executemany("INSERT OR REPLACE INTO sectors VALUES (?, ?, ?)", [tuple(row) for row in sectors])
+        connection.executemany(
+            "INSERT OR REPLACE INTO desks VALUES (?, ?, ?, ?, ?, ?, ?)", [tuple(row) for row in desks]
+        )
+
+    if any([offices, floors, sectors, desks]):
+        logging.info(
+            f"Local cache topology refreshed: {len(offices)} offices, {len(floors)} floors, "
+            f"{len(sectors)} sectors, {len(desks)} desks added."
+        )
+
+
+def refresh_user_bookings(session: Session, user_name: str) -> None:
+    """
+    Replace cached upcoming bookings of the user with the current ones from the server.
+    Skipped after a single lookup if no booking of the user changed since the last refresh.
+
+    :param session: SQLAlchemy session connected to the server
+    :param user_name: The user whose bookings are cached
+    """
+    global CACHED_BOOKINGS_VERSION
+    today = date.today()
+    version = session.execute(USER_BOOKINGS_VERSION, {"user_name": user_name}).scalar()
+    if CACHED_BOOKINGS_VERSION == (user_name, today, version):
+        return
+
+    bookings = session.execute(
+        select(
+            Booking.booking_id,
+            User.user_name,
+            Desk.desk_code,
+            Booking.start_date,
+            Booking.end_date,
+            Status.status_name,
+        )
+        .join(User, User.user_id == Booking.user_id)
+        .join(Desk, Desk.desk_id == Booking.desk_id)
+        .join(Status, Status.status_id == Booking.status_id)
+        .where(
+            User.user_name == user_name,
+            Booking.end_date > datetime.now(),
+            Status.status_name.in_(["Pending", "Active"]),
+        )
+    ).all()
+
+    with CACHE_WRITE_LOCK, local_connection() as connection:
+        connection.execute("DELETE FROM my_bookings WHERE user_name = ?", (user_name,))
+        connection.executemany(
+            "INSERT INTO my_bookings VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    booking.booking_id,
+                    booking.user_name,
+                    booking.desk_code,
+                    booking.start_date.strftime("%Y-%m-%d %H:%M"),
+                    booking.end_date.strftime("%Y-%m-%d %H:%M"),
+                    booking.status_name,
+                )
+                for booking in bookings
+            ],
+        )
+    CACHED_BOOKINGS_VERSION = (user_name, today, version)
+
+
+def refresh_local_cache() -> bool:
+    """
+    Replay queued operations and refresh the local cache from the server.
+
+    :return: Whether the server was reachable
+    """
+    # SessionFactory is thread-local, the refresh thread gets its own session
+    session: Session = SessionFactory()
+
+    try:
+        replay_pending_operations(session)
+        refresh_topology(session)
+        if CACHED_USER:
+            refresh_user_bookings(session, CACHED_USER)
+        set_server_online(True)
+    except Exception as exc:
+        session.rollback()
+        logging.error(f"Failed to refresh local cache: {exc}")
+        set_server_online(False)
+    finally:
+        session.close()
+        SessionFactory.remove()
+
+    return SERVER_ONLINE
+
+
+def start_background_refresh(interval_seconds: int = REFRESH_INTERVAL_SECONDS) -> None:
+    """
+    Start a daemon thread refreshing the local cache periodically.
+
+    :param interval_seconds: Seconds between refreshes
+    """
+    global REFRESH_THREAD
+    if REFRESH_THREAD and REFRESH_THREAD.is_alive():
+        return
+
+    def refresh_loop():
+        while True:
+            refresh_local_cache()
+            time.sleep(interval_seconds)
+
+    REFRESH_THREAD = threading.Thread(target=refresh_loop, name="local-cache-refresh", daemon=True)
+    REFRESH_THREAD.start()
+
+
+def track_user_bookings(user_name: str) -> None:
+    """
+    Keep upcoming bookings of the logged-in user in the cache and refresh them right away.
+
+    :param user_name: The logged-in user
+    """
+    global CACHED_USER
+    CACHED_USER = user_name
+    threading.Thread(target=refresh_local_cache, name="local-cache-user-refresh", daemon=True).start()
+
+
+def fetch_cached_rows(query: str, params: tuple = ()) -> list[tuple]:
+    """
+    Run a read query against the local cache, an unreadable cache is treated as empty.
+
+    :param query: SQL query
+    :param params: Query parameters
+    """
+    try:
+        with local_connection() as connection:
+            return connection.execute(query, params).fetchall()
+    except sqlite3.Error as exc:
+        logging.error(f"Failed to read local cache: {exc}")
+        return []
+
+
+def get_cached_offices() -> list[tuple[int, str]]:
+    """Return cached (office_id, office_name) tuples."""
+    return fetch_cached_rows("SELECT office_id, office_name FROM offices ORDER BY office_id")
+
+
+def get_cached_floors(office_id: int) -> list[tuple[int, str]]:
+    """
+    Return cached (floor_id, floor_name) tuples of an office.
+
+    :param office_id: The office ID
+    """
+    return fetch_cached_rows(
+        "SELECT floor_id, floor_name FROM floors WHERE office_id = ? ORDER BY floor_id", (office_id,)
+    )
+
+
+def get_cached_sectors(floor_id: int) -> list[tuple[int, str]]:
+    """
+    Return cached (sector_id, sector_name) tuples of a floor.
+
+    :param floor_id: The floor ID
+    """
+    return fetch_cached_rows(
+        "SELECT sector_id, sector_name FROM sectors WHERE floor_id = ? ORDER BY sector_id", (floor_id,)
+    )
+
+
+def get_cached_desks(office_id: int, floor_id: int, sector_id: Optional[int]) -> list[str]:
+    """
+    Return cached desk codes of a floor, optionally limited to a sector.
+
+    :param office_id: The office ID
+    :param floor_id: The floor ID
+    :param sector_id: Optional sector ID
+    """
+    query = """
+        SELECT desk_code
+        FROM desks
+        WHERE office_id = ? AND floor_id = ? AND (? IS NULL OR sector_id = ?)
+        ORDER BY sector_id, local_id
+    """
+    rows = fetch_cached_rows(query, (office_id, floor_id, sector_id, sector_id))
+    return [row[0] for row in rows]
+
+
+def get_cached_desk_sector(desk_code: str) -> tuple[int, str] | None:
+    """
+    Return the cached (sector_id, sector_name) of a desk.
+
+    :param desk_code: The desk code
+    """
+    rows = fetch_cached_rows(
+        """
+        SELECT sectors.sector_id, sectors.sector_name
+        FROM desks JOIN sectors ON sectors.sector_id = desks.sector_id
+        WHERE desks.desk_code = ?
+        """,
+        (desk_code,),
+    )
+    return rows[0] if rows else None
+
+
+def get_cached_floor_desk_map(office_id: int, floor_id: int) -> list[dict]:
+    """
+    Return cached desks of a floor with their map geometry.
+
+    :param office_id: The office ID
+    :param floor_id: The floor ID
+    """
+    rows = fetch_cached_rows(
+        """
+        SELECT desks.desk_code, desks.local_id, sectors.sector_id, sectors.sector_name, desks.polygon
+        FROM desks JOIN sectors ON sectors.sector_id = desks.sector_id
+        WHERE desks.office_id = ? AND desks.floor_id = ? AND desks.polygon IS NOT NULL
+        ORDER BY sectors.sector_name, desks.local_id
+        """,
+        (office_id, floor_id),
+    )
+    return [
+        {
+            "desk_code": desk_code,
+            "local_id": local_id,
+            "sector_id": sector_id,
+            "sector_name": sector_name,
+            "polygon": [tuple(float(value) for value in point.split(",")) for point in polygon.split()],
+        }
+        for desk_code, local_id, sector_id, sector_name, polygon in rows
+    ]
+
+
+def get_cached_next_booking(user_name: str) -> dict | None:
+    """
+    Return the cached active or next pending booking of the user.
+
+    :param user_name: The user name
+    """
+    rows = fetch_cached_rows(
+        """
+        SELECT booking_id, desk_code, start_date, end_date, status
+        FROM my_bookings
+        WHERE user_name = ?
+        AND booking_id NOT IN (SELECT booking_id FROM pending_operations WHERE operation = 'cancel')
+        AND (status = 'Active' OR (status = 'Pending' AND start_date > ?))
+        ORDER BY status = 'Active' DESC, start_date
+        LIMIT 1
+        """,
+        (user_name, datetime.now().strftime("%Y-%m-%d %H:%M")),
+    )
+
+    if not rows:
+        return None
+    booking_id, desk_code, start_time, end_time, status = rows[0]
+    return {
+        "booking_id": booking_id,
+        "desk_code": desk_code,
+        "start_time": start_time,
+        "end_time": end_time,
+        "start_date": datetime.fromisoformat(start_time),
+        "status": status,
+    }
+
+
+def queue_cancel_booking(booking_id: int, user_name: str) -> None:
+    """
+    Queue cancellation of a booking to be replayed once the server is reachable.
+
+    :param booking_id: The booking to cancel
+    :param user_name: The user canceling the booking
+    """
+    with CACHE_WRITE_LOCK, local_connection() as connection:
+        connection.execute(
+            "INSERT INTO pending_operations (operation, booking_id, user_name, created_at) VALUES ('cancel', ?, ?, ?)",
+            (booking_id, user_name, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        )
+    logging.info(f"Cancellation of booking {booking_id} queued until the server is reachable.")
+
+
+def replay_pending_operations(session: Session) -> None:
+    """
+    Send queued operations to the server, each operation is removed from the queue once committed.
+
+    :param session: SQLAlchemy session connected to the server
+    """
+    with local_connection() as connection:
+        operations = connection.execute(
+            "SELECT operation_id, operation, booking_id, user_name FROM pending_operations ORDER BY operation_id"
+        ).fetchall()
+
+    if not operations:
+        return
+
+    canceled_status = session.execute(
+        select(Status.status_id).where(Status.status_name == "Canceled")
+    ).scalar_one_or_none()
+    if not canceled_status:
+        raise ValueError("Canceled status not found in the database.")
+
+    # Bookings which were completed or canceled in the meantime are left alone
+    live_status_ids = select(Status.status_id).where(Status.status_name.in_(["Pending", "Active"]))
+
+    for operation_id, operation, booking_id, user_name in operations:
+        if operation == "cancel":
+            canceled = session.execute(
+                Booking.__table__.update()
+                .where(
+                    Booking.booking_id == booking_id,
+                    Booking.user_id == select(User.user_id).where(User.user_name == user_name).scalar_subquery(),
+                    Booking.status_id.in_(live_status_ids),
+                )
+                .values(status_id=canceled_status)
+            ).rowcount
+            session.commit()
+            if not canceled:
+                logging.info(f"Queued cancellation of booking {booking_id} skipped, it is no longer pending or active.")
+
+        with CACHE_WRITE_LOCK, local_connection() as connection:
+            connection.execute("DELETE FROM pending_operations WHERE operation_id = ?", (operation_id,))
+        logging.info(f"Queued '{operation}' of booking {booking_id} replayed.")
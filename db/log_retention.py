@@ -0,0 +1,147 @@
+import os
+import re
+import gzip
+import logging
+import sqlalchemy
+from datetime import date
+
+from db.sql_db import desk_booking_engine
+
+
+# Number of full months of logs kept in the database
+LOG_RETENTION_MONTHS = 6
+# Directory where archived partitions are written
+LOG_ARCHIVE_DIR = "log_archive"
+# Longest wait for the lock on the logs table before a detach gives up, inserts queue behind the waiting detach
+LOG_DETACH_LOCK_TIMEOUT = "5s"
+
+LOG_PARTITION_PATTERN = re.compile(r"^logs_y(\d{4})m(\d{2})$")
+
+
+def get_retention_cutoff(today: date, retention_months: int) -> date:
+    """
+    Return the first day of the oldest month that is kept in the database.
+
+    :param today: The current date
+    :param retention_months: Number of full months of logs to keep
+    """
+    month_index = today.year * 12 + today.month - 1 - retention_months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def get_expired_log_partitions(connection, cutoff: date) -> list[tuple[str, bool]]:
+    """
+    Find monthly log partitions that ended before the cutoff date.
+    Partitions detached by an interrupted run are returned as well, so they can be archived.
+
+    :param connection: SQLAlchemy connection
+    :param cutoff: First day of the oldest month that is kept
+    :return: List of (partition name, is still attached) tuples, oldest first
+    """
+    partitions = connection.execute(
+        sqlalchemy.text(
+            """
+            SELECT
+                child.relname,
+                EXISTS (
+                    SELECT 1 FROM pg_inherits WHERE pg_inherits.inhrelid = child.oid
+                ) AS is_attached
+            FROM pg_class child
+            WHERE child.relkind = 'r'
+            AND child.relname ~ '^logs_y[0-9]{4}m[0-9]{2}$'
+            ORDER BY child.relname;
+            """
+        )
+    ).all()
+
+    expired = []
+    for partition_name, is_attached in partitions:
+        match = LOG_PARTITION_PATTERN.match(partition_name)
+        year, month = int(match.group(1)), int(match.group(2))
+        if date(year, month, 1) < cutoff:
+            expired.append((partition_name, is_attached))
+    return expired
+
+
+def archive_log_partition(engine, partition_name: str, archive_dir: str) -> str:
+    """
+    Write a detached log partition to a gzip-compressed CSV file.
+
+    :param engine: SQLAlchemy engine connected to the database
+    :param partition_name: Name of the partition table
+    :param archive_dir: Directory for the archive files
+    :return: Path to the archive file
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    archive_path = os.path.join(archive_dir, f"{partition_name}.csv.gz")
+    temp_path = f"{archive_path}.part"
+
+    raw_connection = engine.raw_connection()
+    try:
+        cursor = raw_connection.cursor()
+        # Rows are streamed straight into the file, partition is never loaded into memory.
+        # stream= is specific to pg8000, other DB-API drivers need their own COPY API (e.g. psycopg's cursor.copy)
+        with gzip.open(temp_path, "wb") as archive_file:
+            cursor.execute(f'COPY "{partition_name}" TO STDOUT WITH (FORMAT csv, HEADER)', stream=archive_file)
+        cursor.close()
+        raw_connection.commit()
+    finally:
+        raw_connection.close()
+
+    # Only a complete file gets the final name
+    os.replace(temp_path, archive_path)
+    return archive_path
+
+
+def archive_old_logs(
+    engine=desk_booking_engine,
+    retention_months: int = LOG_RETENTION_MONTHS,
+    archive_dir: str = LOG_ARCHIVE_DIR,
+    today: date | None = None,
+) -> list[str]:
+    """
+    Detach log partitions older than the retention period, archive them to disk and drop them.
+
+    :param engine: SQLAlchemy engine connected to the database
+    :param retention_months: Number of full months of logs to keep
+    :param archive_dir: Directory for the archive files
+    :param today: The current date, defaults to today
+    :return: Paths of the written archive files
+    """
+    cutoff = get_retention_cutoff(today or date.today(), retention_months)
+    archived = []
+
+    with engine.connect() as connection:
+        expired_partitions = get_expired_log_partitions(connection, cutoff)
+
+    if not expired_partitions:
+        logging.info(f"No log partitions older than {cutoff} to archive.")
+        return archived
+
+    for partition_name, is_attached in expired_partitions:
+        try:
+            if is_attached:
+                # DETACH PARTITION takes an ACCESS EXCLUSIVE lock on logs, inserts are blocked until it commits.
+                # CONCURRENTLY is not possible as logs has a default partition, so the wait for the lock is bounded
+                # instead and the transaction holds it only for the catalog change, the slow archiving runs after it
+                with engine.begin() as connection:
+                    connection.execute(sqlalchemy.text(f"SET LOCAL lock_timeout = '{LOG_DETACH_LOCK_TIMEOUT}';"))
+                    connection.execute(sqlalchemy.text(f'ALTER TABLE logs DETACH PARTITION "{partition_name}";'))
+
+            archive_path = archive_log_partition(engine, partition_name, archive_dir)
+
+            with engine.begin() as connection:
+                connection.execute(sqlalchemy.text(f'DROP TABLE "{partition_name}";'))
+
+            archived.append(archive_path)
+            logging.info(f"Log partition '{partition_name}' archived to '{archive_path}'.")
+        except Exception as exc:
+            logging.error(f"Error while archiving log partition '{partition_name}': {exc}")
+            raise
+
+    return archived
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    archive_old_logs()
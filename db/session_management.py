@@ -3,24 +3,26 @@ from sqlalchemy.orm import Session
 from contextlib import contextmanager
 from typing import Callable, Generator
 
-from db.sql_db import SessionFactory
+from db.sql_db import SessionFactory, route_reads
 from backend_operations.log_utils import log_event
 from backend_operations.user_login import get_current_user
 
 
 @contextmanager
-def managed_session(session_factory: Callable[[], Session]) -> Generator[Session, None, None]:
+def managed_session(session_factory: Callable[[], Session], read_only: bool = False) -> Generator[Session, None, None]:
     """
     A context manager for managing SQLAlchemy sessions.
 
     :param session_factory: A callable that returns a SQLAlchemy session
+    :param read_only: Route reads of the session to the read replica
     :yield: A SQLAlchemy session
     """
     try:
         session = session_factory()
         if session is None:
             raise RuntimeError("Session factory returned None. Ensure session is properly initialized.")
-        yield session
+        with route_reads(session, read_only):
+            yield session
     except Exception as exc:
         logging.error(f"Session error: {exc}")
 
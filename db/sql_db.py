@@ -1,13 +1,17 @@
 import sys
+import time
 import logging
 import sqlalchemy
+from contextlib import contextmanager
+from typing import Generator
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session, Session
 from google.cloud.sql.connector import Connector
 
 from db.csv_import import import_table_data
+from db.booking_keys_migration import migrate_booking_keys
 from backend_operations.utils import get_time_change
-from db.db_models import Role, Department, Status, Office, Floor, Sector, Desk, Base
+from db.db_models import Role, Department, Status, Office, Floor, Sector, Desk, DeskGeometry, Log, Base
 from backend_operations.utils import (
     load_environment_variables,
     get_env_variable,
@@ -18,6 +22,9 @@ from backend_operations.utils import (
 # Load environment variables at the start
 load_environment_variables()
 
+# Finished bookings older than this many days are moved to the bookings_history table
+BOOKINGS_HISTORY_HORIZON_DAYS = 30
+
 # Access specific variables
 USE_PUBLIC_IP = get_env_variable("USE_PUBLIC_IP") == "True"
 SQL_USERNAME = get_env_variable("sql_username")
@@ -25,13 +32,17 @@ SQL_PASSWORD = get_env_variable("sql_password")
 SQL_DATABASE = get_env_variable("sql_database")
 
 
-def getconn():
-    """Returns a database connection for both Public IP and Cloud SQL Connector cases."""
+def getconn(public_ip_variable: str = "PUBLIC_IP", instance_variable: str = "INSTANCE_CONNECTION_NAME"):
+    """Returns a database connection for both Public IP and Cloud SQL Connector cases.
+
+    :param public_ip_variable: Name of the environment variable with the server's public IP
+    :param instance_variable: Name of the environment variable with the Cloud SQL instance connection name
+    """
     try:
         from pg8000 import connect  # Ensure pg8000 is imported
 
         if USE_PUBLIC_IP:
-            PUBLIC_IP = get_env_variable("PUBLIC_IP")
+            PUBLIC_IP = get_env_variable(public_ip_variable)
             # Public IP connection
             return connect(
                 host=PUBLIC_IP,
@@ -40,7 +51,7 @@ def getconn():
                 database=SQL_DATABASE,
             )
         else:
-            INSTANCE_CONNECTION_NAME = get_env_variable("INSTANCE_CONNECTION_NAME")
+            INSTANCE_CONNECTION_NAME = get_env_variable(instance_variable)
             connector = Connector()
             # Google Cloud SQL Connector connection
             return connector.connect(
@@ -54,49 +65,204 @@ def getconn():
         raise RuntimeError(f"Error connecting to database: {e}")
 
 
-def init_engine() -> sqlalchemy.engine.base.Engine:
-    """Initializes the SQLAlchemy engine with a connection pool."""
+def init_engine(
+    database_url: str = "", public_ip_variable: str = "PUBLIC_IP", instance_variable: str = "INSTANCE_CONNECTION_NAME"
+) -> sqlalchemy.engine.base.Engine:
+    """Initializes the SQLAlchemy engine with a connection pool.
+
+    :param database_url: Optional SQLAlchemy URL, used instead of the Cloud SQL connection (e.g. local databases)
+    :param public_ip_variable: Name of the environment variable with the server's public IP
+    :param instance_variable: Name of the environment variable with the Cloud SQL instance connection name
+    """
+    if database_url:
+        return create_engine(database_url, pool_pre_ping=True, pool_size=20, max_overflow=0)
+
     return create_engine(
         "postgresql+pg8000://",
-        creator=getconn,
+        creator=lambda: getconn(public_ip_variable, instance_variable),
         pool_pre_ping=True,
         pool_size=20,
         max_overflow=0,
     )
 
 
-# Initialize the engine and session factory
-desk_booking_engine = init_engine()
+def init_replica_engine() -> sqlalchemy.engine.base.Engine:
+    """Initializes the read replica engine, falls back to the primary engine if no replica is configured."""
+    replica_url = get_env_variable("REPLICA_DATABASE_URL", "")
+    replica_address = get_env_variable("REPLICA_PUBLIC_IP" if USE_PUBLIC_IP else "REPLICA_INSTANCE_CONNECTION_NAME", "")
 
-SessionFactory = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=desk_booking_engine))
+    if replica_url:
+        return init_engine(replica_url)
+    if replica_address:
+        return init_engine(public_ip_variable="REPLICA_PUBLIC_IP", instance_variable="REPLICA_INSTANCE_CONNECTION_NAME")
+
+    logging.info("No read replica configured, reads use the primary database.")
+    return desk_booking_engine
+
+
+# Initialize the engines, writes always go to the primary, read-only sessions may use the replica
+desk_booking_engine = init_engine(get_env_variable("PRIMARY_DATABASE_URL", ""))
+desk_booking_replica_engine = init_replica_engine()
+
+# Seconds after the user's own write during which reads stay on the primary, covers the replica lag
+READ_YOUR_WRITES_SECONDS = 10
+# Monotonic time of the last write, the application serves a single user
+LAST_WRITE_AT = None
+
+
+class RoutingSession(Session):
+    """Session choosing the engine per statement.
+
+    Writes and flushes go to the primary. Reads go to the replica only if the session is marked read-only
+    (session.info["read_only"]) and the user did not write within READ_YOUR_WRITES_SECONDS.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        global LAST_WRITE_AT
+
+        if self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            # Log rows are never read back right away, they do not need read-your-writes
+            if getattr(mapper, "class_", mapper) is not Log:
+                LAST_WRITE_AT = time.monotonic()
+            return desk_booking_engine
+
+        recently_written = LAST_WRITE_AT is not None and time.monotonic() - LAST_WRITE_AT < READ_YOUR_WRITES_SECONDS
+        if self.info.get("read_only") and not recently_written:
+            return desk_booking_replica_engine
+
+        return desk_booking_engine
+
+
+SessionFactory = scoped_session(sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False))
+
+
+@contextmanager
+def route_reads(session: Session, read_only: bool = True) -> Generator[Session, None, None]:
+    """
+    Mark a session read-only or read-write for the duration of a block.
+    The Tk thread shares one session, the previous marking is restored on exit, so a nested or interleaved block
+    neither clears the outer block's routing nor leaks its own.
+
+    :param session: The session
+    :param read_only: Route reads of the session to the read replica
+    :yield: The session
+    """
+    previous = session.info.get("read_only")
+    session.info["read_only"] = read_only
+    try:
+        yield session
+    finally:
+        if previous is None:
+            session.info.pop("read_only", None)
+        else:
+            session.info["read_only"] = previous
 
 
 def create_tables():
     """Creates all tables defined in the ORM models."""
     try:
-        Base.metadata.create_all(bind=desk_booking_engine)
+        tables = [table for table in Base.metadata.sorted_tables if not table.info.get("is_view")]
+        Base.metadata.create_all(bind=desk_booking_engine, tables=tables)
         logging.info("Database tables are ready.")
     except Exception as error:
         logging.error(f"Error while creating tables: {error}")
         sys.exit()
 
 
-def preload_data():
-    """Preloads data into the database from CSV files."""
+def create_missing_indexes(engine):
+    """
+    Create indexes defined in the ORM models which are missing in an existing database.
+    create_all only creates indexes together with new tables, indexes added to existing models are created here.
+
+    :param engine: SQLAlchemy engine connected to the database.
+    """
+    try:
+        with engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                if table.info.get("is_view"):
+                    continue
+                for index in table.indexes:
+                    index.create(connection, checkfirst=True)
+        logging.info("Database indexes are ready.")
+    except Exception as exc:
+        logging.error(f"Error while creating missing indexes: {exc}")
+        raise
+
+
+# Booking indexes replaced by idx_bookings_user_status_start and idx_bookings_user_start. The status and archive
+# jobs filter on end_date or start_date plus an interval, which idx_bookings_date_range cannot serve either.
+# idx_floor_day_versions_day served the company-wide cache token replaced by user_booking_versions.
+# idx_bookings_history_user_start lacked booking_id and made the past bookings page sort the user's history.
+OBSOLETE_INDEXES = (
+    "idx_bookings_date_range",
+    "idx_bookings_user_desk_date",
+    "idx_floor_day_versions_day",
+    "idx_bookings_history_user_start",
+)
+
+
+def drop_obsolete_indexes(engine):
+    """
+    Drop indexes no longer defined in the ORM models, they only slow down writes to their tables.
+
+    :param engine: SQLAlchemy engine connected to the database.
+    """
+    try:
+        with engine.begin() as connection:
+            for index_name in OBSOLETE_INDEXES:
+                connection.execute(sqlalchemy.text(f"DROP INDEX IF EXISTS {index_name};"))
+        logging.info("Obsolete database indexes are dropped.")
+    except Exception as exc:
+        logging.error(f"Error while dropping obsolete indexes: {exc}")
+        raise
+
+
+def add_structured_log_columns(engine):
+    """
+    Add the structured audit columns to a logs table created by older versions of the app.
+    Columns added to the partitioned table are added to all its partitions, existing rows keep empty fields.
+
+    :param engine: SQLAlchemy engine connected to the database.
+    """
+    try:
+        with engine.begin() as connection:
+            for column in ("event_code", "booking_id", "desk_code", "floor_id", "latency_ms", "payload"):
+                column_type = Log.__table__.c[column].type.compile(dialect=engine.dialect)
+                connection.execute(
+                    sqlalchemy.text(f"ALTER TABLE logs ADD COLUMN IF NOT EXISTS {column} {column_type};")
+                )
+        logging.info("Structured log columns are ready.")
+    except Exception as exc:
+        logging.error(f"Error while adding structured log columns: {exc}")
+        raise
+
+
+def preload_data(data_dir: str = "db/data"):
+    """
+    Preloads data into the database from CSV files, tables which already contain rows are skipped.
+
+    :param data_dir: Directory with the CSV files, relative to the project root
+    """
     try:
         session_import: Session = SessionFactory()
-        import_table_data(session_import, Role, resource_path("db/data/roles.csv"), ["role_name"])
-        import_table_data(session_import, Department, resource_path("db/data/departments.csv"), ["department_name"])
-        import_table_data(session_import, Status, resource_path("db/data/statuses.csv"), ["status_name"])
-        import_table_data(session_import, Office, resource_path("db/data/offices.csv"), ["office_name"])
-        import_table_data(session_import, Floor, resource_path("db/data/floors.csv"), ["office_id", "floor_name"])
-        import_table_data(session_import, Sector, resource_path("db/data/sectors.csv"), ["floor_id", "sector_name"])
+        import_table_data(session_import, Role, resource_path(f"{data_dir}/roles.csv"), ["role_name"])
+        import_table_data(session_import, Department, resource_path(f"{data_dir}/departments.csv"), ["department_name"])
+        import_table_data(session_import, Status, resource_path(f"{data_dir}/statuses.csv"), ["status_name"])
+        import_table_data(session_import, Office, resource_path(f"{data_dir}/offices.csv"), ["office_name"])
+        import_table_data(session_import, Floor, resource_path(f"{data_dir}/floors.csv"), ["office_id", "floor_name"])
+        import_table_data(session_import, Sector, resource_path(f"{data_dir}/sectors.csv"), ["floor_id", "sector_name"])
         import_table_data(
             session_import,
             Desk,
-            resource_path("db/data/desks.csv"),
+            resource_path(f"{data_dir}/desks.csv"),
             ["office_id", "floor_id", "sector_id", "local_id"],
         )
+        import_table_data(
+            session_import,
+            DeskGeometry,
+            resource_path(f"{data_dir}/desk_geometries.csv"),
+            ["sector_id", "local_id", "polygon"],
+        )
         session_import.commit()
         logging.info("Data is ready.")
     except ValueError as val_err:
@@ -131,11 +297,7 @@ def create_trigger(engine):
                     )
                 ).scalar()
 
-                if result:
-                    logging.info("Trigger 'prevent_overlapping_bookings_trigger' already exists. Skipping creation.")
-                    return
-
-                # Create the function
+                # Create the function, replaced on every start so the trigger follows schema changes
                 connection.execute(
                     sqlalchemy.text(
                         """
@@ -146,7 +308,7 @@ def create_trigger(engine):
                             IF TG_OP = 'UPDATE' AND
                             NEW.start_date = OLD.start_date AND
                             NEW.end_date = OLD.end_date AND
-                            NEW.user_name = OLD.user_name THEN
+                            NEW.user_id = OLD.user_id THEN
                                 RETURN NEW;
                             END IF;
 
@@ -154,13 +316,13 @@ def create_trigger(engine):
                             IF EXISTS (
                                 SELECT 1
                                 FROM bookings
-                                WHERE NEW.user_name = bookings.user_name
+                                WHERE NEW.user_id = bookings.user_id
                                 AND NEW.start_date < bookings.end_date
                                 AND NEW.end_date > bookings.start_date
                                 AND (NEW.booking_id IS NULL OR NEW.booking_id <> bookings.booking_id) -- Exclude self
                                 AND bookings.status_id <> 4 -- Ignore cancelled bookings
                             ) THEN
-                                RAISE EXCEPTION 'Overlapping booking detected for user %', NEW.user_name;
+                                RAISE EXCEPTION 'Overlapping booking detected for user %', NEW.user_id;
                             END IF;
 
                             RETURN NEW;
@@ -170,6 +332,11 @@ def create_trigger(engine):
                     )
                 )
 
+                if result:
+                    trig_transaction.commit()
+                    logging.info("Trigger 'prevent_overlapping_bookings_trigger' already exists. Function updated.")
+                    return
+
                 # Create the trigger
                 connection.execute(
                     sqlalchemy.text(
@@ -193,6 +360,249 @@ def create_trigger(engine):
         sys.exit()
 
 
+def create_floor_version_trigger(engine):
+    """
+    Create the trigger bumping the version of every floor and day touched by an inserted or changed booking,
+    and the version of the booking's user.
+    Versions come from one global sequence and only grow, an existing row takes its number after it is locked.
+    Clients revalidate cached floor data by comparing the sum of versions of the shown days, even when
+    transactions commit out of sequence order, and their own upcoming bookings by the user's version.
+    Bookings deleted by the history job are finished, their days are not cached by clients and are not bumped.
+    """
+    try:
+        with engine.connect() as connection:
+            transaction = connection.begin()
+
+            try:
+                result = connection.execute(
+                    sqlalchemy.text(
+                        """
+                        SELECT 1
+                        FROM pg_trigger
+                        WHERE tgname = 'bump_floor_day_versions_trigger';
+                        """
+                    )
+                ).scalar()
+
+                statements = [
+                    "CREATE SEQUENCE IF NOT EXISTS floor_day_version_seq;",
+                    """
+                    CREATE OR REPLACE FUNCTION bump_floor_days(
+                        changed_desk_id integer, changed_start timestamp, changed_end timestamp
+                    )
+                    RETURNS void LANGUAGE sql AS $$
+                        INSERT INTO floor_day_versions (floor_id, day, version)
+                        SELECT desks.floor_id, CAST(day AS date), nextval('floor_day_version_seq')
+                        FROM desks,
+                        generate_series(
+                            date_trunc('day', changed_start), changed_end - INTERVAL '1 microsecond', INTERVAL '1 day'
+                        ) AS day
+                        WHERE desks.desk_id = changed_desk_id
+                        -- Drawn again once the row is locked, a transaction which drew an earlier number and
+                        -- commits later would otherwise lower the version
+                        ON CONFLICT (floor_id, day) DO UPDATE SET version = nextval('floor_day_version_seq');
+                    $$;
+                    """,
+                    """
+                    CREATE OR REPLACE FUNCTION bump_user_bookings(changed_user_id integer)
+                    RETURNS void LANGUAGE sql AS $$
+                        INSERT INTO user_booking_versions (user_id, version)
+                        VALUES (changed_user_id, nextval('floor_day_version_seq'))
+                        ON CONFLICT (user_id) DO UPDATE SET version = nextval('floor_day_version_seq');
+                    $$;
+                    """,
+                    """
+                    CREATE OR REPLACE FUNCTION bump_floor_day_versions()
+                    RETURNS TRIGGER AS $$
+                    BEGIN
+                        PERFORM bump_floor_days(NEW.desk_id, NEW.start_date, NEW.end_date);
+                        PERFORM bump_user_bookings(NEW.user_id);
+
+                        -- Moved bookings change the days and floor they were taken from as well
+                        IF TG_OP = 'UPDATE' AND (OLD.desk_id, OLD.start_date, OLD.end_date)
+                            IS DISTINCT FROM (NEW.desk_id, NEW.start_date, NEW.end_date) THEN
+                            PERFORM bump_floor_days(OLD.desk_id, OLD.start_date, OLD.end_date);
+                        END IF;
+
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql;
+                    """,
+                ]
+                for statement in statements:
+                    connection.execute(sqlalchemy.text(statement))
+
+                if result:
+                    transaction.commit()
+                    logging.info("Trigger 'bump_floor_day_versions_trigger' already exists. Function updated.")
+                    return
+
+                connection.execute(
+                    sqlalchemy.text(
+                        """
+                        CREATE TRIGGER bump_floor_day_versions_trigger
+                        AFTER INSERT OR UPDATE OF status_id, desk_id, start_date, end_date ON bookings
+                        FOR EACH ROW
+                        EXECUTE FUNCTION bump_floor_day_versions();
+                        """
+                    )
+                )
+
+                transaction.commit()
+                logging.info("Trigger for floor day versions created successfully.")
+            except Exception as exc:
+                transaction.rollback()
+                logging.error(f"Error while creating trigger for floor day versions: {exc}")
+                sys.exit()
+    except Exception as exc:
+        logging.error(f"Error while creating trigger for floor day versions: {exc}")
+        sys.exit()
+
+
+def create_waitlist_promotion(engine):
+    """
+    Create the trigger promoting waitlisted users when a booking is canceled.
+    Promotion runs in the transaction of the cancellation, whether it comes from the app or the status sweeper,
+    so a freed desk is never visible as free while someone is waiting for it.
+    """
+    try:
+        with engine.connect() as connection:
+            transaction = connection.begin()
+
+            try:
+                result = connection.execute(
+                    sqlalchemy.text(
+                        """
+                        SELECT 1
+                        FROM pg_trigger
+                        WHERE tgname = 'promote_waitlist_trigger';
+                        """
+                    )
+                ).scalar()
+
+                # Get current time offset from UTC for Poland
+                time_change = get_time_change()
+                connection.execute(
+                    sqlalchemy.text(
+                        f"""
+                        CREATE OR REPLACE FUNCTION promote_waitlist()
+                        RETURNS TRIGGER AS $$
+                        DECLARE
+                            canceled_status integer := (SELECT status_id FROM statuses WHERE status_name = 'Canceled');
+                            pending_status integer := (SELECT status_id FROM statuses WHERE status_name = 'Pending');
+                            freed_sector integer := (SELECT sector_id FROM desks WHERE desk_id = NEW.desk_id);
+                            waiter waitlist_entries%ROWTYPE;
+                            promoted_booking integer;
+                        BEGIN
+                            -- Closures cancel bookings of desks which must not be handed out again
+                            IF NEW.status_id <> canceled_status
+                            OR current_setting('desk_booking.skip_waitlist', true) = 'on' THEN
+                                RETURN NULL;
+                            END IF;
+
+                            -- Same desk lock as the booking paths of the app, a concurrent booker waits for it
+                            PERFORM 1 FROM desks WHERE desk_id = NEW.desk_id FOR UPDATE;
+
+                            -- A long canceled booking may make room for several shorter waiters
+                            LOOP
+                                -- Oldest entry first, entries of users holding a booking at that time are skipped
+                                SELECT entry.* INTO waiter
+                                FROM waitlist_entries AS entry
+                                WHERE (entry.desk_id = NEW.desk_id OR entry.sector_id = freed_sector)
+                                AND entry.start_date < NEW.end_date
+                                AND entry.end_date > NEW.start_date
+                                AND (entry.start_date + INTERVAL '30 minutes') > (NOW() + INTERVAL '{time_change} hour')
+                                AND NOT EXISTS (
+                                    SELECT 1
+                                    FROM bookings
+                                    WHERE bookings.desk_id = NEW.desk_id
+                                    AND bookings.start_date < entry.end_date
+                                    AND bookings.end_date > entry.start_date
+                                    AND bookings.status_id <> canceled_status
+                                )
+                                AND NOT EXISTS (
+                                    SELECT 1
+                                    FROM bookings
+                                    WHERE bookings.user_id = entry.user_id
+                                    AND bookings.start_date < entry.end_date
+                                    AND bookings.end_date > entry.start_date
+                                    AND bookings.status_id <> canceled_status
+                                )
+                                ORDER BY entry.created_at, entry.waitlist_id
+                                LIMIT 1
+                                FOR UPDATE SKIP LOCKED;
+
+                                EXIT WHEN NOT FOUND;
+
+                                -- A booking of the waiter committed after the check above makes the overlap trigger
+                                -- raise, only the promotion is rolled back and never the cancellation itself
+                                BEGIN
+                                    INSERT INTO bookings (user_id, desk_id, start_date, end_date, status_id)
+                                    VALUES (
+                                        waiter.user_id, NEW.desk_id, waiter.start_date, waiter.end_date, pending_status
+                                    )
+                                    RETURNING booking_id INTO promoted_booking;
+                                EXCEPTION WHEN raise_exception THEN
+                                    -- The waiter has a desk for that time already, the entry would be skipped forever
+                                    DELETE FROM waitlist_entries WHERE waitlist_id = waiter.waitlist_id;
+                                    CONTINUE;
+                                END;
+
+                                -- The user has a desk for that time now, other entries for it would take a second one
+                                DELETE FROM waitlist_entries
+                                WHERE user_id = waiter.user_id
+                                AND start_date < waiter.end_date
+                                AND end_date > waiter.start_date;
+
+                                INSERT INTO logs (
+                                    user_name, event_type, component, event_description,
+                                    event_code, booking_id, desk_code, floor_id
+                                )
+                                SELECT users.user_name, 'Notification', 'Waitlist',
+                                    format('Desk ''%s'' was freed and booked for you from %s to %s.',
+                                        desks.desk_code, waiter.start_date, waiter.end_date),
+                                    'waitlist.promoted', promoted_booking, desks.desk_code,
+                                    desks.floor_id
+                                FROM users, desks
+                                WHERE users.user_id = waiter.user_id
+                                AND desks.desk_id = NEW.desk_id;
+                            END LOOP;
+
+                            RETURN NULL;
+                        END;
+                        $$ LANGUAGE plpgsql;
+                        """
+                    )
+                )
+
+                if result:
+                    transaction.commit()
+                    logging.info("Trigger 'promote_waitlist_trigger' already exists. Function updated.")
+                    return
+
+                connection.execute(
+                    sqlalchemy.text(
+                        """
+                        CREATE TRIGGER promote_waitlist_trigger
+                        AFTER UPDATE OF status_id ON bookings
+                        FOR EACH ROW
+                        WHEN (NEW.status_id IS DISTINCT FROM OLD.status_id)
+                        EXECUTE FUNCTION promote_waitlist();
+                        """
+                    )
+                )
+
+                transaction.commit()
+                logging.info("Trigger for promoting waitlisted users created successfully.")
+            except Exception as exc:
+                transaction.rollback()
+                logging.error(f"Error while creating trigger for waitlist promotion: {exc}")
+                sys.exit()
+    except Exception as exc:
+        logging.error(f"Error while creating trigger for waitlist promotion: {exc}")
+        sys.exit()
+
+
 def initialize_pg_cron(engine):
     """Initialize the scheduled booking status updates using pg_cron."""
     try:
@@ -242,6 +652,10 @@ def initialize_pg_cron(engine):
                             SET status_id = (SELECT status_id FROM statuses WHERE status_name = 'Completed')
                             WHERE status_id = (SELECT status_id FROM statuses WHERE status_name = 'Active')
                             AND end_date < (NOW() + INTERVAL '{time_change} hour');
+
+                            -- Waitlist entries nobody can be promoted to any more
+                            DELETE FROM waitlist_entries
+                            WHERE (start_date + INTERVAL '30 minutes') < (NOW() + INTERVAL '{time_change} hour');
                         END;
                         $$;
                         """
@@ -267,6 +681,114 @@ def initialize_pg_cron(engine):
         sys.exit()
 
 
+def create_bookings_history_job(engine, horizon_days: int = BOOKINGS_HISTORY_HORIZON_DAYS):
+    """
+    Create the function moving finished bookings to bookings_history and schedule it daily with pg_cron.
+    Keeps the bookings table and its indexes proportional to live bookings.
+
+    :param engine: SQLAlchemy engine connected to the database.
+    :param horizon_days: Completed and canceled bookings which ended more than this many days ago are moved.
+    """
+    try:
+        with engine.connect() as connection:
+            # Begin transaction
+            transaction = connection.begin()
+
+            try:
+                # Booking times are stored in local time, the database clock is shifted like in the status jobs
+                time_change = get_time_change()
+                connection.execute(
+                    sqlalchemy.text(
+                        f"""
+                        CREATE OR REPLACE FUNCTION archive_finished_bookings(horizon_days integer)
+                        RETURNS integer LANGUAGE plpgsql AS $$
+                        DECLARE
+                            moved_count integer;
+                        BEGIN
+                            -- Delete and insert in one statement, rows are never visible in both tables
+                            WITH moved AS (
+                                DELETE FROM bookings
+                                WHERE status_id IN (
+                                    SELECT status_id FROM statuses WHERE status_name IN ('Completed', 'Canceled')
+                                )
+                                AND end_date < (NOW() + INTERVAL '{time_change} hour') - make_interval(days => horizon_days)
+                                RETURNING booking_id, user_id, desk_id, start_date, end_date, status_id, created_at
+                            )
+                            INSERT INTO bookings_history (
+                                booking_id, user_id, desk_id, start_date, end_date, status_id, created_at
+                            )
+                            SELECT booking_id, user_id, desk_id, start_date, end_date, status_id, created_at
+                            FROM moved;
+
+                            GET DIAGNOSTICS moved_count = ROW_COUNT;
+                            RETURN moved_count;
+                        END;
+                        $$;
+                        """
+                    )
+                )
+
+                # Schedule the function to run every night
+                connection.execute(
+                    sqlalchemy.text(
+                        f"""
+                        SELECT cron.schedule(
+                            'archive_finished_bookings',
+                            '30 2 * * *',
+                            'SELECT archive_finished_bookings({int(horizon_days)});'
+                        );
+                        """
+                    )
+                )
+
+                transaction.commit()
+                logging.info("Cron job for moving finished bookings to history created successfully.")
+            except Exception as exc:
+                transaction.rollback()
+                logging.error(f"Error while creating cron job for moving finished bookings to history: {exc}")
+                raise
+    except Exception as exc:
+        logging.error(f"Failed to create cron job for moving finished bookings to history: {exc}")
+        raise
+
+
+def create_all_bookings_view(engine):
+    """
+    Create the all_bookings view in the database.
+    This view combines live bookings with the bookings_history table, statistics are calculated on top of it.
+
+    :param engine: SQLAlchemy engine connected to the database.
+    """
+    try:
+        with engine.connect() as connection:
+            # Begin transaction
+            transaction = connection.begin()
+
+            try:
+                connection.execute(
+                    sqlalchemy.text(
+                        """
+                        CREATE OR REPLACE VIEW all_bookings AS
+                        SELECT booking_id, user_id, desk_id, start_date, end_date, status_id, created_at
+                        FROM bookings
+                        UNION ALL
+                        SELECT booking_id, user_id, desk_id, start_date, end_date, status_id, created_at
+                        FROM bookings_history;
+                        """
+                    )
+                )
+
+                transaction.commit()
+                logging.info("View 'all_bookings' created successfully.")
+            except Exception as exc:
+                transaction.rollback()
+                logging.error(f"Error while creating 'all_bookings' view: {exc}")
+                raise
+    except Exception as exc:
+        logging.error(f"Failed to create view 'all_bookings': {exc}")
+        raise
+
+
 # PROJECT REQUIREMENT: views
 def create_most_frequent_users_view(engine):
     """
@@ -288,11 +810,11 @@ def create_most_frequent_users_view(engine):
                         CREATE OR REPLACE VIEW most_frequent_users AS
                         SELECT
                             users.user_name,
-                            COUNT(bookings.booking_id) AS reservation_count
+                            COUNT(all_bookings.booking_id) AS reservation_count
                         FROM
                             users
                         JOIN
-                            bookings ON users.user_name = bookings.user_name
+                            all_bookings ON users.user_id = all_bookings.user_id
                         GROUP BY
                             users.user_name
                         ORDER BY
@@ -312,14 +834,248 @@ def create_most_frequent_users_view(engine):
         raise
 
 
+def create_desk_availability_view(engine):
+    """
+    Create the desk_availability view in the database.
+    Despite its name the view holds no availability, it is a plain join of desks with their office, floor
+    and sector. Desk allocation filters and scores desks on it, free desks are found by an anti-join on the
+    (desk_id, start_date, end_date) bookings index in the allocation query itself.
+
+    :param engine: SQLAlchemy engine connected to the database.
+    """
+    try:
+        with engine.connect() as connection:
+            # Begin transaction
+            transaction = connection.begin()
+
+            try:
+                connection.execute(
+                    sqlalchemy.text(
+                        """
+                        CREATE OR REPLACE VIEW desk_availability AS
+                        SELECT
+                            desks.desk_id,
+                            desks.desk_code,
+                            desks.local_id,
+                            desks.office_id,
+                            offices.office_name,
+                            desks.floor_id,
+                            floors.floor_name,
+                            desks.sector_id,
+                            sectors.sector_name
+                        FROM
+                            desks
+                        JOIN
+                            offices ON offices.office_id = desks.office_id
+                        JOIN
+                            floors ON floors.floor_id = desks.floor_id
+                        JOIN
+                            sectors ON sectors.sector_id = desks.sector_id;
+                        """
+                    )
+                )
+
+                transaction.commit()
+                logging.info("View 'desk_availability' created successfully.")
+            except Exception as exc:
+                transaction.rollback()
+                logging.error(f"Error while creating 'desk_availability' view: {exc}")
+                raise
+    except Exception as exc:
+        logging.error(f"Failed to create view 'desk_availability': {exc}")
+        raise
+
+
+def create_log_partition_function(engine):
+    """
+    Create the function managing monthly partitions of the logs table.
+    Partitions are created from the month of `from_date` up to `months_ahead` months in the future.
+
+    :param engine: SQLAlchemy engine connected to the database.
+    """
+    try:
+        with engine.connect() as connection:
+            # Begin transaction
+            transaction = connection.begin()
+
+            try:
+                connection.execute(
+                    sqlalchemy.text(
+                        """
+                        CREATE OR REPLACE FUNCTION ensure_log_partitions(
+                            from_date date DEFAULT CURRENT_DATE,
+                            months_ahead integer DEFAULT 2
+                        )
+                        RETURNS void LANGUAGE plpgsql AS $$
+                        DECLARE
+                            month_start date := date_trunc('month', from_date)::date;
+                            last_month date := (date_trunc('month', CURRENT_DATE) + make_interval(months => months_ahead))::date;
+                            partition_name text;
+                        BEGIN
+                            WHILE month_start <= last_month LOOP
+                                partition_name := 'logs_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM');
+                                IF to_regclass(partition_name) IS NULL THEN
+                                    EXECUTE format(
+                                        'CREATE TABLE %I PARTITION OF logs FOR VALUES FROM (%L) TO (%L)',
+                                        partition_name,
+                                        month_start,
+                                        (month_start + INTERVAL '1 month')::date
+                                    );
+                                END IF;
+                                month_start := (month_start + INTERVAL '1 month')::date;
+                            END LOOP;
+                        END;
+                        $$;
+                        """
+                    )
+                )
+
+                transaction.commit()
+                logging.info("Function 'ensure_log_partitions' created successfully.")
+            except Exception as exc:
+                transaction.rollback()
+                logging.error(f"Error while creating 'ensure_log_partitions' function: {exc}")
+                raise
+    except Exception as exc:
+        logging.error(f"Failed to create function 'ensure_log_partitions': {exc}")
+        raise
+
+
+def create_log_partitions(engine):
+    """
+    Create the default and upcoming monthly partitions of the logs table and schedule their creation with pg_cron.
+    Partitions are created ahead of time, the default partition only catches rows outside of them.
+
+    :param engine: SQLAlchemy engine connected to the database.
+    """
+    try:
+        with engine.connect() as connection:
+            # Begin transaction
+            transaction = connection.begin()
+
+            try:
+                connection.execute(
+                    sqlalchemy.text("CREATE TABLE IF NOT EXISTS logs_default PARTITION OF logs DEFAULT;")
+                )
+                connection.execute(sqlalchemy.text("SELECT ensure_log_partitions();"))
+
+                # Make sure upcoming months always have their partitions
+                connection.execute(
+                    sqlalchemy.text(
+                        """
+                        SELECT cron.schedule('ensure_log_partitions', '0 1 * * *', 'SELECT ensure_log_partitions();');
+                        """
+                    )
+                )
+
+                transaction.commit()
+                logging.info("Partitions for 'logs' table are ready.")
+            except Exception as exc:
+                transaction.rollback()
+                logging.error(f"Error while creating partitions for 'logs' table: {exc}")
+                raise
+    except Exception as exc:
+        logging.error(f"Failed to create partitions for 'logs' table: {exc}")
+        raise
+
+
+def migrate_logs_to_partitioned(engine):
+    """
+    Convert a plain logs table created by older versions of the app into the partitioned one.
+    Existing rows are copied into monthly partitions, the old table is dropped afterwards.
+
+    :param engine: SQLAlchemy engine connected to the database.
+    """
+    try:
+        with engine.connect() as connection:
+            # Begin transaction
+            transaction = connection.begin()
+
+            try:
+                relkind = connection.execute(
+                    sqlalchemy.text("SELECT relkind FROM pg_class WHERE oid = to_regclass('logs');")
+                ).scalar()
+
+                if relkind != "r":
+                    logging.info("Table 'logs' is already partitioned. Skipping migration.")
+                    return
+
+                # Free the names used by the partitioned table, the old indexes go away with the old table anyway
+                connection.execute(sqlalchemy.text("ALTER TABLE logs RENAME TO logs_legacy;"))
+                connection.execute(
+                    sqlalchemy.text("ALTER TABLE logs_legacy RENAME CONSTRAINT logs_pkey TO logs_legacy_pkey;")
+                )
+                legacy_indexes = connection.execute(
+                    sqlalchemy.text(
+                        """
+                        SELECT indexname FROM pg_indexes
+                        WHERE schemaname = current_schema() AND tablename = 'logs_legacy'
+                          AND indexname <> 'logs_legacy_pkey';
+                        """
+                    )
+                ).scalars()
+                for index_name in list(legacy_indexes):
+                    connection.execute(sqlalchemy.text(f'DROP INDEX "{index_name}";'))
+                connection.execute(sqlalchemy.text("ALTER SEQUENCE logs_log_id_seq RENAME TO logs_legacy_log_id_seq;"))
+
+                # Older tables may lack the structured columns, only the shared ones are copied
+                legacy_columns = set(
+                    connection.execute(
+                        sqlalchemy.text(
+                            """
+                            SELECT column_name FROM information_schema.columns
+                            WHERE table_schema = current_schema() AND table_name = 'logs_legacy';
+                            """
+                        )
+                    ).scalars()
+                )
+                copied_columns = ", ".join(
+                    column.name for column in Log.__table__.columns if column.name in legacy_columns
+                )
+
+                Log.__table__.create(connection)
+                migration_statements = [
+                    "CREATE TABLE logs_default PARTITION OF logs DEFAULT;",
+                    "SELECT ensure_log_partitions(COALESCE((SELECT MIN(created_at)::date FROM logs_legacy), CURRENT_DATE));",
+                    f"INSERT INTO logs ({copied_columns}) SELECT {copied_columns} FROM logs_legacy;",
+                    "SELECT setval('logs_log_id_seq', COALESCE((SELECT MAX(log_id) FROM logs), 1));",
+                    "DROP TABLE logs_legacy;",
+                ]
+                for statement in migration_statements:
+                    connection.execute(sqlalchemy.text(statement))
+
+                transaction.commit()
+                logging.info("Table 'logs' migrated to monthly partitions successfully.")
+            except Exception as exc:
+                transaction.rollback()
+                logging.error(f"Error while migrating 'logs' table to partitions: {exc}")
+                raise
+    except Exception as exc:
+        logging.error(f"Failed to migrate 'logs' table to partitions: {exc}")
+        raise
+
+
 def initialize_app_db():
     """Initialize the application by setting up the database."""
     try:
         create_tables()
         preload_data()
+        migrate_booking_keys(desk_booking_engine)
+        # The logs table is partitioned before indexes are added, they are then built on the partitioned table
+        create_log_partition_function(desk_booking_engine)
+        migrate_logs_to_partitioned(desk_booking_engine)
+        add_structured_log_columns(desk_booking_engine)
+        create_missing_indexes(desk_booking_engine)
+        drop_obsolete_indexes(desk_booking_engine)
         create_trigger(desk_booking_engine)
+        create_waitlist_promotion(desk_booking_engine)
+        create_floor_version_trigger(desk_booking_engine)
         initialize_pg_cron(desk_booking_engine)
+        create_log_partitions(desk_booking_engine)
+        create_bookings_history_job(desk_booking_engine)
+        create_all_bookings_view(desk_booking_engine)
         create_most_frequent_users_view(desk_booking_engine)
+        create_desk_availability_view(desk_booking_engine)
     except (Exception, ValueError) as error:
         logging.error(f"Error during database initialization: {error}")
         raise
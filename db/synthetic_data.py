@@ -0,0 +1,692 @@
+# Synthetic data sets at production scale for benchmarks, query plan checks and capacity planning.
+# Topology CSVs use the format of db/data, so they can be imported like the real data, users and bookings
+# are written in table column order for COPY. Bookings are generated day by day with NumPy and streamed
+# to disk, the same seed and dates always produce the same files.
+import os
+import csv
+import shutil
+import logging
+import argparse
+from typing import NamedTuple, Optional
+from datetime import date, timedelta
+import numpy as np
+
+from backend_operations.utils import resource_path
+from backend_operations.slot_calendar import SLOT_MINUTES
+
+
+SYNTHETIC_SEED = 0
+SYNTHETIC_OFFICES = 50
+SYNTHETIC_DESKS = 20000
+SYNTHETIC_USERS = 50000
+SYNTHETIC_BOOKINGS = 20000000
+SYNTHETIC_FLOORS_PER_OFFICE = 8
+SYNTHETIC_SECTORS_PER_FLOOR = 4
+# About five years, 20M bookings keep busy days below full occupancy of 20k desks
+SYNTHETIC_HISTORY_DAYS = 1900
+SYNTHETIC_FUTURE_DAYS = 14
+SYNTHETIC_CANCELLATION_RATE = 0.12
+SYNTHETIC_DIR = "synthetic_data"
+
+CITY_NAMES = (
+    "Warsaw",
+    "Krakow",
+    "Gdansk",
+    "Wroclaw",
+    "Poznan",
+    "Lodz",
+    "Katowice",
+    "Lublin",
+    "Szczecin",
+    "Bydgoszcz",
+    "Berlin",
+    "Prague",
+    "Vienna",
+    "Budapest",
+    "Vilnius",
+    "Riga",
+    "Tallinn",
+    "Bratislava",
+    "Dublin",
+    "Lisbon",
+)
+# Lookup tables and their name columns, the same as in the real data. Generated rows refer to their IDs
+LOOKUP_TABLES = {"roles": "role_name", "departments": "department_name", "statuses": "status_name"}
+ADMIN_ROLE_ID = 1
+USER_ROLE_ID = 2
+PENDING_STATUS_ID = 1
+COMPLETED_STATUS_ID = 3
+CANCELED_STATUS_ID = 4
+# bcrypt hash of the password "synthetic", shared by all generated users so generation stays fast and deterministic
+SYNTHETIC_PASSWORD_HASH = "$2b$12$JtrWtpcmVuHmuBPjHQMOiu8pUvqxTkkGgttlHWl8GfyHLKscMZPg."
+
+# Relative booking volume per weekday, Monday first, and per month, January first
+WEEKDAY_WEIGHTS = np.array([0.8, 1.0, 1.0, 0.95, 0.55, 0.03, 0.01])
+MONTH_WEIGHTS = np.array([0.95, 1.0, 1.0, 1.0, 0.95, 0.9, 0.8, 0.7, 1.0, 1.0, 1.0, 0.8])
+
+# How a booked desk is used on a day: one full day booking, morning or afternoon only, or both halves
+# booked by two different users. Halves meet at 12:30, so bookings of one desk never overlap.
+FULL_DAY, MORNING, AFTERNOON, SPLIT_DAY = range(4)
+DAY_PATTERN_SHARES = np.array([0.7, 0.12, 0.1, 0.08])
+BOOKINGS_PER_BOOKED_DESK = DAY_PATTERN_SHARES @ np.array([1, 1, 1, 2])
+MIDDAY_SLOT = 12 * 60 // SLOT_MINUTES + 2
+# Mean (start slot, duration in slots) of each booking kind and their spread in slots
+FULL_DAY_TIMES = (34, 34, 3, 4)
+MORNING_TIMES = (32, 14, 3, 3)
+AFTERNOON_TIMES = (53, 16, 3, 4)
+# Mean days between creating a booking and its start
+BOOKING_LEAD_DAYS = 4
+
+
+class SyntheticTopology(NamedTuple):
+    """Generated offices, floors, sectors and desks as parallel arrays of 0-based positions."""
+
+    office_names: list[str]
+    floor_office: np.ndarray
+    sector_floor: np.ndarray
+    desk_sector: np.ndarray
+    desk_local_id: np.ndarray
+
+    @property
+    def sector_office(self) -> np.ndarray:
+        return self.floor_office[self.sector_floor]
+
+    @property
+    def desk_office(self) -> np.ndarray:
+        return self.sector_office[self.desk_sector]
+
+
+class SyntheticUsers(NamedTuple):
+    """Generated users, stored office by office."""
+
+    office_start: np.ndarray
+    office_count: np.ndarray
+    # Users of an office sorted by this array, every user belongs to the office of its position
+    user_office: np.ndarray
+    # Log of how often a user books compared to colleagues
+    log_activity: np.ndarray
+
+
+def allocate(total: int, weights: np.ndarray) -> np.ndarray:
+    """
+    Split a total into integer parts proportional to weights, rounding with the largest remainders.
+
+    :param total: The total to split
+    :param weights: Non-negative weights, one per part
+    """
+    shares = total * weights / weights.sum()
+    parts = np.floor(shares).astype(np.int64)
+    remainder_order = np.argsort(parts - shares, kind="stable")
+    parts[remainder_order[: total - parts.sum()]] += 1
+    return parts
+
+
+def ordinal(number: int) -> str:
+    """Return the English ordinal of a number, e.g. 1st, 12th, 23rd."""
+    suffix = "th" if 10 <= number % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    return f"{number}{suffix}"
+
+
+def top_k(rng: np.random.Generator, log_weights: np.ndarray, k: int) -> np.ndarray:
+    """
+    Draw k distinct positions without replacement, proportionally to the weights.
+    Gumbel top-k: one random key per position and a partial sort, no Python loop over draws.
+
+    :param rng: The random generator
+    :param log_weights: Log of the weight of every position
+    :param k: Number of positions to draw
+    """
+    keys = log_weights + rng.gumbel(size=log_weights.size)
+    return np.argpartition(-keys, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+
+
+def build_topology(
+    rng: np.random.Generator, offices: int, desks: int, floors_per_office: int, sectors_per_floor: int
+) -> SyntheticTopology:
+    """
+    Generate offices of varying size, every office has the same number of floors and sectors per floor
+    and its desks are spread evenly over its sectors.
+
+    :param rng: The random generator
+    :param offices: Number of offices
+    :param desks: Number of desks over all offices
+    :param floors_per_office: Floors of every office
+    :param sectors_per_floor: Sectors of every floor, at most 26
+    """
+    if desks < offices:
+        raise ValueError("Every office needs at least one desk.")
+    if not 1 <= sectors_per_floor <= 26:
+        raise ValueError("Sectors are named A to Z, use 1 to 26 sectors per floor.")
+
+    # A few headquarters hold a large share of the desks
+    office_desks = allocate(desks - offices, rng.lognormal(0.0, 0.6, offices)) + 1
+    office_names = [
+        CITY_NAMES[office % len(CITY_NAMES)]
+        + (f" {office // len(CITY_NAMES) + 1}" if office >= len(CITY_NAMES) else "")
+        for office in range(offices)
+    ]
+
+    floor_office = np.repeat(np.arange(offices), floors_per_office)
+    sector_floor = np.repeat(np.arange(floor_office.size), sectors_per_floor)
+    sector_office = floor_office[sector_floor]
+    sectors_per_office = floors_per_office * sectors_per_floor
+    sector_rank = np.arange(sector_floor.size) % sectors_per_office
+    sector_desks = office_desks[sector_office] // sectors_per_office + (
+        sector_rank < office_desks[sector_office] % sectors_per_office
+    )
+
+    desk_sector = np.repeat(np.arange(sector_floor.size), sector_desks)
+    sector_first_desk = np.cumsum(sector_desks) - sector_desks
+    desk_local_id = np.arange(desk_sector.size) - sector_first_desk[desk_sector] + 1
+    return SyntheticTopology(office_names, floor_office, sector_floor, desk_sector, desk_local_id)
+
+
+def build_users(rng: np.random.Generator, topology: SyntheticTopology, users: int) -> SyntheticUsers:
+    """
+    Assign users to offices proportionally to their desks, with a skewed booking activity.
+
+    :param rng: The random generator
+    :param topology: The generated topology
+    :param users: Number of users
+    """
+    office_desks = np.bincount(topology.desk_office, minlength=len(topology.office_names))
+    office_count = allocate(users, office_desks.astype(float))
+    office_start = np.cumsum(office_count) - office_count
+    user_office = np.repeat(np.arange(office_count.size), office_count)
+    # Some people come in every day, most only a few days a month
+    return SyntheticUsers(office_start, office_count, user_office, rng.normal(0.0, 1.0, users))
+
+
+def write_topology_csvs(topology: SyntheticTopology, out_dir: str) -> None:
+    """
+    Write the lookup tables and the topology in the format of db/data, IDs are 1-based file positions.
+
+    :param topology: The generated topology
+    :param out_dir: Output directory
+    """
+    for table in LOOKUP_TABLES:
+        shutil.copyfile(resource_path(f"db/data/{table}.csv"), os.path.join(out_dir, f"{table}.csv"))
+
+    with open(os.path.join(out_dir, "offices.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["office_name"])
+        writer.writerows([office_name] for office_name in topology.office_names)
+
+    floor_rank = np.arange(topology.floor_office.size) - np.searchsorted(topology.floor_office, topology.floor_office)
+    with open(os.path.join(out_dir, "floors.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["office_id", "floor_name"])
+        writer.writerows(
+            (office + 1, f"{ordinal(rank + 1)} floor")
+            for office, rank in zip(topology.floor_office.tolist(), floor_rank.tolist())
+        )
+
+    sector_rank = np.arange(topology.sector_floor.size) - np.searchsorted(topology.sector_floor, topology.sector_floor)
+    with open(os.path.join(out_dir, "sectors.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["floor_id", "sector_name"])
+        writer.writerows(
+            (floor + 1, chr(ord("A") + rank))
+            for floor, rank in zip(topology.sector_floor.tolist(), sector_rank.tolist())
+        )
+
+    desk_floor = topology.sector_floor[topology.desk_sector]
+    with open(os.path.join(out_dir, "desks.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["office_id", "floor_id", "sector_id", "local_id"])
+        writer.writerows(
+            zip(
+                (topology.desk_office + 1).tolist(),
+                (desk_floor + 1).tolist(),
+                (topology.desk_sector + 1).tolist(),
+                topology.desk_local_id.tolist(),
+            )
+        )
+
+    # Sectors are columns of the floor layout, desks are laid out two per row within their sector
+    sectors_per_floor = np.bincount(topology.sector_floor)
+    sector_columns = sectors_per_floor[topology.sector_floor][topology.desk_sector]
+    sector_desks = np.bincount(topology.desk_sector)[topology.desk_sector]
+    rows = np.ceil(sector_desks / 2)
+    width = 1 / sector_columns / 2
+    height = 1 / rows
+    left = sector_rank[topology.desk_sector] / sector_columns + (topology.desk_local_id - 1) % 2 * width
+    top = (topology.desk_local_id - 1) // 2 * height
+    with open(os.path.join(out_dir, "desk_geometries.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["sector_id", "local_id", "polygon"])
+        writer.writerows(
+            (
+                sector + 1,
+                local_id,
+                f"{x0:.3f},{y0:.3f} {x1:.3f},{y0:.3f} {x1:.3f},{y1:.3f} {x0:.3f},{y1:.3f}",
+            )
+            for sector, local_id, x0, y0, x1, y1 in zip(
+                topology.desk_sector.tolist(),
+                topology.desk_local_id.tolist(),
+                (left + 0.1 * width).tolist(),
+                (top + 0.1 * height).tolist(),
+                (left + 0.9 * width).tolist(),
+                (top + 0.9 * height).tolist(),
+            )
+        )
+
+
+def write_users_csv(rng: np.random.Generator, users: SyntheticUsers, out_dir: str) -> None:
+    """
+    Write the users in table column order, the first user of every office is an admin.
+
+    :param rng: The random generator
+    :param users: The generated users
+    :param out_dir: Output directory
+    """
+    with open(resource_path("db/data/departments.csv")) as file:
+        department_count = sum(1 for _ in file) - 1
+
+    role_ids = np.full(users.user_office.size, USER_ROLE_ID)
+    role_ids[users.office_start[users.office_count > 0]] = ADMIN_ROLE_ID
+    department_ids = rng.integers(1, department_count + 1, users.user_office.size)
+
+    with open(os.path.join(out_dir, "users.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["user_name", "password", "role_id", "department_id"])
+        writer.writerows(
+            (f"user{position + 1:06d}@example.com", SYNTHETIC_PASSWORD_HASH, role_id, department_id)
+            for position, (role_id, department_id) in enumerate(zip(role_ids.tolist(), department_ids.tolist()))
+        )
+
+
+def booking_times(
+    rng: np.random.Generator, count: int, times: tuple[int, int, int, int], start_limits: tuple[int, int]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Draw start slots and durations in slots of bookings of one kind."""
+    start_mean, duration_mean, start_spread, duration_spread = times
+    start = np.clip(np.rint(rng.normal(start_mean, start_spread, count)), *start_limits).astype(np.int64)
+    duration = np.clip(np.rint(rng.normal(duration_mean, duration_spread, count)), 8, 40).astype(np.int64)
+    return start, duration
+
+
+def generate_day_bookings(
+    rng: np.random.Generator,
+    topology: SyntheticTopology,
+    users: SyntheticUsers,
+    desk_log_popularity: np.ndarray,
+    day: date,
+    booked_desks: int,
+    today: date,
+    cancellation_rate: float,
+) -> dict[str, np.ndarray]:
+    """
+    Generate the bookings of one day. Every desk and every user has at most one booking per half day
+    and users only book desks of their own office, so the generated bookings never overlap.
+
+    :param rng: The random generator
+    :param topology: The generated topology
+    :param users: The generated users
+    :param desk_log_popularity: Log of how popular every desk is
+    :param day: The day
+    :param booked_desks: Number of desks booked on the day
+    :param today: Bookings before this day are finished, later ones pending
+    :param cancellation_rate: Share of canceled bookings, including no-shows
+    :return: Columns of the bookings table, IDs are 1-based
+    """
+    desks = top_k(rng, desk_log_popularity, booked_desks)
+    pattern = rng.choice(DAY_PATTERN_SHARES.size, desks.size, p=DAY_PATTERN_SHARES)
+    split = pattern == SPLIT_DAY
+    booking_desk = np.concatenate([desks, desks[split]])
+    kind = np.concatenate([np.where(split, MORNING, pattern), np.full(int(split.sum()), AFTERNOON)])
+
+    # Bookings and users are both grouped by office and paired up, an office cannot book more desks than it has users
+    booking_office = topology.desk_office[booking_desk]
+    office_bookings = np.bincount(booking_office, minlength=users.office_count.size)
+    office_taken = np.minimum(office_bookings, users.office_count)
+
+    booking_order = np.argsort(booking_office, kind="stable")
+    booking_rank = (
+        np.arange(booking_order.size) - (np.cumsum(office_bookings) - office_bookings)[booking_office[booking_order]]
+    )
+    booking_order = booking_order[booking_rank < office_taken[booking_office[booking_order]]]
+
+    user_keys = users.log_activity + rng.gumbel(size=users.log_activity.size)
+    user_order = np.lexsort((-user_keys, users.user_office))
+    user_rank = np.arange(user_order.size) - users.office_start[users.user_office[user_order]]
+    booking_user = user_order[user_rank < office_taken[users.user_office[user_order]]]
+
+    booking_desk = booking_desk[booking_order]
+    kind = kind[booking_order]
+
+    start = np.empty(kind.size, dtype=np.int64)
+    end = np.empty(kind.size, dtype=np.int64)
+    for booking_kind, times, start_limits in (
+        (FULL_DAY, FULL_DAY_TIMES, (24, 44)),
+        (MORNING, MORNING_TIMES, (24, 40)),
+        (AFTERNOON, AFTERNOON_TIMES, (MIDDAY_SLOT, 64)),
+    ):
+        of_kind = kind == booking_kind
+        kind_start, duration = booking_times(rng, int(of_kind.sum()), times, start_limits)
+        start[of_kind] = kind_start
+        end[of_kind] = kind_start + duration
+    end[kind == MORNING] = np.minimum(end[kind == MORNING], MIDDAY_SLOT)
+
+    day_start = np.datetime64(day, "m")
+    start_date = day_start + start * SLOT_MINUTES
+    end_date = day_start + end * SLOT_MINUTES
+
+    canceled = rng.random(kind.size) < cancellation_rate
+    finished_status_id = COMPLETED_STATUS_ID if day < today else PENDING_STATUS_ID
+    status_id = np.where(canceled, CANCELED_STATUS_ID, finished_status_id)
+
+    lead_seconds = rng.exponential(BOOKING_LEAD_DAYS * 24 * 60 * 60, kind.size).astype(np.int64) + 300
+    created_at = np.minimum(start_date.astype("datetime64[s]") - lead_seconds, np.datetime64(today, "s"))
+
+    return {
+        "user_id": booking_user + 1,
+        "desk_id": booking_desk + 1,
+        "start_date": start_date,
+        "end_date": end_date,
+        "status_id": status_id,
+        "created_at": created_at,
+    }
+
+
+def write_bookings_csv(
+    rng: np.random.Generator,
+    topology: SyntheticTopology,
+    users: SyntheticUsers,
+    out_dir: str,
+    bookings: int,
+    first_day: date,
+    days: int,
+    today: date,
+    cancellation_rate: float,
+) -> int:
+    """
+    Stream the bookings to disk one day at a time, the daily volume follows weekday and month weights.
+
+    :param rng: The random generator
+    :param topology: The generated topology
+    :param users: The generated users
+    :param out_dir: Output directory
+    :param bookings: Number of bookings aimed for, fewer are written if the desks are fully booked
+    :param first_day: First day with bookings
+    :param days: Number of days with bookings
+    :param today: Bookings before this day are finished, later ones pending
+    :param cancellation_rate: Share of canceled bookings, including no-shows
+    :return: Number of written bookings
+    """
+    all_days = [first_day + timedelta(days=offset) for offset in range(days)]
+    day_weights = np.array([WEEKDAY_WEIGHTS[day.weekday()] * MONTH_WEIGHTS[day.month - 1] for day in all_days])
+    # Day to day noise on top of the weekly and yearly pattern
+    day_weights *= rng.normal(1.0, 0.05, days).clip(0.5)
+    desk_count = topology.desk_sector.size
+    booked_desks = np.rint(bookings * day_weights / day_weights.sum() / BOOKINGS_PER_BOOKED_DESK).astype(np.int64)
+    if booked_desks.max() > desk_count:
+        logging.warning(
+            f"{bookings} bookings in {days} days need more than {desk_count} desks on busy days, "
+            "busy days are capped at all desks booked."
+        )
+    booked_desks = np.minimum(booked_desks, desk_count)
+
+    # Popular floors, sectors and desks: office, sector and desk factors multiply
+    desk_log_popularity = (
+        rng.normal(0.0, 0.3, len(topology.office_names))[topology.desk_office]
+        + rng.normal(0.0, 0.3, topology.sector_floor.size)[topology.desk_sector]
+        + rng.normal(0.0, 0.4, desk_count)
+    )
+
+    written = 0
+    with open(os.path.join(out_dir, "bookings.csv"), "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["user_id", "desk_id", "start_date", "end_date", "status_id", "created_at"])
+        for day, day_desks in zip(all_days, booked_desks.tolist()):
+            columns = generate_day_bookings(
+                rng, topology, users, desk_log_popularity, day, day_desks, today, cancellation_rate
+            )
+            writer.writerows(
+                zip(
+                    columns["user_id"].tolist(),
+                    columns["desk_id"].tolist(),
+                    columns["start_date"].astype(str).tolist(),
+                    columns["end_date"].astype(str).tolist(),
+                    columns["status_id"].tolist(),
+                    columns["created_at"].astype(str).tolist(),
+                )
+            )
+            written += columns["user_id"].size
+    return written
+
+
+def generate_synthetic_data(
+    out_dir: str = SYNTHETIC_DIR,
+    seed: int = SYNTHETIC_SEED,
+    offices: int = SYNTHETIC_OFFICES,
+    desks: int = SYNTHETIC_DESKS,
+    users: int = SYNTHETIC_USERS,
+    bookings: int = SYNTHETIC_BOOKINGS,
+    floors_per_office: int = SYNTHETIC_FLOORS_PER_OFFICE,
+    sectors_per_floor: int = SYNTHETIC_SECTORS_PER_FLOOR,
+    history_days: int = SYNTHETIC_HISTORY_DAYS,
+    future_days: int = SYNTHETIC_FUTURE_DAYS,
+    cancellation_rate: float = SYNTHETIC_CANCELLATION_RATE,
+    today: Optional[date] = None,
+) -> dict[str, int]:
+    """
+    Generate a complete data set as CSV files.
+
+    :param out_dir: Output directory, created if missing
+    :param seed: Seed of the random generator
+    :param offices: Number of offices
+    :param desks: Number of desks over all offices
+    :param users: Number of users
+    :param bookings: Number of bookings aimed for
+    :param floors_per_office: Floors of every office
+    :param sectors_per_floor: Sectors of every floor
+    :param history_days: Days of finished bookings before today
+    :param future_days: Days of pending bookings from today on
+    :param cancellation_rate: Share of canceled bookings, including no-shows
+    :param today: Splits finished and pending bookings, defaults to today. Fix it to reproduce a data set
+    :return: Number of generated rows per table
+    """
+    today = today or date.today()
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    topology = build_topology(rng, offices, desks, floors_per_office, sectors_per_floor)
+    write_topology_csvs(topology, out_dir)
+    synthetic_users = build_users(rng, topology, users)
+    write_users_csv(rng, synthetic_users, out_dir)
+    booking_count = write_bookings_csv(
+        rng,
+        topology,
+        synthetic_users,
+        out_dir,
+        bookings,
+        today - timedelta(days=history_days),
+        history_days + future_days,
+        today,
+        cancellation_rate,
+    )
+
+    counts = {
+        "offices": offices,
+        "floors": topology.floor_office.size,
+        "sectors": topology.sector_floor.size,
+        "desks": topology.desk_sector.size,
+        "users": users,
+        "bookings": booking_count,
+    }
+    logging.info(f"Synthetic data written to '{out_dir}': {counts}")
+    return counts
+
+
+def copy_csv(cursor, target: str, path: str) -> None:
+    """Stream a CSV file with a header row into a table with COPY."""
+    with open(path, "rb") as csv_file:
+        cursor.execute(f"COPY {target} FROM STDIN WITH (FORMAT csv, HEADER)", stream=csv_file)
+
+
+def load_synthetic_data(engine, data_dir: str = SYNTHETIC_DIR) -> None:
+    """
+    Load a generated data set into a database without offices, users and bookings in one transaction.
+    Rows are streamed with COPY, desk codes and geometries are resolved with one set-based insert each.
+
+    :param engine: SQLAlchemy engine connected to the database, its tables must exist
+    :param data_dir: Directory with the generated files
+    """
+    raw_connection = engine.raw_connection()
+    try:
+        cursor = raw_connection.cursor()
+        for table in ("offices", "users", "bookings"):
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table})")
+            if cursor.fetchone()[0]:
+                raise ValueError(f"Table '{table}' already contains rows, load synthetic data into a fresh database.")
+
+        for table, name_column in LOOKUP_TABLES.items():
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table})")
+            if not cursor.fetchone()[0]:
+                copy_csv(cursor, f"{table} ({name_column})", os.path.join(data_dir, f"{table}.csv"))
+
+        # Generated rows refer to each other by file position, so IDs have to start at 1
+        for table, id_column in (
+            ("offices", "office_id"),
+            ("floors", "floor_id"),
+            ("sectors", "sector_id"),
+            ("desks", "desk_id"),
+            ("users", "user_id"),
+            ("bookings", "booking_id"),
+        ):
+            cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', '{id_column}'), 1, false)")
+
+        copy_csv(cursor, "offices (office_name)", os.path.join(data_dir, "offices.csv"))
+        copy_csv(cursor, "floors (office_id, floor_name)", os.path.join(data_dir, "floors.csv"))
+        copy_csv(cursor, "sectors (floor_id, sector_name)", os.path.join(data_dir, "sectors.csv"))
+
+        cursor.execute(
+            """
+            CREATE TEMP TABLE synthetic_desks (
+                position serial, office_id integer, floor_id integer, sector_id integer, local_id integer
+            ) ON COMMIT DROP;
+            """
+        )
+        copy_csv(
+            cursor, "synthetic_desks (office_id, floor_id, sector_id, local_id)", os.path.join(data_dir, "desks.csv")
+        )
+        cursor.execute(
+            """
+            INSERT INTO desks (office_id, floor_id, sector_id, local_id, desk_code)
+            SELECT
+                synthetic_desks.office_id,
+                synthetic_desks.floor_id,
+                synthetic_desks.sector_id,
+                synthetic_desks.local_id,
+                offices.office_name || '_' || floors.floor_name || '_' || sectors.sector_name || '_'
+                    || synthetic_desks.local_id
+            FROM synthetic_desks
+            JOIN offices ON offices.office_id = synthetic_desks.office_id
+            JOIN floors ON floors.floor_id = synthetic_desks.floor_id
+            JOIN sectors ON sectors.sector_id = synthetic_desks.sector_id
+            ORDER BY synthetic_desks.position;
+            """
+        )
+
+        cursor.execute(
+            "CREATE TEMP TABLE synthetic_geometries (sector_id integer, local_id integer, polygon text) ON COMMIT DROP;"
+        )
+        copy_csv(
+            cursor, "synthetic_geometries (sector_id, local_id, polygon)", os.path.join(data_dir, "desk_geometries.csv")
+        )
+        cursor.execute(
+            """
+            INSERT INTO desk_geometries (desk_id, polygon)
+            SELECT desks.desk_id, synthetic_geometries.polygon
+            FROM synthetic_geometries
+            JOIN desks ON desks.sector_id = synthetic_geometries.sector_id
+            AND desks.local_id = synthetic_geometries.local_id;
+            """
+        )
+
+        copy_csv(cursor, "users (user_name, password, role_id, department_id)", os.path.join(data_dir, "users.csv"))
+        # Generated bookings never overlap, the per-row booking triggers would only slow the load down
+        cursor.execute("ALTER TABLE bookings DISABLE TRIGGER USER;")
+        copy_csv(
+            cursor,
+            "bookings (user_id, desk_id, start_date, end_date, status_id, created_at)",
+            os.path.join(data_dir, "bookings.csv"),
+        )
+        cursor.execute("ALTER TABLE bookings ENABLE TRIGGER USER;")
+        cursor.execute("ANALYZE;")
+        cursor.close()
+        raw_connection.commit()
+        logging.info(f"Synthetic data from '{data_dir}' loaded.")
+    except Exception as exc:
+        raw_connection.rollback()
+        logging.error(f"Error while loading synthetic data from '{data_dir}': {exc}")
+        raise
+    finally:
+        raw_connection.close()
+
+
+def parse_synthetic_date(date_str: str) -> date:
+    """Parse a date given as YYYY-MM-DD."""
+    try:
+        return date.fromisoformat(date_str)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date '{date_str}', expected YYYY-MM-DD.")
+
+
+def add_synthetic_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the synthetic data command line arguments to a parser.
+
+    :param parser: The argument parser
+    """
+    parser.add_argument("--out", dest="out_dir", default=SYNTHETIC_DIR, help="Output directory")
+    parser.add_argument("--seed", type=int, default=SYNTHETIC_SEED)
+    parser.add_argument("--offices", type=int, default=SYNTHETIC_OFFICES)
+    parser.add_argument("--desks", type=int, default=SYNTHETIC_DESKS)
+    parser.add_argument("--users", type=int, default=SYNTHETIC_USERS)
+    parser.add_argument("--bookings", type=int, default=SYNTHETIC_BOOKINGS)
+    parser.add_argument("--floors-per-office", type=int, default=SYNTHETIC_FLOORS_PER_OFFICE)
+    parser.add_argument("--sectors-per-floor", type=int, default=SYNTHETIC_SECTORS_PER_FLOOR)
+    parser.add_argument("--history-days", type=int, default=SYNTHETIC_HISTORY_DAYS)
+    parser.add_argument("--future-days", type=int, default=SYNTHETIC_FUTURE_DAYS)
+    parser.add_argument("--cancellation-rate", type=float, default=SYNTHETIC_CANCELLATION_RATE)
+    parser.add_argument("--today", type=parse_synthetic_date, help="Reference day, fix it to reproduce a data set")
+    parser.add_argument("--load", action="store_true", help="Load the files into the configured database")
+
+
+def run_synthetic(args: argparse.Namespace) -> dict[str, int]:
+    """
+    Generate and optionally load the data set described by parsed command line arguments.
+
+    :param args: Arguments parsed with a parser set up by add_synthetic_arguments
+    :return: Number of generated rows per table
+    """
+    counts = generate_synthetic_data(
+        args.out_dir,
+        args.seed,
+        args.offices,
+        args.desks,
+        args.users,
+        args.bookings,
+        args.floors_per_office,
+        args.sectors_per_floor,
+        args.history_days,
+        args.future_days,
+        args.cancellation_rate,
+        args.today,
+    )
+    if args.load:
+        from db.sql_db import create_tables, desk_booking_engine
+
+        create_tables()
+        load_synthetic_data(desk_booking_engine, args.out_dir)
+    return counts
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    synthetic_parser = argparse.ArgumentParser(description="Generate a synthetic data set at production scale.")
+    add_synthetic_arguments(synthetic_parser)
+    run_synthetic(synthetic_parser.parse_args())
@@ -1,23 +1,21 @@
 import logging
 from typing import Callable
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import datetime
 from tkinter import Button, Frame, Label, messagebox
 
 from backend_operations.bookings_backend import check_user_current_or_next_booking, check_in_booking, cancel_booking
+from db.local_cache import is_server_online
 from backend_operations.user_login import get_current_user
+from backend_operations.slot_calendar import is_check_in_open
+from gui_operations.occupancy_gui import refresh_open_occupancy_grids
+from gui_operations.desk_map_gui import refresh_desk_maps
 
 
 def update_button_states(booking: dict, check_in_button: Button):
     """Update button states based on current time."""
-    current_time = datetime.now()
-    booking_start = datetime.strptime(booking["start_time"], "%Y-%m-%d %H:%M")
-
     # Enable 'Check In' button 15 minutes before start and up to 30 minutes after start
-    if (
-        booking_start - timedelta(minutes=15) <= current_time <= booking_start + timedelta(minutes=30)
-        and not booking["status"] == "Active"
-    ):
+    if is_check_in_open(booking["start_date"], datetime.now()) and not booking["status"] == "Active":
         check_in_button.config(state="normal")
     else:
         check_in_button.config(state="disabled")
@@ -141,11 +139,20 @@ def handle_cancel_booking(
             messagebox.showerror("Error", "Failed to cancel booking. Please try again.")
             return
 
-        # Notify the user
+        # Update open occupancy grids and desk maps in place
+        refresh_open_occupancy_grids()
+        refresh_desk_maps()
+
+        # Notify the user, offline cancellations are only queued until the server is reachable
+        if is_server_online():
+            cancel_message = "Your booking has been successfully canceled! Details:\n"
+        else:
+            cancel_message = (
+                "You are offline, the cancellation will be sent once the connection is restored. Details:\n"
+            )
         messagebox.showinfo(
             "Success",
-            "Your booking has been successfully canceled! Details:\n"
-            f"Desk code: '{current_booking['desk_code']}'\n"
+            cancel_message + f"Desk code: '{current_booking['desk_code']}'\n"
             f"Start time: '{current_booking["start_time"]}'\n"
             f"End time: '{current_booking["end_time"]}'",
         )
@@ -212,6 +219,10 @@ def handle_check_in(
             messagebox.showerror("Error", "Failed to check in. Please try again.")
             return
 
+        # Update open occupancy grids and desk maps in place
+        refresh_open_occupancy_grids()
+        refresh_desk_maps()
+
         # Notify the user of the successful check-in
         messagebox.showinfo("Success", "You have successfully checked in.")
 
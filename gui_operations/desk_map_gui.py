@@ -0,0 +1,221 @@
+import logging
+from PIL import Image, ImageTk
+from typing import Callable
+from sqlalchemy.orm import Session
+from datetime import datetime
+from tkinter import Canvas, Frame, messagebox
+
+from backend_operations.utils import resource_path
+from backend_operations.log_utils import log_event
+from backend_operations.user_login import get_current_user
+from backend_operations.dropdowns_backend import get_floor_desk_map
+from backend_operations.bookings_backend import get_booked_desk_codes, NOT_MODIFIED
+
+
+MAP_WIDTH = 600
+MAP_HEIGHT = 400
+
+DESK_COLORS = {"free": "#5cb85c", "booked": "#d9534f", "unknown": "#9e9e9e"}
+SELECTED_OUTLINE = "#1f4e79"
+
+# Scaled floor layouts, each PNG is loaded and resized only once per size
+BACKGROUND_CACHE: dict[tuple[str, int, int], ImageTk.PhotoImage] = {}
+# Desk maps currently shown, refreshed after the user changes bookings
+ACTIVE_DESK_MAPS: list["DeskMap"] = []
+
+
+def get_floor_background(office_name: str, floor_name: str, width: int, height: int) -> ImageTk.PhotoImage:
+    """Return the scaled floor layout image, loading it from disk only on first use.
+
+    :param office_name: The office name
+    :param floor_name: The floor name
+    :param width: Width of the map
+    :param height: Height of the map
+    """
+    floor_template_path = resource_path(f"office_layouts/{office_name}_{floor_name}.png")
+    cache_key = (floor_template_path, width, height)
+
+    if cache_key not in BACKGROUND_CACHE:
+        floor_template = Image.open(floor_template_path)
+        floor_template = floor_template.resize((width, height), Image.Resampling.LANCZOS)
+        BACKGROUND_CACHE[cache_key] = ImageTk.PhotoImage(floor_template)
+
+    return BACKGROUND_CACHE[cache_key]
+
+
+class DeskMap:
+    """Floor map drawn on a canvas with clickable desks coloured by availability.
+
+    The floor layout is a cached background layer, desks are polygons drawn from their stored geometry.
+    Availability refreshes only reconfigure desks whose state changed.
+    """
+
+    def __init__(
+        self,
+        parent: Frame,
+        session_factory: Callable[[], Session],
+        get_time_range: Callable[[], tuple[datetime, datetime] | None],
+        on_desk_click: Callable[[dict], None],
+        width: int = MAP_WIDTH,
+        height: int = MAP_HEIGHT,
+    ):
+        self.session_factory = session_factory
+        self.get_time_range = get_time_range
+        self.on_desk_click = on_desk_click
+        self.width = width
+        self.height = height
+
+        self.office_id: int | None = None
+        self.floor_id: int | None = None
+        # desk_code -> (polygon item, desk)
+        self.desk_items: dict[str, tuple[int, dict]] = {}
+        self.desk_states: dict[str, str] = {}
+        self.selected_desk: str | None = None
+        # Floor, time range and change version of the shown availability
+        self.availability_key: tuple[int, tuple[datetime, datetime]] | None = None
+        self.availability_version: int | None = None
+
+        self.canvas = Canvas(parent, width=width, height=height, bg="white", highlightthickness=0)
+        self.background_item = self.canvas.create_image(0, 0, anchor="nw")
+        self.hint_item = self.canvas.create_text(
+            width // 2, height // 2, text="Select an office and floor to view the layout", font=("Arial", 16)
+        )
+        self.canvas.tag_bind("desk", "<Button-1>", self.on_click)
+        self.canvas.tag_bind("desk", "<Enter>", lambda event: self.canvas.config(cursor="hand2"))
+        self.canvas.tag_bind("desk", "<Leave>", lambda event: self.canvas.config(cursor=""))
+
+        ACTIVE_DESK_MAPS.append(self)
+
+    def grid(self, **kwargs) -> None:
+        """Place the map canvas with the grid geometry manager."""
+        self.canvas.grid(**kwargs)
+
+    def show_floor(self, office_id: int, floor_id: int, office_name: str, floor_name: str) -> None:
+        """Draw desks of the floor and colour them by availability in the selected time range.
+
+        :param office_id: The office ID
+        :param floor_id: The floor ID
+        :param office_name: The office name, used to find the layout image
+        :param floor_name: The floor name, used to find the layout image
+        """
+        if (office_id, floor_id) == (self.office_id, self.floor_id):
+            self.refresh_availability()
+            return
+
+        self.office_id = office_id
+        self.floor_id = floor_id
+        self.canvas.delete("desk")
+        self.desk_items.clear()
+        self.desk_states.clear()
+        self.selected_desk = None
+        # The desks are redrawn grey, the next availability fetch must not be answered with NOT_MODIFIED
+        self.availability_key = None
+        self.availability_version = None
+
+        try:
+            self.canvas.itemconfig(
+                self.background_item, image=get_floor_background(office_name, floor_name, self.width, self.height)
+            )
+        except FileNotFoundError:
+            self.canvas.itemconfig(self.background_item, image="")
+            logging.error(f"Image for office: '{office_name}', floor: '{floor_name}' not found.")
+            log_event(
+                get_current_user(),
+                "FAILURE",
+                "Desk selection",
+                f"No office layout found for office: '{office_name}' and floor: '{floor_name}'",
+            )
+            messagebox.showerror(
+                "Error", f"No office layout found for office: '{office_name}' and floor: '{floor_name}'."
+            )
+
+        desks = get_floor_desk_map(self.session_factory, office_id, floor_id)
+        self.canvas.itemconfig(self.hint_item, text="" if desks else "No desk map available for this floor")
+
+        for desk in desks:
+            points = [coordinate for x, y in desk["polygon"] for coordinate in (x * self.width, y * self.height)]
+            polygon = self.canvas.create_polygon(
+                *points,
+                fill=DESK_COLORS["unknown"],
+                stipple="gray50",
+                outline=DESK_COLORS["unknown"],
+                width=3,
+                tags=("desk", f"desk_{desk['desk_code']}"),
+            )
+            self.desk_items[desk["desk_code"]] = (polygon, desk)
+            self.desk_states[desk["desk_code"]] = "unknown"
+
+        self.refresh_availability()
+
+    def set_desk_state(self, desk_code: str, state: str) -> None:
+        """Recolour a single desk if its state changed."""
+        if self.desk_states.get(desk_code) == state:
+            return
+
+        polygon, _ = self.desk_items[desk_code]
+        self.canvas.itemconfig(polygon, fill=DESK_COLORS[state])
+        if desk_code != self.selected_desk:
+            self.canvas.itemconfig(polygon, outline=DESK_COLORS[state])
+        self.desk_states[desk_code] = state
+
+    def refresh_availability(self) -> None:
+        """Fetch booked desks of the shown floor for the selected time range and update changed desks only."""
+        if not self.desk_items:
+            return
+
+        time_range = self.get_time_range()
+        booked_desks = None
+        if time_range:
+            # The version is only comparable while the floor and time range stay the same
+            key = (self.floor_id, time_range)
+            since = self.availability_version if key == self.availability_key else None
+            availability = get_booked_desk_codes(
+                self.session_factory, self.office_id, self.floor_id, time_range[0], time_range[1], since
+            )
+            if availability is NOT_MODIFIED:
+                return
+            if availability is not None:
+                booked_desks, self.availability_version = availability
+                self.availability_key = key
+
+        if booked_desks is None:
+            self.availability_key = None
+
+        for desk_code in self.desk_items:
+            if booked_desks is None:
+                self.set_desk_state(desk_code, "unknown")
+            else:
+                self.set_desk_state(desk_code, "booked" if desk_code in booked_desks else "free")
+
+    def select_desk(self, desk_code: str | None) -> None:
+        """Highlight the selected desk.
+
+        :param desk_code: Code of the desk to highlight, None clears the selection
+        """
+        if self.selected_desk in self.desk_items:
+            polygon, _ = self.desk_items[self.selected_desk]
+            self.canvas.itemconfig(polygon, outline=DESK_COLORS[self.desk_states[self.selected_desk]])
+
+        self.selected_desk = desk_code if desk_code in self.desk_items else None
+        if self.selected_desk:
+            polygon, _ = self.desk_items[self.selected_desk]
+            self.canvas.itemconfig(polygon, outline=SELECTED_OUTLINE)
+            self.canvas.tag_raise(polygon)
+
+    def on_click(self, event) -> None:
+        """Select the clicked desk and pass it to the click callback."""
+        current_items = self.canvas.find_withtag("current")
+        if not current_items:
+            return
+
+        for desk_code, (polygon, desk) in self.desk_items.items():
+            if polygon == current_items[0]:
+                self.select_desk(desk_code)
+                self.on_desk_click(desk)
+                return
+
+
+def refresh_desk_maps() -> None:
+    """Update availability on all shown desk maps after bookings were changed."""
+    for desk_map in ACTIVE_DESK_MAPS:
+        desk_map.refresh_availability()
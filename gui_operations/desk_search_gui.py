@@ -0,0 +1,109 @@
+from typing import Callable
+from sqlalchemy.orm import Session
+from tkinter import Frame, Entry, Listbox, END
+
+from backend_operations.desk_search import DeskSearchIndex
+from backend_operations.dropdowns_backend import get_desk_search_entries
+
+
+# Number of visible result rows
+SEARCH_RESULT_ROWS = 6
+
+
+class DeskSearchBox:
+    """Type-ahead desk search, results are filtered in memory on every key press.
+
+    The index is built from a single query on first use, afterwards typing never touches the database.
+    """
+
+    def __init__(
+        self,
+        parent: Frame,
+        session_factory: Callable[[], Session],
+        on_select: Callable[[dict], None],
+        result_rows: int = SEARCH_RESULT_ROWS,
+    ):
+        self.session_factory = session_factory
+        self.on_select = on_select
+        self.index: DeskSearchIndex | None = None
+        self.results: list[dict] = []
+
+        self.frame = Frame(parent)
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        self.entry = Entry(self.frame, font=("Arial", 12))
+        self.entry.grid(row=0, column=0, sticky="we")
+
+        self.listbox = Listbox(self.frame, height=result_rows, font=("Arial", 10), activestyle="none")
+        self.listbox.grid(row=1, column=0, sticky="we")
+        self.listbox.grid_remove()
+
+        self.entry.bind("<KeyRelease>", self.on_key)
+        self.entry.bind("<Down>", lambda event: self.focus_results())
+        self.entry.bind("<Escape>", lambda event: self.clear())
+        self.listbox.bind("<<ListboxSelect>>", self.on_result_select)
+        self.listbox.bind("<Return>", self.on_result_select)
+
+    def grid(self, **kwargs) -> None:
+        """Place the search box with the grid geometry manager."""
+        self.frame.grid(**kwargs)
+
+    def get_index(self) -> DeskSearchIndex:
+        """Return the search index, building it on first use."""
+        if self.index is None:
+            desks = get_desk_search_entries(self.session_factory)
+            index = DeskSearchIndex(desks)
+            # An empty result usually means a failed query, try again on the next key press
+            if desks:
+                self.index = index
+            return index
+        return self.index
+
+    def on_key(self, event) -> None:
+        """Filter desks with the current text."""
+        if event.keysym in ("Down", "Escape", "Return"):
+            return
+
+        query = self.entry.get()
+        if not query.strip():
+            self.hide_results()
+            return
+
+        self.results = self.get_index().search(query)
+        self.listbox.delete(0, END)
+        self.listbox.insert(END, *[desk["desk_code"] for desk in self.results])
+        if self.results:
+            self.listbox.grid()
+        else:
+            self.listbox.grid_remove()
+
+    def focus_results(self) -> None:
+        """Move the keyboard focus to the first result."""
+        if self.results:
+            self.listbox.focus_set()
+            self.listbox.selection_clear(0, END)
+            self.listbox.selection_set(0)
+            self.listbox.activate(0)
+
+    def on_result_select(self, event) -> None:
+        """Pass the chosen desk to the select callback."""
+        selection = self.listbox.curselection()
+        if not selection:
+            return
+
+        desk = self.results[selection[0]]
+        self.entry.delete(0, END)
+        self.entry.insert(0, desk["desk_code"])
+        self.hide_results()
+        self.on_select(desk)
+
+    def hide_results(self) -> None:
+        """Hide the result list."""
+        self.results = []
+        self.listbox.delete(0, END)
+        self.listbox.grid_remove()
+
+    def clear(self) -> None:
+        """Clear the text and hide the result list."""
+        self.entry.delete(0, END)
+        self.hide_results()
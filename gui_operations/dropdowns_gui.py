@@ -1,14 +1,14 @@
 import logging
-from PIL import Image, ImageTk
-from typing import Callable, Any
+from typing import Callable, Any, Optional
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from tkinter import messagebox, Event, Button, Label
+from datetime import date, datetime
+from tkinter import messagebox, Event, Button
 from tkinter.ttk import Combobox
 
-from backend_operations.utils import resource_path
+from gui_operations.desk_map_gui import DeskMap
 from backend_operations.log_utils import log_event
 from backend_operations.user_login import get_current_user
+from backend_operations.slot_calendar import get_time_options, booking_range
 from backend_operations.dropdowns_backend import (
     get_available_offices,
     get_floors_in_office,
@@ -18,95 +18,63 @@ from backend_operations.dropdowns_backend import (
 )
 
 
+class TopologyCombobox(Combobox):
+    """Combobox listing offices, floors or sectors by name while keeping track of their IDs.
+
+    Names are only unique within their parent (every office can have a "1st floor"), so selections are passed on
+    to the backend by ID.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.options: list[tuple[int, str]] = []
+
+    def set_options(self, options: list[tuple[int, str]]) -> None:
+        """Replace the listed options with (id, name) tuples and clear the selection."""
+        self.options = options
+        self["values"] = [name for _, name in options]
+        self.set("")
+
+    def selected_id(self) -> Optional[int]:
+        """Return the ID of the selected option or None if nothing is selected."""
+        index = self.current()
+        return self.options[index][0] if 0 <= index < len(self.options) else None
+
+    def select_id(self, option_id: int) -> None:
+        """Select the option with the given ID."""
+        for index, (candidate_id, _) in enumerate(self.options):
+            if candidate_id == option_id:
+                self.current(index)
+                return
+        self.set("")
+
+
 def calculate_time_intervals(selected_date_str: str) -> tuple:
     """Calculate available time intervals for start and end time.
 
     :param selected_date_str: The selected booking date as a string (YYYY-MM-DD).
     :return: A tuple containing suggested start time, suggested end time, all start times, and all end times.
     """
-    # Current date and time
-    current_datetime = datetime.now()
-    current_date = current_datetime.date()
-
-    # Suggested start and end hours
-    start_hour_sugg = datetime.combine(current_date, datetime.min.time()).replace(hour=8, minute=0, second=0)
-    end_hour_sugg = datetime.combine(current_date, datetime.min.time()).replace(hour=16, minute=0, second=0)
-
-    selected_date = datetime.strptime(selected_date_str, "%Y-%m-%d").date()
-
-    # Ensure the selected date is valid
-    if selected_date < current_date:
-        raise ValueError("Booking cannot be made for past dates.")
-
-    suggested_start_time = None
-    suggested_end_time = None
-    all_start_times = []
-    all_end_times = []
-
-    # **Generate all valid start and end times for the entire day**
-    # This now generates times for both current and future dates
-    start_time_to_add = datetime.combine(selected_date, datetime.min.time()).replace(hour=0, minute=15)
-    while start_time_to_add <= datetime.combine(selected_date, datetime.max.time()).replace(hour=23, minute=30):
-        all_start_times.append(start_time_to_add.strftime("%H:%M"))
-        start_time_to_add += timedelta(minutes=15)
-
-    end_time_to_add = datetime.combine(selected_date, datetime.min.time()).replace(hour=0, minute=30)
-    while end_time_to_add <= datetime.combine(selected_date, datetime.max.time()).replace(hour=23, minute=45):
-        all_end_times.append(end_time_to_add.strftime("%H:%M"))
-        end_time_to_add += timedelta(minutes=15)
-
-    # **Logic for current date**
-    if selected_date == current_date:
-        current_minute = current_datetime.minute
-        current_hour = current_datetime.hour
-
-        # Round the current time to the next valid 15-minute interval
-        rounded_minute = ((current_minute // 15) + 1) * 15
-        if rounded_minute >= 60:
-            current_hour += 1
-            rounded_minute = 0
-
-        earliest_start_time = current_datetime.replace(
-            hour=current_hour, minute=rounded_minute, second=0, microsecond=0
-        )
+    return get_time_options(date.fromisoformat(selected_date_str), datetime.now())
 
-        # **Filter start times for the current date**
-        # This ensures start times begin from the current time onwards
-        all_start_times = [
-            time_str
-            for time_str in all_start_times
-            if datetime.combine(selected_date, datetime.strptime(time_str, "%H:%M").time()) >= earliest_start_time
-        ]
-
-        # **Filter end times**
-        # This ensures end times are only after the filtered start times
-        all_end_times = [
-            time_str
-            for time_str in all_end_times
-            if datetime.combine(selected_date, datetime.strptime(time_str, "%H:%M").time()) > earliest_start_time
-        ]
-
-        # Suggested start and end times for the current date
-        if current_datetime < start_hour_sugg:
-            suggested_start_time = start_hour_sugg.strftime("%H:%M")
-            suggested_end_time = end_hour_sugg.strftime("%H:%M")
-        elif end_hour_sugg - timedelta(minutes=15) > current_datetime >= start_hour_sugg:
-            suggested_start_time = earliest_start_time.strftime("%H:%M")
-            suggested_end_time = end_hour_sugg.strftime("%H:%M")
-        else:
-            suggested_start_time = earliest_start_time.strftime("%H:%M")
-            suggested_end_time = (earliest_start_time + timedelta(minutes=15)).strftime("%H:%M")
 
-    # **Logic for future dates**
-    else:
-        suggested_start_time = start_hour_sugg.strftime("%H:%M")
-        suggested_end_time = end_hour_sugg.strftime("%H:%M")
+def get_selected_time_range(
+    date_dropdown: Combobox, start_time_dropdown: Combobox, end_time_dropdown: Combobox
+) -> tuple[datetime, datetime] | None:
+    """Return the selected booking time range or None if it is incomplete or invalid.
 
-    return suggested_start_time, suggested_end_time, all_start_times, all_end_times
+    :param date_dropdown: The dropdown widget for booking date.
+    :param start_time_dropdown: The dropdown widget for start time.
+    :param end_time_dropdown: The dropdown widget for end time.
+    """
+    try:
+        return booking_range(date_dropdown.get(), start_time_dropdown.get(), end_time_dropdown.get())
+    except ValueError:
+        return None
 
 
-def populate_office_dropdown(session_factory: Callable[[], Session]) -> list[str]:
-    """Populate the office dropdown with available offices.
+def populate_office_dropdown(session_factory: Callable[[], Session]) -> list[tuple[int, str]]:
+    """Fetch (office_id, office_name) options for the office dropdown.
 
     :param session_factory: A callable that returns a SQLAlchemy session.
     """
@@ -121,9 +89,9 @@ def populate_office_dropdown(session_factory: Callable[[], Session]) -> list[str
 def on_office_select(
     event: Event,
     shared_session: Callable[[], Session],
-    office_dropdown: Combobox,
-    floor_dropdown: Combobox,
-    sector_dropdown: Combobox,
+    office_dropdown: TopologyCombobox,
+    floor_dropdown: TopologyCombobox,
+    sector_dropdown: TopologyCombobox,
     desk_dropdown: Combobox,
     book_desk_button: Button,
 ) -> None:
@@ -141,20 +109,17 @@ def on_office_select(
         messagebox.showerror("Error", "Application is not properly initialized. Please restart.")
         return
     try:
-        selected_office = office_dropdown.get()
-        available_floors = get_floors_in_office(shared_session, selected_office)
+        available_floors = get_floors_in_office(shared_session, office_dropdown.selected_id())
         if not available_floors:
             messagebox.showerror("Error", "Unable to load floors. Please try again later.")
             return
 
         # Populate the floor dropdown
-        floor_dropdown.set("")
-        floor_dropdown["values"] = available_floors
+        floor_dropdown.set_options(available_floors)
         floor_dropdown.config(state="readonly")
 
         # Clear and disable the sector dropdown
-        sector_dropdown.set("")
-        sector_dropdown["values"] = []
+        sector_dropdown.set_options([])
         sector_dropdown.config(state="disabled")
 
         # Reset the desk dropdown
@@ -173,12 +138,12 @@ def on_office_select(
 def on_floor_select(
     event: Any,
     shared_session: Callable[[], Session],
-    office_dropdown: Combobox,
-    floor_dropdown: Combobox,
-    sector_dropdown: Combobox,
+    office_dropdown: TopologyCombobox,
+    floor_dropdown: TopologyCombobox,
+    sector_dropdown: TopologyCombobox,
     desk_dropdown: Combobox,
     book_desk_button: Button,
-    image_label: Label,
+    desk_map: DeskMap,
 ) -> None:
     """Populate the sector dropdown based on the selected floor.
 
@@ -188,7 +153,7 @@ def on_floor_select(
     :param sector_dropdown: The dropdown widget for sectors.
     :param desk_dropdown: The dropdown widget for desks.
     :param book_desk_button: The button for booking desks.
-    :param image_label: The label for displaying the office layout image.
+    :param desk_map: The map displaying desks of the selected floor.
     """
     if shared_session is None:
         logging.error("Attempted to use shared_session before initialization.")
@@ -197,29 +162,14 @@ def on_floor_select(
     try:
         selected_office = office_dropdown.get()
         selected_floor = floor_dropdown.get()
+        office_id = office_dropdown.selected_id()
+        floor_id = floor_dropdown.selected_id()
 
-        # Update the office layout image
-        floor_template_path = resource_path(f"office_layouts/{selected_office}_{selected_floor}.png")
-        try:
-            floor_template = Image.open(floor_template_path)
-            floor_template = floor_template.resize((600, 400), Image.Resampling.LANCZOS)
-            floor_template_tk = ImageTk.PhotoImage(floor_template)
-            image_label.config(image=floor_template_tk)  # type: ignore
-            image_label.image = floor_template_tk  # type: ignore
-        except FileNotFoundError:
-            logging.error(f"Image for office: '{selected_office}', floor: '{selected_floor}' not found.")
-            log_event(
-                get_current_user(),
-                "FAILURE",
-                "Desk selection",
-                f"No office layout found for office: '{selected_office}' and floor: '{selected_floor}'",
-            )
-            messagebox.showerror(
-                "Error", f"No office layout found for office: '{selected_office}' and floor: '{selected_floor}'."
-            )
+        # Draw the floor map with desk availability
+        desk_map.show_floor(office_id, floor_id, selected_office, selected_floor)
 
         # Populate the sector dropdown
-        available_sectors = get_sectors_on_floor(shared_session, selected_floor)
+        available_sectors = get_sectors_on_floor(shared_session, floor_id)
         if not available_sectors:
             logging.error(f"No sectors found for floor '{selected_floor}'.")
             log_event(
@@ -233,12 +183,11 @@ def on_floor_select(
             )
 
         else:
-            sector_dropdown.set("")
-            sector_dropdown["values"] = available_sectors
+            sector_dropdown.set_options(available_sectors)
             sector_dropdown.config(state="readonly")
 
         # Populate the desks dropdown (without a sector initially)
-        available_desks = get_desks_on_floor(shared_session, selected_floor, None)
+        available_desks = get_desks_on_floor(shared_session, office_id, floor_id, None)
         if not available_desks:
             logging.error(f"No desks found for floor '{selected_floor}'.")
             log_event(
@@ -263,8 +212,7 @@ def on_floor_select(
 
         # Bind sector selection to update the desks dropdown
         def on_sector_select(event):
-            selected_sector = sector_dropdown.get()
-            updated_desks = get_desks_on_floor(shared_session, selected_floor, selected_sector)
+            updated_desks = get_desks_on_floor(shared_session, office_id, floor_id, sector_dropdown.selected_id())
             desk_dropdown.set("")
             desk_dropdown["values"] = updated_desks
             desk_dropdown.config(state="readonly")
@@ -285,9 +233,9 @@ def on_floor_select(
 
 def reset_sector_selection(
     shared_session: Callable[[], Session],
-    office_dropdown: Combobox,
-    floor_dropdown: Combobox,
-    sector_dropdown: Combobox,
+    office_dropdown: TopologyCombobox,
+    floor_dropdown: TopologyCombobox,
+    sector_dropdown: TopologyCombobox,
     desk_dropdown: Combobox,
     book_desk_button: Button,
 ) -> None:
@@ -316,7 +264,9 @@ def reset_sector_selection(
         sector_dropdown.config(state="disabled")
 
         # Fetch and populate all desks for the selected floor
-        available_desks = get_desks_on_floor(shared_session, selected_floor, None)
+        available_desks = get_desks_on_floor(
+            shared_session, office_dropdown.selected_id(), floor_dropdown.selected_id(), None
+        )
         if not available_desks:
             desk_dropdown.set("")
             desk_dropdown["values"] = []
@@ -351,7 +301,7 @@ def reset_sector_selection(
 def update_book_desk_button_text(
     event: Event,
     shared_session: Callable[[], Session],
-    sector_dropdown: Combobox,
+    sector_dropdown: TopologyCombobox,
     desk_dropdown: Combobox,
     book_desk_button: Button,
 ) -> None:
@@ -382,7 +332,7 @@ def update_book_desk_button_text(
 
 
 def populate_sector_dropdown_with_desk_sector(
-    shared_session: Callable[[], Session], sector_dropdown: Combobox, selected_desk: str
+    shared_session: Callable[[], Session], sector_dropdown: TopologyCombobox, selected_desk: str
 ) -> None:
     """Populate the sector dropdown based on the selected desk.
 
@@ -390,13 +340,76 @@ def populate_sector_dropdown_with_desk_sector(
     :param sector_dropdown: The dropdown widget for sectors.
     :param selected_desk: The selected desk code.
     """
-    sector_name = get_desk_sector(shared_session, selected_desk)
-    if not sector_name:
+    desk_sector = get_desk_sector(shared_session, selected_desk)
+    if not desk_sector:
         logging.error(f"No sector found for desk '{selected_desk}'.")
         log_event(get_current_user(), "FAILURE", "Desk selection", f"No sector found for desk: '{selected_desk}'")
         messagebox.showerror("Error", f"No sector found for desk: '{selected_desk}'.")
         sector_dropdown.set("")
         sector_dropdown.config(state="disabled")
     else:
-        sector_dropdown.set(sector_name)
+        sector_dropdown.select_id(desk_sector[0])
         sector_dropdown.config(state="readonly")
+
+
+def on_desk_map_click(
+    desk: dict,
+    sector_dropdown: TopologyCombobox,
+    desk_dropdown: Combobox,
+    book_desk_button: Button,
+) -> None:
+    """Select the desk clicked on the floor map, the map already knows its sector so no queries are needed.
+
+    :param desk: The clicked desk with its code and sector ID.
+    :param sector_dropdown: The dropdown widget for sectors.
+    :param desk_dropdown: The dropdown widget for desks.
+    :param book_desk_button: The button for booking desks.
+    """
+    sector_dropdown.select_id(desk["sector_id"])
+    sector_dropdown.config(state="readonly")
+    desk_dropdown.set(desk["desk_code"])
+    desk_dropdown.config(state="readonly")
+
+    book_desk_button.config(text=f"Book desk {desk['desk_code']}", state="normal")
+    book_desk_button.grid()
+
+
+def on_desk_search_select(
+    desk: dict,
+    shared_session: Callable[[], Session],
+    office_dropdown: TopologyCombobox,
+    floor_dropdown: TopologyCombobox,
+    sector_dropdown: TopologyCombobox,
+    desk_dropdown: Combobox,
+    book_desk_button: Button,
+    desk_map: DeskMap,
+) -> None:
+    """Select a desk found by the desk search, the dropdowns and the floor map follow as if chosen by hand.
+
+    :param desk: The found desk with its code, office, floor and sector IDs.
+    :param shared_session: The database session for querying.
+    :param office_dropdown: The dropdown widget for offices.
+    :param floor_dropdown: The dropdown widget for floors.
+    :param sector_dropdown: The dropdown widget for sectors.
+    :param desk_dropdown: The dropdown widget for desks.
+    :param book_desk_button: The button for booking desks.
+    :param desk_map: The map displaying desks of the selected floor.
+    """
+    office_dropdown.select_id(desk["office_id"])
+    on_office_select(
+        None, shared_session, office_dropdown, floor_dropdown, sector_dropdown, desk_dropdown, book_desk_button
+    )
+    floor_dropdown.select_id(desk["floor_id"])
+    on_floor_select(
+        None,
+        shared_session,
+        office_dropdown,
+        floor_dropdown,
+        sector_dropdown,
+        desk_dropdown,
+        book_desk_button,
+        desk_map,
+    )
+
+    on_desk_map_click(desk, sector_dropdown, desk_dropdown, book_desk_button)
+    desk_map.select_desk(desk["desk_code"])
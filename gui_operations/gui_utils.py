@@ -3,9 +3,15 @@ from sqlalchemy.orm import Session
 from screeninfo import get_monitors
 from tkinter import Tk, Frame, Label, Button
 
+from db.local_cache import track_user_bookings, is_server_online
+from backend_operations.user_login import get_current_user
 from gui_operations.bookings_gui import initialize_booking_info
 
 
+# How often the connection indicator is updated
+CONNECTION_STATUS_POLL_MS = 2000
+
+
 def show_frame(frame: Frame, all_frames: list[Frame]):
     """Show a frame and hide all other frames.
 
@@ -40,6 +46,8 @@ def on_login_success(
     :param all_frames: A list of all frames
     """
     show_frame(desk_selecton_frame, all_frames)
+    # Keep upcoming bookings of the user in the local cache for offline use
+    track_user_bookings(get_current_user())
     initialize_booking_info(
         session_factory,
         booking_details_label,
@@ -51,6 +59,19 @@ def on_login_success(
     )
 
 
+def update_connection_status(status_label: Label):
+    """Show whether the server is reachable and reschedule the check.
+
+    :param status_label: The label showing the connection status
+    """
+    if is_server_online():
+        status_label.config(text="Online", fg="#2e7d32")
+    else:
+        status_label.config(text="Offline - showing cached data, cancellations are queued", fg="#c62828")
+
+    status_label.after(CONNECTION_STATUS_POLL_MS, lambda: update_connection_status(status_label))
+
+
 def center_window(window: Tk):
     """Center the window on the screen.
 
@@ -0,0 +1,166 @@
+import queue
+import logging
+import tkinter as tk
+from typing import Optional
+from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from backend_operations.kiosk_backend import (
+    FloorCheckInState,
+    KioskBooking,
+    load_floor_check_in_state,
+    check_in_kiosk_booking,
+)
+
+
+# Check-ins running at once, stays below the connection pool size so the state reload always gets a connection
+KIOSK_CHECK_IN_WORKERS = 8
+# New and canceled bookings of the floor are picked up periodically
+KIOSK_REFRESH_INTERVAL_MS = 60000
+# Results of the worker threads are handed to the Tk thread through a queue
+KIOSK_POLL_INTERVAL_MS = 50
+# Time a check-in result stays on the screen
+KIOSK_MESSAGE_MS = 5000
+
+MESSAGE_COLORS = {"info": "#333333", "success": "#2e7d32", "error": "#c62828"}
+
+
+class KioskWindow:
+    """Check-in screen at a floor entrance.
+
+    Today's pending bookings of the floor are held in memory, so a typed email or desk code is resolved without
+    a database round trip. Check-ins run in a pool of worker threads and the screen is ready for the next person
+    right away, a burst of arrivals is checked in in parallel instead of one after another.
+    """
+
+    def __init__(self, root: tk.Tk, office_id: int, floor_id: int):
+        self.root = root
+        self.office_id = office_id
+        self.floor_id = floor_id
+        self.state: Optional[FloorCheckInState] = None
+        self.executor = ThreadPoolExecutor(max_workers=KIOSK_CHECK_IN_WORKERS, thread_name_prefix="kiosk")
+        self.results: queue.Queue = queue.Queue()
+        self.clear_job: Optional[str] = None
+        self.refresh_job: Optional[str] = None
+
+        self.root.title("Desk check-in")
+        self.root.attributes("-fullscreen", True)
+        self.root.grid_columnconfigure(0, weight=1)
+        self.root.grid_rowconfigure(0, weight=1)
+        self.root.grid_rowconfigure(5, weight=1)
+
+        self.title_label = tk.Label(self.root, text="Loading today's bookings...", font=("Arial", 32, "bold"))
+        self.title_label.grid(row=1, column=0, pady=(0, 30))
+
+        instructions_label = tk.Label(self.root, text="Enter your email or desk code:", font=("Arial", 20))
+        instructions_label.grid(row=2, column=0, pady=10)
+
+        self.entry = tk.Entry(self.root, font=("Arial", 24), width=40, justify="center")
+        self.entry.grid(row=3, column=0, pady=10)
+        self.entry.bind("<Return>", lambda event: self.check_in())
+        self.entry.focus_set()
+
+        self.message_label = tk.Label(self.root, text="", font=("Arial", 22), wraplength=900)
+        self.message_label.grid(row=4, column=0, pady=30)
+
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh()
+        self.root.after(KIOSK_POLL_INTERVAL_MS, self.poll_results)
+
+    def refresh(self) -> None:
+        """Reload the floor's bookings in the background, also switches to the next day after midnight."""
+        future = self.executor.submit(load_floor_check_in_state, self.office_id, self.floor_id, date.today())
+        future.add_done_callback(lambda done: self.results.put(("state", None, done)))
+        self.refresh_job = self.root.after(KIOSK_REFRESH_INTERVAL_MS, self.refresh)
+
+    def check_in(self) -> None:
+        """Resolve the typed user or desk in memory and start the check-in."""
+        user_or_desk = self.entry.get()
+        self.entry.delete(0, tk.END)
+        if not user_or_desk.strip():
+            return
+        if self.state is None:
+            self.show_message("Bookings are still loading, please try again in a moment.", "error")
+            return
+
+        booking = self.state.find(user_or_desk, datetime.now())
+        if booking is None:
+            self.show_message(f"No booking of '{user_or_desk.strip()}' can be checked in right now.", "error")
+            return
+
+        # Marked right away, a second tap of the same person does not start another check-in
+        self.state.checked_in_ids.add(booking.booking_id)
+        self.show_message(f"Checking in desk {booking.desk_code}...", "info")
+        future = self.executor.submit(check_in_kiosk_booking, booking, self.floor_id)
+        future.add_done_callback(lambda done: self.results.put(("check-in", booking, done)))
+
+    def poll_results(self) -> None:
+        """Apply results of finished worker tasks, Tk widgets are only touched from the Tk thread."""
+        while True:
+            try:
+                kind, booking, future = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "state":
+                self.on_state_loaded(future)
+            else:
+                self.on_checked_in(booking, future)
+        self.root.after(KIOSK_POLL_INTERVAL_MS, self.poll_results)
+
+    def on_state_loaded(self, future: Future) -> None:
+        """Replace the in-memory bookings, keeping check-ins the reload may not have seen yet."""
+        try:
+            state = future.result()
+        except Exception as exc:
+            logging.error(f"Failed to load bookings for the kiosk: {exc}")
+            if self.state is None:
+                self.show_message("Bookings could not be loaded, retrying in a minute.", "error")
+            return
+
+        if self.state is not None and self.state.day == state.day:
+            state.checked_in_ids |= self.state.checked_in_ids
+        self.state = state
+        self.title_label.config(text=f"Check in - {state.office_name}, {state.floor_name}")
+        logging.info(f"Kiosk loaded {len(state)} pending bookings of {state.day}.")
+
+    def on_checked_in(self, booking: KioskBooking, future: Future) -> None:
+        """Show the outcome of a check-in."""
+        try:
+            checked_in = future.result()
+        except Exception:
+            # Released again, the person can retry
+            if self.state is not None:
+                self.state.checked_in_ids.discard(booking.booking_id)
+            self.show_message(f"Check-in of desk {booking.desk_code} failed, please try again.", "error")
+            return
+
+        if checked_in:
+            self.show_message(f"Welcome {booking.user_name}, desk {booking.desk_code} is checked in.", "success")
+        else:
+            self.show_message(f"The booking of desk {booking.desk_code} is no longer pending.", "error")
+
+    def show_message(self, text: str, kind: str) -> None:
+        """Show a message for a few seconds."""
+        if self.clear_job:
+            self.root.after_cancel(self.clear_job)
+        self.message_label.config(text=text, fg=MESSAGE_COLORS[kind])
+        self.clear_job = self.root.after(KIOSK_MESSAGE_MS, lambda: self.message_label.config(text=""))
+
+    def close(self) -> None:
+        """Stop the background work and close the kiosk."""
+        if self.refresh_job:
+            self.root.after_cancel(self.refresh_job)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
+
+def start_kiosk_app(office_id: int, floor_id: int) -> None:
+    """
+    Run the check-in kiosk of a floor, no user logs in at the kiosk.
+
+    :param office_id: ID of the office
+    :param floor_id: ID of the floor
+    """
+    root = tk.Tk()
+    KioskWindow(root, office_id, floor_id)
+    root.mainloop()
@@ -0,0 +1,222 @@
+from typing import Callable, Optional
+from sqlalchemy.orm import Session
+from datetime import datetime
+from tkinter import Toplevel, Frame, Button, Label, Misc, StringVar, messagebox
+from tkinter.ttk import Treeview, Radiobutton, Scrollbar
+
+from backend_operations.bookings_backend import get_user_bookings_page, cancel_bookings
+from backend_operations.waitlist_backend import get_user_waitlist, leave_waitlist
+
+
+# Number of bookings shown on one page
+MY_BOOKINGS_PAGE_SIZE = 20
+CANCELABLE_STATUSES = ("Pending", "Active")
+
+
+class MyBookingsWindow:
+    """Window listing the user's upcoming or past bookings page by page, selected bookings can be canceled at once.
+
+    Pages are fetched with keyset pagination, so moving through thousands of past bookings costs the same as
+    showing the first page. Previous pages are reached through the stack of page start keys.
+    The waitlist mode shows the desks and sectors the user waits for, a user has only a few entries on one page.
+    """
+
+    def __init__(
+        self,
+        parent: Misc,
+        session_factory: Callable[[], Session],
+        on_bookings_changed: Callable[[], None],
+        page_size: int = MY_BOOKINGS_PAGE_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.on_bookings_changed = on_bookings_changed
+        self.page_size = page_size
+
+        # Start key of every page up to the shown one, None starts the first page
+        self.page_starts: list[Optional[tuple[datetime, int]]] = [None]
+        self.bookings: dict[str, dict] = {}
+        self.has_next_page = False
+
+        self.window = Toplevel(parent)
+        self.window.title("My bookings")
+        self.window.geometry("640x520")
+        self.window.grid_rowconfigure(1, weight=1)
+        self.window.grid_columnconfigure(0, weight=1)
+
+        self.mode = StringVar(value="upcoming")
+        mode_frame = Frame(self.window)
+        mode_frame.grid(row=0, column=0, columnspan=2, padx=10, pady=(10, 5), sticky="w")
+        for column, (mode, text) in enumerate((("upcoming", "Upcoming"), ("past", "Past"), ("waitlist", "Waitlist"))):
+            Radiobutton(mode_frame, text=text, value=mode, variable=self.mode, command=self.show_first_page).grid(
+                row=0, column=column, padx=(0, 15)
+            )
+
+        self.table = Treeview(self.window, columns=("desk", "start", "end", "status"), show="headings")
+        for column, heading, width in (
+            ("desk", "Desk", 240),
+            ("start", "Start", 130),
+            ("end", "End", 130),
+            ("status", "Status", 90),
+        ):
+            self.table.heading(column, text=heading)
+            self.table.column(column, width=width, anchor="w")
+        self.table.grid(row=1, column=0, padx=(10, 0), sticky="nsew")
+        self.table.bind("<<TreeviewSelect>>", lambda event: self.update_buttons())
+
+        y_scrollbar = Scrollbar(self.window, orient="vertical", command=self.table.yview)
+        y_scrollbar.grid(row=1, column=1, padx=(0, 10), sticky="ns")
+        self.table.configure(yscrollcommand=y_scrollbar.set)
+
+        buttons_frame = Frame(self.window)
+        buttons_frame.grid(row=2, column=0, columnspan=2, padx=10, pady=10, sticky="we")
+        buttons_frame.grid_columnconfigure(2, weight=1)
+
+        self.previous_button = Button(buttons_frame, text="< Previous", command=self.show_previous_page)
+        self.previous_button.grid(row=0, column=0, padx=(0, 5))
+        self.next_button = Button(buttons_frame, text="Next >", command=self.show_next_page)
+        self.next_button.grid(row=0, column=1)
+        self.page_label = Label(buttons_frame, anchor="w")
+        self.page_label.grid(row=0, column=2, padx=10, sticky="we")
+        self.cancel_button = Button(buttons_frame, text="Cancel selected", command=self.cancel_selected)
+        self.cancel_button.grid(row=0, column=3)
+
+        self.show_first_page()
+
+    def load_page(self) -> None:
+        """Fetch the page starting at the last key of the stack and show it."""
+        if self.mode.get() == "waitlist":
+            self.load_waitlist()
+            return
+
+        page = get_user_bookings_page(
+            self.session_factory, self.mode.get() == "upcoming", self.page_starts[-1], self.page_size
+        )
+        if page is None:
+            messagebox.showerror("Error", "Failed to load your bookings. Please try again later.", parent=self.window)
+            return
+
+        bookings, self.has_next_page = page
+        self.table.delete(*self.table.get_children())
+        self.bookings.clear()
+        for booking in bookings:
+            item = self.table.insert(
+                "",
+                "end",
+                values=(
+                    booking["desk_code"],
+                    f"{booking['start_date']:%Y-%m-%d %H:%M}",
+                    f"{booking['end_date']:%Y-%m-%d %H:%M}",
+                    booking["status"],
+                ),
+            )
+            self.bookings[item] = booking
+
+        self.page_label.config(text=f"Page {len(self.page_starts)}")
+        self.update_buttons()
+
+    def load_waitlist(self) -> None:
+        """Fetch the user's waitlist entries and show them as waiting bookings."""
+        entries = get_user_waitlist(self.session_factory)
+        if entries is None:
+            messagebox.showerror("Error", "Failed to load your waitlist. Please try again later.", parent=self.window)
+            return
+
+        self.has_next_page = False
+        self.table.delete(*self.table.get_children())
+        self.bookings.clear()
+        for entry in entries:
+            item = self.table.insert(
+                "",
+                "end",
+                values=(
+                    entry["target"],
+                    f"{entry['start_date']:%Y-%m-%d %H:%M}",
+                    f"{entry['end_date']:%Y-%m-%d %H:%M}",
+                    "Waiting",
+                ),
+            )
+            self.bookings[item] = {**entry, "status": "Waiting"}
+
+        self.page_label.config(text=f"{len(entries)} waiting")
+        self.update_buttons()
+
+    def update_buttons(self) -> None:
+        """Enable navigation and cancel buttons according to the shown page and selection."""
+        self.previous_button.config(state="normal" if len(self.page_starts) > 1 else "disabled")
+        self.next_button.config(state="normal" if self.has_next_page else "disabled")
+        self.cancel_button.config(state="normal" if self.selected_cancelable_ids() else "disabled")
+
+    def selected_cancelable_ids(self) -> list[int]:
+        """Return IDs of the selected bookings which can still be canceled, or of the selected waitlist entries."""
+        if self.mode.get() == "waitlist":
+            return [self.bookings[item]["waitlist_id"] for item in self.table.selection()]
+        return [
+            self.bookings[item]["booking_id"]
+            for item in self.table.selection()
+            if self.bookings[item]["status"] in CANCELABLE_STATUSES
+        ]
+
+    def show_first_page(self) -> None:
+        """Show the first page of the selected mode."""
+        self.page_starts = [None]
+        self.load_page()
+
+    def show_next_page(self) -> None:
+        """Show the page following the last shown booking."""
+        if not self.has_next_page or not self.bookings:
+            return
+        last_booking = list(self.bookings.values())[-1]
+        self.page_starts.append((last_booking["start_date"], last_booking["booking_id"]))
+        self.load_page()
+
+    def show_previous_page(self) -> None:
+        """Show the page before the shown one."""
+        if len(self.page_starts) > 1:
+            self.page_starts.pop()
+            self.load_page()
+
+    def cancel_selected(self) -> None:
+        """Cancel all selected pending and active bookings with a single statement."""
+        booking_ids = self.selected_cancelable_ids()
+        if not booking_ids:
+            return
+        if self.mode.get() == "waitlist":
+            self.leave_selected(booking_ids)
+            return
+        if not messagebox.askyesno(
+            "Cancel bookings", f"Cancel {len(booking_ids)} selected booking(s)?", parent=self.window
+        ):
+            return
+
+        canceled_count = cancel_bookings(self.session_factory, booking_ids)
+        if canceled_count is None:
+            messagebox.showerror("Error", "Failed to cancel bookings. Please try again.", parent=self.window)
+            return
+
+        messagebox.showinfo("Success", f"{canceled_count} booking(s) canceled.", parent=self.window)
+        self.load_page()
+        self.on_bookings_changed()
+
+    def leave_selected(self, waitlist_ids: list[int]) -> None:
+        """Remove the selected waitlist entries."""
+        if not messagebox.askyesno(
+            "Leave waitlist", f"Leave the waitlist for {len(waitlist_ids)} selected entries?", parent=self.window
+        ):
+            return
+
+        if leave_waitlist(self.session_factory, waitlist_ids) is None:
+            messagebox.showerror("Error", "Failed to leave the waitlist. Please try again.", parent=self.window)
+            return
+        self.load_page()
+
+
+def open_my_bookings(
+    parent: Misc, session_factory: Callable[[], Session], on_bookings_changed: Callable[[], None]
+) -> MyBookingsWindow:
+    """Open the window with the user's bookings.
+
+    :param parent: The parent widget
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :param on_bookings_changed: Called after bookings were canceled, refreshes the rest of the UI
+    """
+    return MyBookingsWindow(parent, session_factory, on_bookings_changed)
@@ -0,0 +1,266 @@
+import logging
+from typing import Callable, Optional
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from tkinter import Toplevel, Canvas, Scrollbar, Label, Misc, messagebox
+
+from backend_operations.user_login import get_current_user
+from backend_operations.bookings_backend import get_floor_week_occupancy, NOT_MODIFIED
+from backend_operations.slot_calendar import SLOT_MINUTES, SLOTS_PER_DAY, slots_between
+
+
+SLOT_WIDTH = 6
+ROW_HEIGHT = 24
+HEADER_HEIGHT = 40
+DESK_LABEL_WIDTH = 190
+# Number of canvas items created per idle callback while rendering
+RENDER_BATCH_SIZE = 200
+# Bookings of other users are picked up periodically
+REFRESH_INTERVAL_MS = 60000
+
+STATUS_COLORS = {"Pending": "#f0ad4e", "Active": "#d9534f", "Completed": "#9e9e9e"}
+
+# Grids currently open, refreshed after the user changes bookings
+OPEN_GRIDS: list["OccupancyGrid"] = []
+
+
+class OccupancyGrid:
+    """Window showing desks of a floor against 15-minute slots of the bookable week.
+
+    Bookings are drawn as one canvas item per booking, refreshes only touch items of changed bookings.
+    """
+
+    def __init__(
+        self,
+        parent: Misc,
+        session_factory: Callable[[], Session],
+        office_id: int,
+        floor_id: int,
+        office_name: str,
+        floor_name: str,
+        days: int = 7,
+    ):
+        self.session_factory = session_factory
+        self.office_id = office_id
+        self.floor_id = floor_id
+        self.office_name = office_name
+        self.floor_name = floor_name
+        self.days = days
+        # Set on every refresh, the displayed week moves forward at midnight
+        self.week_start: datetime | None = None
+
+        self.desk_rows: dict[str, int] = {}
+        # booking_id -> (rectangle item, text item, booking)
+        self.booking_items: dict[int, tuple[int, int, dict]] = {}
+        self.render_job: str | None = None
+        self.refresh_job: str | None = None
+        # Change version of the drawn week, unchanged weeks are not fetched again
+        self.version: int | None = None
+
+        self.window = Toplevel(parent)
+        self.window.title(f"{office_name} {floor_name} - week occupancy")
+        self.window.geometry("1000x500")
+        self.window.grid_rowconfigure(0, weight=1)
+        self.window.grid_columnconfigure(0, weight=1)
+
+        self.canvas = Canvas(self.window, bg="white")
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+
+        x_scrollbar = Scrollbar(self.window, orient="horizontal", command=self.canvas.xview)
+        x_scrollbar.grid(row=1, column=0, sticky="we")
+        y_scrollbar = Scrollbar(self.window, orient="vertical", command=self.canvas.yview)
+        y_scrollbar.grid(row=0, column=1, sticky="ns")
+        self.canvas.configure(xscrollcommand=x_scrollbar.set, yscrollcommand=y_scrollbar.set)
+
+        self.details_label = Label(self.window, text="Hover over a booking to see details", anchor="w")
+        self.details_label.grid(row=2, column=0, columnspan=2, sticky="we", padx=10, pady=5)
+
+        self.canvas.tag_bind("booking", "<Enter>", self.on_booking_hover)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        OPEN_GRIDS.append(self)
+        self.refresh()
+
+    def slot_x(self, moment: datetime) -> int:
+        """Return the x coordinate of a moment, clamped to the displayed week."""
+        slot = slots_between(self.week_start, moment)
+        slot = max(0, min(slot, self.days * SLOTS_PER_DAY))
+        return DESK_LABEL_WIDTH + slot * SLOT_WIDTH
+
+    def booking_coords(self, booking: dict) -> tuple[int, int, int, int]:
+        """Return the rectangle coordinates of a booking."""
+        row_y = HEADER_HEIGHT + self.desk_rows[booking["desk_code"]] * ROW_HEIGHT
+        return (
+            self.slot_x(booking["start_date"]),
+            row_y + 3,
+            self.slot_x(booking["end_date"]),
+            row_y + ROW_HEIGHT - 3,
+        )
+
+    def draw_background(self, desk_codes: list[str]) -> None:
+        """Draw desk labels, day headers and hour lines, done once per desk layout."""
+        self.canvas.delete("all")
+        self.booking_items.clear()
+        self.desk_rows = {desk_code: row for row, desk_code in enumerate(desk_codes)}
+
+        grid_width = DESK_LABEL_WIDTH + self.days * SLOTS_PER_DAY * SLOT_WIDTH
+        grid_height = HEADER_HEIGHT + len(desk_codes) * ROW_HEIGHT
+        self.canvas.configure(scrollregion=(0, 0, grid_width, grid_height))
+
+        for day in range(self.days):
+            day_x = DESK_LABEL_WIDTH + day * SLOTS_PER_DAY * SLOT_WIDTH
+            day_label = (self.week_start + timedelta(days=day)).strftime("%a %Y-%m-%d")
+            self.canvas.create_text(day_x + 5, 12, text=day_label, anchor="w", font=("Arial", 10, "bold"))
+            for hour in range(24):
+                hour_x = day_x + hour * (60 // SLOT_MINUTES) * SLOT_WIDTH
+                self.canvas.create_line(hour_x, 25, hour_x, grid_height, fill="#444444" if hour == 0 else "#e0e0e0")
+                if hour % 3 == 0:
+                    self.canvas.create_text(hour_x + 2, 32, text=f"{hour:02d}", anchor="w", font=("Arial", 8))
+
+        for desk_code, row in self.desk_rows.items():
+            row_y = HEADER_HEIGHT + row * ROW_HEIGHT
+            self.canvas.create_line(0, row_y, grid_width, row_y, fill="#e0e0e0")
+            self.canvas.create_text(5, row_y + ROW_HEIGHT // 2, text=desk_code, anchor="w", font=("Arial", 9))
+
+    def draw_booking(self, booking: dict) -> None:
+        """Create canvas items for a booking."""
+        x1, y1, x2, y2 = self.booking_coords(booking)
+        is_own = booking["user_name"] == get_current_user()
+        rectangle = self.canvas.create_rectangle(
+            x1,
+            y1,
+            x2,
+            y2,
+            fill=STATUS_COLORS.get(booking["status"], "#9e9e9e"),
+            outline="#1f4e79" if is_own else "",
+            width=2 if is_own else 1,
+            tags=("booking", f"booking_{booking['booking_id']}"),
+        )
+        text = self.canvas.create_text(
+            x1 + 3,
+            (y1 + y2) // 2,
+            text=booking["user_name"].split("@")[0] if x2 - x1 > 60 else "",
+            anchor="w",
+            font=("Arial", 8),
+            tags=("booking", f"booking_{booking['booking_id']}"),
+        )
+        self.booking_items[booking["booking_id"]] = (rectangle, text, booking)
+
+    def update_booking(self, booking: dict) -> None:
+        """Move and recolor existing canvas items of a changed booking."""
+        rectangle, text, _ = self.booking_items[booking["booking_id"]]
+        x1, y1, x2, y2 = self.booking_coords(booking)
+        self.canvas.coords(rectangle, x1, y1, x2, y2)
+        self.canvas.itemconfigure(rectangle, fill=STATUS_COLORS.get(booking["status"], "#9e9e9e"))
+        self.canvas.coords(text, x1 + 3, (y1 + y2) // 2)
+        self.booking_items[booking["booking_id"]] = (rectangle, text, booking)
+
+    def render_batch(self, pending_bookings: list[dict]) -> None:
+        """Draw bookings in small batches so the window stays responsive while rendering."""
+        batch, remaining = pending_bookings[:RENDER_BATCH_SIZE], pending_bookings[RENDER_BATCH_SIZE:]
+        for booking in batch:
+            self.draw_booking(booking)
+
+        self.render_job = self.window.after(1, self.render_batch, remaining) if remaining else None
+
+    def refresh(self) -> None:
+        """Fetch the week with a single query and apply only the differences to the canvas."""
+        if self.refresh_job:
+            self.window.after_cancel(self.refresh_job)
+
+        week_start = datetime.combine(datetime.now().date(), datetime.min.time())
+        if week_start != self.week_start:
+            # A new day shifts every day header and booking, the week is fetched and drawn from scratch
+            self.week_start = week_start
+            self.version = None
+            self.desk_rows = {}
+
+        occupancy = get_floor_week_occupancy(
+            self.session_factory, self.office_id, self.floor_id, self.week_start, if_changed_since=self.version
+        )
+        if occupancy is NOT_MODIFIED:
+            logging.debug(f"Occupancy grid for '{self.office_name}' '{self.floor_name}' is up to date.")
+        elif occupancy is None:
+            messagebox.showerror("Error", "Failed to load floor occupancy. Please try again later.", parent=self.window)
+        else:
+            if self.render_job:
+                self.window.after_cancel(self.render_job)
+                self.render_job = None
+            self.version = occupancy["version"]
+            if list(self.desk_rows) != occupancy["desks"]:
+                self.draw_background(occupancy["desks"])
+
+            fresh_bookings = {booking["booking_id"]: booking for booking in occupancy["bookings"]}
+
+            for booking_id in set(self.booking_items) - set(fresh_bookings):
+                rectangle, text, _ = self.booking_items.pop(booking_id)
+                self.canvas.delete(rectangle, text)
+
+            new_bookings = []
+            for booking_id, booking in fresh_bookings.items():
+                if booking_id not in self.booking_items:
+                    new_bookings.append(booking)
+                elif self.booking_items[booking_id][2] != booking:
+                    self.update_booking(booking)
+
+            if new_bookings:
+                self.render_batch(new_bookings)
+
+            logging.info(
+                f"Occupancy grid for '{self.office_name}' '{self.floor_name}' refreshed, "
+                f"{len(new_bookings)} new bookings drawn."
+            )
+
+        self.refresh_job = self.window.after(REFRESH_INTERVAL_MS, self.refresh)
+
+    def on_booking_hover(self, event) -> None:
+        """Show details of the booking under the cursor."""
+        current_items = self.canvas.find_withtag("current")
+        if not current_items:
+            return
+        for rectangle, text, booking in self.booking_items.values():
+            if current_items[0] in (rectangle, text):
+                self.details_label.config(
+                    text=f"Desk: {booking['desk_code']}, User: {booking['user_name']}, "
+                    f"Start: {booking['start_date']:%Y-%m-%d %H:%M}, End: {booking['end_date']:%Y-%m-%d %H:%M}, "
+                    f"Status: {booking['status']}"
+                )
+                return
+
+    def close(self) -> None:
+        """Stop scheduled jobs and close the window."""
+        for job in (self.refresh_job, self.render_job):
+            if job:
+                self.window.after_cancel(job)
+        if self in OPEN_GRIDS:
+            OPEN_GRIDS.remove(self)
+        self.window.destroy()
+
+
+def open_occupancy_grid(
+    parent: Misc,
+    session_factory: Callable[[], Session],
+    office_id: Optional[int],
+    floor_id: Optional[int],
+    office_name: str,
+    floor_name: str,
+) -> OccupancyGrid | None:
+    """Open the week occupancy grid for the selected floor.
+
+    :param parent: The parent widget
+    :param session_factory: A callable that returns a SQLAlchemy session
+    :param office_id: ID of the selected office
+    :param floor_id: ID of the selected floor
+    :param office_name: The selected office name, used in the window title
+    :param floor_name: The selected floor name, used in the window title
+    """
+    if not office_id or not floor_id:
+        messagebox.showwarning("Warning", "Please select an office and a floor first.")
+        return None
+    return OccupancyGrid(parent, session_factory, office_id, floor_id, office_name, floor_name)
+
+
+def refresh_open_occupancy_grids() -> None:
+    """Update all open occupancy grids after bookings were changed."""
+    for grid in list(OPEN_GRIDS):
+        grid.refresh()
@@ -1,23 +1,40 @@
 import sys
 import logging
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta
 
 from db.sql_db import initialize_app_db
+from db.local_cache import initialize_local_cache, start_background_refresh
 from db.session_management import initialize_shared_session, close_shared_session, safe_session_factory
 from backend_operations.user_login import login, check_debug_mode
-from backend_operations.bookings_backend import create_booking, get_most_reserved_desk, get_most_frequent_booker
+from backend_operations.slot_calendar import next_slot_after, LAST_START_SLOT
+from backend_operations.bookings_backend import (
+    create_booking,
+    assign_best_desk,
+    get_most_reserved_desk,
+    get_most_frequent_booker,
+)
 from gui_operations.bookings_gui import initialize_booking_info
-from gui_operations.gui_utils import show_frame, center_window, on_login_success
+from gui_operations.occupancy_gui import open_occupancy_grid, refresh_open_occupancy_grids
+from gui_operations.my_bookings_gui import open_my_bookings
+from gui_operations.desk_map_gui import DeskMap, refresh_desk_maps
+from gui_operations.gui_utils import show_frame, center_window, on_login_success, update_connection_status
 from gui_operations.dropdowns_gui import (
+    TopologyCombobox,
     calculate_time_intervals,
+    get_selected_time_range,
     populate_office_dropdown,
     on_office_select,
     on_floor_select,
     reset_sector_selection,
     update_book_desk_button_text,
+    on_desk_map_click,
+    on_desk_search_select,
 )
+from gui_operations.desk_search_gui import DeskSearchBox
+from gui_operations.kiosk_gui import start_kiosk_app
 
 
 def start_tkinter_app():
@@ -29,6 +46,10 @@ def start_tkinter_app():
         messagebox.showerror("Critical Error", "Application failed to initialize. Please restart.")
         return
 
+    # Local cache serves topology and the user's bookings immediately, the server refreshes it in the background
+    initialize_local_cache()
+    start_background_refresh()
+
     # main window
     root = tk.Tk()
     root.title("Desk Booking System by Andrzej Zernaczuk")
@@ -82,6 +103,7 @@ def start_tkinter_app():
                     floor_image_frame,
                     all_frames,
                 ),
+                login_button,
             )
         ),
     )
@@ -123,7 +145,7 @@ def start_tkinter_app():
     date_dropdown["values"] = available_dates
     date_dropdown.set(available_dates[0])  # Default to today's date
 
-    if today.hour == 23 and today.minute >= 30:
+    if next_slot_after(today) > LAST_START_SLOT:
         # Update the date dropdown to the next day
         next_date = (today + timedelta(days=1)).strftime("%Y-%m-%d")
         date_dropdown.set(next_date)
@@ -150,11 +172,16 @@ def start_tkinter_app():
     end_time_dropdown["values"] = possible_end_times
     end_time_dropdown.set(suggested_end_time)
 
+    # Changing the time range updates desk availability on the floor map
+    for time_range_dropdown in (date_dropdown, start_time_dropdown, end_time_dropdown):
+        time_range_dropdown.bind("<<ComboboxSelected>>", lambda event: desk_map.refresh_availability())
+
     # Dropdown for Office
     office_label = tk.Label(dropdowns_frame, text="Select office:", font=("Arial", 12))
     office_label.grid(row=6, column=0, padx=10, pady=(10, 5), sticky="w")
 
-    office_dropdown = ttk.Combobox(dropdowns_frame, values=populate_office_dropdown(session_factory), state="readonly")
+    office_dropdown = TopologyCombobox(dropdowns_frame, state="readonly")
+    office_dropdown.set_options(populate_office_dropdown(session_factory))
     office_dropdown.grid(row=7, column=0, padx=10, sticky="w")
     office_dropdown.bind(
         "<<ComboboxSelected>>",
@@ -167,7 +194,7 @@ def start_tkinter_app():
     floor_label = tk.Label(dropdowns_frame, text="Select office floor:", font=("Arial", 12))
     floor_label.grid(row=8, column=0, padx=10, pady=(10, 5), sticky="w")
 
-    floor_dropdown = ttk.Combobox(dropdowns_frame, state="disabled")
+    floor_dropdown = TopologyCombobox(dropdowns_frame, state="disabled")
     floor_dropdown.grid(row=9, column=0, padx=10, sticky="w")
     floor_dropdown.bind(
         "<<ComboboxSelected>>",
@@ -179,7 +206,7 @@ def start_tkinter_app():
             sector_dropdown,
             desk_dropdown,
             book_desk_button,
-            image_label,
+            desk_map,
         ),
     )
 
@@ -191,7 +218,7 @@ def start_tkinter_app():
     sector_frame = tk.Frame(dropdowns_frame)
     sector_frame.grid(row=11, column=0, padx=10, sticky="w")
 
-    sector_dropdown = ttk.Combobox(sector_frame, state="disabled", width=20)
+    sector_dropdown = TopologyCombobox(sector_frame, state="disabled", width=20)
     sector_dropdown.grid(row=0, column=0, sticky="w")
 
     # Reset Button (X mark)
@@ -244,16 +271,85 @@ def start_tkinter_app():
                 booking_info_frame,
                 floor_image_frame,
             ),
+            refresh_open_occupancy_grids(),
+            refresh_desk_maps(),
         ),
     )
     book_desk_button.grid_remove()
+
+    # Button for automatic desk assignment, uses selected office, floor and sector as preferences
+    assign_desk_button = tk.Button(dropdowns_frame, text="Assign me a desk", width=35, font=("Arial", 12))
+    assign_desk_button.grid(row=15, column=0, padx=10, pady=(5, 5), sticky="we")
+    assign_desk_button.bind(
+        "<Button-1>",
+        lambda event: (
+            assign_best_desk(
+                event,
+                session_factory,
+                office_dropdown.selected_id(),
+                floor_dropdown.selected_id(),
+                sector_dropdown.selected_id(),
+                date_dropdown.get(),
+                start_time_dropdown.get(),
+                end_time_dropdown.get(),
+            ),
+            initialize_booking_info(
+                session_factory,
+                booking_details_label,
+                check_in_button,
+                cancel_button,
+                bookings_frame,
+                booking_info_frame,
+                floor_image_frame,
+            ),
+            refresh_open_occupancy_grids(),
+            refresh_desk_maps(),
+        ),
+    )
+
+    # Button for the week occupancy grid of the selected floor
+    week_view_button = tk.Button(dropdowns_frame, text="Show floor week occupancy", width=35, font=("Arial", 12))
+    week_view_button.grid(row=16, column=0, padx=10, pady=(5, 5), sticky="we")
+    week_view_button.config(
+        command=lambda: open_occupancy_grid(
+            root,
+            session_factory,
+            office_dropdown.selected_id(),
+            floor_dropdown.selected_id(),
+            office_dropdown.get(),
+            floor_dropdown.get(),
+        )
+    )
+
+    # Button for the paged list of the user's bookings
+    my_bookings_button = tk.Button(dropdowns_frame, text="My bookings", width=35, font=("Arial", 12))
+    my_bookings_button.grid(row=17, column=0, padx=10, pady=(5, 5), sticky="we")
+    my_bookings_button.config(
+        command=lambda: open_my_bookings(
+            root,
+            session_factory,
+            lambda: (
+                initialize_booking_info(
+                    session_factory,
+                    booking_details_label,
+                    check_in_button,
+                    cancel_button,
+                    bookings_frame,
+                    booking_info_frame,
+                    floor_image_frame,
+                ),
+                refresh_open_occupancy_grids(),
+                refresh_desk_maps(),
+            ),
+        )
+    )
     ################################################### Statistics ########################################################################
     statistics_tools_label = tk.Label(dropdowns_frame, text="Statistics", font=("Arial", 12))
-    statistics_tools_label.grid(row=15, column=0, padx=10, pady=(10, 5), sticky="w")
+    statistics_tools_label.grid(row=18, column=0, padx=10, pady=(10, 5), sticky="w")
 
     # Create a frame to hold the sector dropdown and reset button
     statistics_tools_frame = tk.Frame(dropdowns_frame)
-    statistics_tools_frame.grid(row=16, column=0, padx=10, sticky="we")
+    statistics_tools_frame.grid(row=19, column=0, padx=10, sticky="we")
 
     # Button for displaying most reserved desk
     most_reserved_desk_button = tk.Button(
@@ -270,6 +366,25 @@ def start_tkinter_app():
         "<Button-1>",
         lambda event: get_most_frequent_booker(event, session_factory),
     )
+    ################################################### Desk search ########################################################################
+    desk_search_label = tk.Label(dropdowns_frame, text="Search desk:", font=("Arial", 12))
+    desk_search_label.grid(row=20, column=0, padx=10, pady=(10, 5), sticky="w")
+
+    desk_search_box = DeskSearchBox(
+        dropdowns_frame,
+        session_factory,
+        lambda desk: on_desk_search_select(
+            desk,
+            session_factory,
+            office_dropdown,
+            floor_dropdown,
+            sector_dropdown,
+            desk_dropdown,
+            book_desk_button,
+            desk_map,
+        ),
+    )
+    desk_search_box.grid(row=21, column=0, padx=10, sticky="we")
     ################################################### BOOKING INFO ########################################################################
     # Booking info Frame
     booking_info_frame = tk.Frame(bookings_frame, bg="#cccccc", height=120)
@@ -313,8 +428,19 @@ def start_tkinter_app():
     floor_image_frame.grid_rowconfigure(1, weight=5)
     floor_image_frame.grid_columnconfigure(0, weight=1)
 
-    image_label = tk.Label(floor_image_frame, text="Select an office and floor to view the layout", font=("Arial", 16))
-    image_label.grid(row=0, column=0, padx=20, pady=20, sticky="nsew")
+    # Floor map, clicking a desk selects it for booking
+    desk_map = DeskMap(
+        floor_image_frame,
+        session_factory,
+        lambda: get_selected_time_range(date_dropdown, start_time_dropdown, end_time_dropdown),
+        lambda desk: on_desk_map_click(desk, sector_dropdown, desk_dropdown, book_desk_button),
+    )
+    desk_map.grid(row=0, column=0, padx=20, pady=20, sticky="nsew")
+
+    # Connection indicator shown below every screen
+    connection_status_label = tk.Label(root, font=("Arial", 10), anchor="w")
+    connection_status_label.grid(row=1, column=0, padx=10, sticky="we")
+    update_connection_status(connection_status_label)
 
     # Initially, show the login frame
     all_frames = [login_frame, desk_selecton_frame]
@@ -333,6 +459,16 @@ if __name__ == "__main__":
     # Initialize logging
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+    parser = argparse.ArgumentParser(description="Desk Booking System")
+    parser.add_argument(
+        "--kiosk",
+        nargs=2,
+        type=int,
+        metavar=("OFFICE_ID", "FLOOR_ID"),
+        help="Run the check-in kiosk of a floor entrance instead of the booking application",
+    )
+    args = parser.parse_args()
+
     try:
         if check_debug_mode():
             initialize_app_db()
@@ -342,4 +478,7 @@ if __name__ == "__main__":
         sys.exit(1)
 
     # Start the GUI application
-    start_tkinter_app()
+    if args.kiosk:
+        start_kiosk_app(*args.kiosk)
+    else:
+        start_tkinter_app()